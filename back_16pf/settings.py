@@ -51,12 +51,25 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'dashboard.metrics.MetricsMiddleware',
+    'dashboard.profiling.ProfilingMiddleware',
 ]
 
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
 ]
 
+# JSON con orjson (ver dashboard.renderers); el navegador sigue recibiendo la API navegable
+# y los clientes pueden pedir Arrow IPC o MessagePack con el encabezado Accept
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'dashboard.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'dashboard.renderers.ArrowStreamRenderer',
+        'dashboard.renderers.MessagePackRenderer',
+    ],
+}
+
 ROOT_URLCONF = 'back_16pf.urls'
 
 TEMPLATES = [
@@ -81,13 +94,55 @@ WSGI_APPLICATION = 'back_16pf.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# SQLite en modo WAL: las lecturas no esperan a las escrituras (ni al revés) y solo
+# hay una escritura a la vez. Cada transacción toma el bloqueo de escritura al empezar
+# (``transaction_mode``), así dos escrituras esperan su turno en lugar de fallar con
+# "database is locked" al pasar de lectura a escritura; ``timeout`` es el máximo de
+# segundos de espera. Las importaciones en segundo plano guardan cada bloque en su propia
+# transacción, así que ninguna escritura espera más que un bloque.
+# El modo WAL queda guardado en el archivo: se activa al terminar ``migrate`` (ver
+# DASHBOARD_SQLITE_JOURNAL_MODE) y no en cada conexión, para que los demás comandos no
+# modifiquen el encabezado de la base de datos.
+SQLITE_PRAGMAS = [
+    # En WAL, NORMAL no sincroniza en cada commit y sigue siendo seguro ante caídas
+    'synchronous=NORMAL',
+    # 64 MB de caché de páginas y 256 MB mapeados en memoria por conexión
+    'cache_size=-65536',
+    'mmap_size=268435456',
+    'temp_store=MEMORY',
+]
+SQLITE_TIMEOUT = 30
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Conexiones persistentes por hilo, verificadas antes de reutilizarlas
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_TIMEOUT,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(f'PRAGMA {pragma}' for pragma in SQLITE_PRAGMAS),
+        },
+    },
+    # Conexiones de solo lectura para las vistas de lectura (ver dashboard.routers). Con
+    # SQLite es el mismo archivo; puede apuntar a una copia replicada (LiteFS, etc.)
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_TIMEOUT,
+            'init_command': ';'.join(f'PRAGMA {pragma}' for pragma in SQLITE_PRAGMAS + ['query_only=ON']),
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['dashboard.routers.ReadReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -122,7 +177,91 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Archivos subidos (importaciones pendientes)
+MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_URL = 'media/'
+
+# Caché
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# ``responses`` guarda los cuerpos de las respuestas de lectura; puede cambiarse por
+# ``django.core.cache.backends.filebased.FileBasedCache`` (con LOCATION) para compartirla
+# entre procesos. Al pasar MAX_ENTRIES se descarta un tercio de las entradas.
+# Las claves de ambas cachés llevan la versión de los datos, que se guarda en la base de
+# datos (DatasetVersion) para que todos los procesos la compartan: no debe guardarse en
+# una caché local, porque la importación solo corre en uno de ellos.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard-responses',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 500,
+            'CULL_FREQUENCY': 3,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Dashboard
+
+# Filas escritas por lote durante la importación masiva
+DASHBOARD_IMPORT_BATCH_SIZE = 500
+
+# Hilos del pool que ejecuta los trabajos en segundo plano (importaciones y
+# agrupamientos); con SQLite las importaciones se ejecutan de a una en un hilo propio
+DASHBOARD_IMPORT_WORKERS = 2
+
+# Máximo de errores por fila guardados en cada ImportJob
+DASHBOARD_IMPORT_MAX_ERRORS = 1000
+
+# Tamaño máximo de página en los endpoints paginados por cursor (?limit=)
+DASHBOARD_MAX_PAGE_SIZE = 1000
+
+# Segundos que los resultados calculados (correlaciones, etc.) se guardan en la caché;
+# None los mantiene hasta que cambia la versión de los datos
+DASHBOARD_RESULTS_CACHE_TIMEOUT = None
+
+# Tamaño máximo de las muestras de las vistas de filtro (?mode=sample&size=)
+DASHBOARD_MAX_SAMPLE_SIZE = 10000
+
+# Alias de CACHES donde se guardan las respuestas de lectura (None desactiva la caché)
+DASHBOARD_RESPONSE_CACHE = 'responses'
+
+# Tamaño máximo en bytes de una respuesta guardada; las más grandes solo llevan ETag
+DASHBOARD_RESPONSE_CACHE_MAX_SIZE = 1024 * 1024
+
+# Medir latencia y consultas SQL por endpoint (expuestas en /api/metrics/ y en el
+# encabezado Server-Timing)
+DASHBOARD_METRICS = True
+
+# Direcciones que pueden leer /api/metrics/
+DASHBOARD_METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Perfilado bajo demanda (ver dashboard.profiling): las peticiones con el encabezado
+# DASHBOARD_PROFILING_HEADER y una fracción DASHBOARD_PROFILING_SAMPLE_RATE del resto se
+# ejecutan bajo cProfile y se guardan en DASHBOARD_PROFILING_DIR
+DASHBOARD_PROFILING = False
+DASHBOARD_PROFILING_HEADER = 'X-Profile'
+DASHBOARD_PROFILING_SAMPLE_RATE = 0.0
+DASHBOARD_PROFILING_DIR = BASE_DIR / 'profiles'
+
+# Perfiles guardados como máximo; se borran los más antiguos
+DASHBOARD_PROFILING_MAX_FILES = 200
+
+# Alias de DATABASES que atiende las vistas de solo lectura (None las envía a default)
+DASHBOARD_READ_REPLICA = 'replica'
+
+# Modo de journal que ``migrate`` deja guardado en las bases SQLite (None no lo cambia)
+DASHBOARD_SQLITE_JOURNAL_MODE = 'WAL'
+
+# Segundos tras los que un agrupamiento pendiente o en curso se considera abandonado y
+# se vuelve a encolar
+DASHBOARD_CLUSTERING_STALE_AFTER = 3600
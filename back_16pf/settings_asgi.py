@@ -0,0 +1,16 @@
+"""
+Perfil de despliegue ASGI: la configuración de ``settings`` con las vistas de lectura
+asíncronas (ver ``dashboard.async_views``). Un solo proceso atiende muchas peticiones
+concurrentes sin ocupar un hilo por cada una mientras espera a la base de datos o a un
+cliente lento, por ejemplo::
+
+    uvicorn back_16pf.asgi:application --workers 4
+"""
+from .settings import *  # noqa: F401,F403
+
+DASHBOARD_ASYNC_VIEWS = True
+
+# En modo asíncrono cada petición usa su propio hilo para el ORM: las conexiones
+# persistentes no se reutilizarían y quedarían abiertas
+for database in DATABASES.values():  # noqa: F405
+    database['CONN_MAX_AGE'] = 0
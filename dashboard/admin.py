@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Respondent, PersonalityFactors, Categorization
+from .models import Respondent, PersonalityFactors, Categorization, ImportJob, ClusteringRun
 
 # Registra el modelo Respondent con el administrador para mostrar el nombre
 @admin.register(Respondent)
@@ -12,6 +12,7 @@ class RespondentAdmin(admin.ModelAdmin):
 class PersonalityFactorsAdmin(admin.ModelAdmin):
     list_display = ('id', 'respondent_id', 'respondent_name')  # Muestra el ID del PersonalityFactors y el nombre del respondent
     search_fields = ('respondent__name',)  # Permite buscar por nombre del respondent
+    list_select_related = ('respondent',)  # Evita una consulta por fila al mostrar el nombre
 
     def respondent_name(self, obj):
         return obj.respondent.name  # Retorna el nombre del respondent
@@ -24,9 +25,22 @@ class PersonalityFactorsAdmin(admin.ModelAdmin):
 class CategorizationAdmin(admin.ModelAdmin):
     list_display = ('id', 'respondent_id', 'respondent_name')  # Muestra el ID del Categorization y el nombre del respondent
     search_fields = ('respondent__name',)  # Permite buscar por nombre del respondent
+    list_select_related = ('respondent',)  # Evita una consulta por fila al mostrar el nombre
 
     def respondent_name(self, obj):
         return obj.respondent.name  # Retorna el nombre del respondent
 
     respondent_name.admin_order_field = 'respondent__name'  # Habilita la ordenación por el nombre del respondent
     respondent_name.short_description = 'Respondent Name'  # Etiqueta personalizada para la columna
+
+# Registra el modelo ImportJob para revisar el estado de las importaciones
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'original_name', 'status', 'rows_processed', 'rows_rejected', 'created_at', 'finished_at')
+    list_filter = ('status',)
+
+# Registra el modelo ClusteringRun para revisar los agrupamientos calculados
+@admin.register(ClusteringRun)
+class ClusteringRunAdmin(admin.ModelAdmin):
+    list_display = ('id', 'k', 'status', 'algorithm', 'respondents', 'inertia', 'created_at', 'finished_at')
+    list_filter = ('status', 'k')
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+
+from .analytics import SCORE_COLUMNS, SCORE_LOOKUPS
+from .models import Respondent, ScoreAggregate
+
+# Límites inferiores de los rangos de edad: <18, 18-24, 25-34, ..., 65+
+DEFAULT_AGE_BANDS = (18, 25, 35, 45, 55, 65)
+
+GROUP_KEYS = ['gender', 'age_band', 'column']
+SUM_FIELDS = ['count', 'total', 'total_sq']
+
+
+def get_age_bands():
+    return tuple(getattr(settings, 'DASHBOARD_AGE_BANDS', DEFAULT_AGE_BANDS))
+
+
+def age_band_labels(edges):
+    labels = [f'<{edges[0]}']
+    labels += [f'{low}-{high - 1}' for low, high in zip(edges, edges[1:])]
+    labels.append(f'{edges[-1]}+')
+    return labels
+
+
+def age_band(ages, edges=None):
+    """
+    Etiqueta del rango de edad de cada elemento de ``ages``.
+    """
+    edges = edges or get_age_bands()
+    labels = np.array(age_band_labels(edges), dtype=object)
+    return labels[np.searchsorted(edges, np.asarray(ages, dtype=float), side='right')]
+
+
+def _age_band_expression(edges):
+    # El mismo cálculo que ``age_band``, en SQL
+    labels = age_band_labels(edges)
+    return Case(
+        *[When(age__lt=edge, then=Value(label)) for edge, label in zip(edges, labels)],
+        default=Value(labels[-1]),
+    )
+
+
+def score_sums(frame):
+    """
+    Conteo, suma y suma de cuadrados de cada puntaje por género y rango de edad.
+
+    ``frame`` tiene las columnas ``gender``, ``age`` y los puntajes (NaN o None donde no
+    hay valor). Devuelve un DataFrame indexado por ``(gender, age_band, column)``.
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=SUM_FIELDS, index=pd.MultiIndex.from_tuples([], names=GROUP_KEYS))
+    scores = frame[SCORE_COLUMNS].astype(float)
+    scores.insert(0, 'age_band', age_band(frame['age']))
+    scores.insert(0, 'gender', frame['gender'].to_numpy())
+    values = scores.melt(id_vars=['gender', 'age_band'], var_name='column', value_name='value').dropna(subset=['value'])
+    values['square'] = values['value'] ** 2
+    return values.groupby(GROUP_KEYS).agg(
+        count=('value', 'size'), total=('value', 'sum'), total_sq=('square', 'sum')
+    )
+
+
+def apply_score_deltas(deltas):
+    """
+    Suma ``deltas`` (ver ``score_sums``) a las filas de ScoreAggregate en tres consultas:
+    crea las filas que faltan, las bloquea y las actualiza. Debe usarse dentro de una
+    transacción atómica.
+    """
+    deltas = deltas[(deltas != 0).any(axis=1)]
+    if deltas.empty:
+        return
+    keys = list(deltas.index)
+
+    ScoreAggregate.objects.bulk_create(
+        [ScoreAggregate(gender=gender, age_band=band, column=column) for gender, band, column in keys],
+        ignore_conflicts=True,
+    )
+    genders, bands, columns = (sorted(set(level)) for level in zip(*keys))
+    rows = ScoreAggregate.objects.select_for_update().filter(
+        gender__in=genders, age_band__in=bands, column__in=columns
+    )
+    changed = []
+    for row in rows:
+        key = (row.gender, row.age_band, row.column)
+        if key in deltas.index:
+            delta = deltas.loc[key]
+            row.count += int(delta['count'])
+            row.total += float(delta['total'])
+            row.total_sq += float(delta['total_sq'])
+            changed.append(row)
+    ScoreAggregate.objects.bulk_update(changed, SUM_FIELDS)
+
+
+def aggregate_rows():
+    """
+    Filas de ScoreAggregate calculadas desde cero con una sola consulta agregada sobre
+    todos los puntajes.
+    """
+    sums = {}
+    for lookup in SCORE_LOOKUPS:
+        key = lookup.replace('__', '_')
+        sums[f'{key}_count'] = Count(lookup)
+        sums[f'{key}_total'] = Sum(lookup)
+        sums[f'{key}_total_sq'] = Sum(F(lookup) * F(lookup))
+    groups = (
+        Respondent.objects.annotate(age_band=_age_band_expression(get_age_bands()))
+        .values('gender', 'age_band').annotate(**sums).order_by()
+    )
+
+    rows = []
+    for group in groups:
+        for column, lookup in zip(SCORE_COLUMNS, SCORE_LOOKUPS):
+            key = lookup.replace('__', '_')
+            if group[f'{key}_count']:
+                rows.append(ScoreAggregate(
+                    gender=group['gender'], age_band=group['age_band'], column=column,
+                    count=group[f'{key}_count'], total=group[f'{key}_total'], total_sq=group[f'{key}_total_sq'],
+                ))
+    return rows
+
+
+def rebuild_aggregates():
+    """
+    Reemplaza ScoreAggregate por completo. Se usa tras cambios hechos fuera de la
+    importación y al cambiar ``DASHBOARD_AGE_BANDS``.
+    """
+    # Las sumas se leen dentro de la transacción: con ``transaction_mode`` IMMEDIATE tiene
+    # el bloqueo de escritura, así que una importación no puede aplicar sus deltas entre
+    # la lectura y el reemplazo (y perderse)
+    with transaction.atomic():
+        rows = aggregate_rows()
+        ScoreAggregate.objects.all().delete()
+        ScoreAggregate.objects.bulk_create(rows)
+    return len(rows)
+
+
+def schedule_rebuild():
+    """
+    Recalcula ScoreAggregate al confirmar la transacción actual (o de inmediato si no hay
+    una), una sola vez por transacción: borrar N respondientes envía una señal por cada
+    fila borrada en cascada, y cada recálculo recorre las tablas completas.
+    """
+    connection = transaction.get_connection()
+    # Si la transacción (o el savepoint) se revierte, el recálculo deja de estar pendiente
+    if connection.in_atomic_block and any(
+        function is rebuild_aggregates for _, function, _ in connection.run_on_commit
+    ):
+        return
+    transaction.on_commit(rebuild_aggregates)
+
+
+def group_statistics(columns=SCORE_COLUMNS, gender=None):
+    """
+    Conteo, media y desviación estándar (muestral) de cada puntaje por grupo de género y
+    rango de edad, leídos de ScoreAggregate: el costo depende del número de grupos y no
+    del número de respondientes.
+    """
+    rows = ScoreAggregate.objects.filter(column__in=columns, count__gt=0)
+    if gender is not None:
+        rows = rows.filter(gender=gender)
+
+    groups = {}
+    for row in rows:
+        mean = row.total / row.count
+        std = None
+        if row.count > 1:
+            variance = max((row.total_sq - row.total * mean) / (row.count - 1), 0.0)
+            std = variance ** 0.5
+        group = groups.setdefault((row.gender, row.age_band), {})
+        group[row.column] = {'count': row.count, 'mean': mean, 'std': std}
+    # Grupos ordenados por género y rango de edad (no por la etiqueta del rango)
+    labels = age_band_labels(get_age_bands())
+    order = sorted(groups, key=lambda key: (key[0], labels.index(key[1]) if key[1] in labels else len(labels)))
+    return [
+        {
+            'gender': gender,
+            'age_band': band,
+            'scores': {col: groups[gender, band][col] for col in columns if col in groups[gender, band]},
+        }
+        for gender, band in order
+    ]
@@ -0,0 +1,258 @@
+import math
+import operator
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .dataset import versioned
+from .models import Respondent, PERSONALITY_COLUMNS, CATEGORIZATION_COLUMNS
+
+SCORE_COLUMNS = PERSONALITY_COLUMNS + CATEGORIZATION_COLUMNS
+
+# Ruta desde Respondent hasta cada columna de puntaje
+SCORE_LOOKUPS = (
+    [f'personalityfactors__{col}' for col in PERSONALITY_COLUMNS]
+    + [f'categorization__{col}' for col in CATEGORIZATION_COLUMNS]
+)
+
+# Cómo evaluar cada filtro de ``parse_cohort`` sobre los arreglos de ``score_columns``
+COHORT_FILTERS = {
+    'gender': ('gender', operator.eq),
+    'age__gte': ('age', operator.ge),
+    'age__lte': ('age', operator.le),
+    'import_job': ('import_job', operator.eq),
+}
+
+DEFAULT_PERCENTILES = [25, 50, 75]
+CORRELATION_METHODS = ['pearson', 'spearman']
+
+
+def score_matrix(filters=None, columns=SCORE_COLUMNS):
+    """
+    Lee los puntajes de los respondientes en una sola consulta y los devuelve como
+    ``(ids, matrix)``: un arreglo de ids y una matriz float (una fila por respondiente,
+    una columna por elemento de ``columns``) con NaN donde no hay valor.
+    """
+    lookups = [SCORE_LOOKUPS[SCORE_COLUMNS.index(col)] for col in columns]
+    rows = Respondent.objects.filter(**(filters or {})).order_by('id').values_list('id', *lookups)
+    data = np.array(list(rows.iterator(chunk_size=5000)), dtype=float).reshape(-1, len(columns) + 1)
+    return data[:, 0].astype(np.int64), data[:, 1:]
+
+
+def _nullable(values):
+    # NaN no es JSON válido
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def describe(matrix, columns=SCORE_COLUMNS, percentiles=DEFAULT_PERCENTILES):
+    """
+    Estadísticas descriptivas por columna, ignorando valores faltantes.
+    """
+    with warnings.catch_warnings():
+        # Columnas sin ningún valor producen NaN, que se reporta como null
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        count = np.count_nonzero(~np.isnan(matrix), axis=0)
+        mean = np.nanmean(matrix, axis=0)
+        std = np.nanstd(matrix, axis=0, ddof=1)
+        minimum = np.nanmin(matrix, axis=0) if len(matrix) else np.full(len(columns), np.nan)
+        maximum = np.nanmax(matrix, axis=0) if len(matrix) else np.full(len(columns), np.nan)
+        if len(matrix):
+            quantiles = np.nanpercentile(matrix, percentiles, axis=0).reshape(len(percentiles), len(columns))
+        else:
+            quantiles = np.full((len(percentiles), len(columns)), np.nan)
+
+    mean, std, minimum, maximum = (_nullable(values) for values in (mean, std, minimum, maximum))
+    quantiles = [_nullable(values) for values in quantiles]
+    return {
+        col: {
+            'count': int(count[i]),
+            'mean': mean[i],
+            'std': std[i],
+            'min': minimum[i],
+            'max': maximum[i],
+            'percentiles': {f'{p:g}': quantiles[j][i] for j, p in enumerate(percentiles)},
+        }
+        for i, col in enumerate(columns)
+    }
+
+
+def _compute_correlation(method):
+    ids, matrix = score_matrix()
+    # Correlación por pares de observaciones completas, como DataFrame.corr
+    corr = pd.DataFrame(matrix, columns=SCORE_COLUMNS).corr(method=method, min_periods=2)
+    return {
+        'method': method,
+        'count': len(ids),
+        'columns': SCORE_COLUMNS,
+        'matrix': [_nullable(row) for row in corr.to_numpy()],
+    }
+
+
+def correlation_matrix(method='pearson'):
+    """
+    Matriz de correlación 26x26 de factores y categorías. Se recalcula solo cuando
+    cambia la versión de los datos.
+    """
+    return versioned(f'correlation:{method}', lambda: _compute_correlation(method))
+
+
+def _load_score_columns():
+    fields = ['id', 'gender', 'age', 'import_job_id']
+    rows = Respondent.objects.order_by('id').values_list(*fields, *SCORE_LOOKUPS)
+    frame = pd.DataFrame.from_records(list(rows.iterator(chunk_size=5000)), columns=fields + SCORE_COLUMNS)
+    return {
+        'id': frame['id'].to_numpy(dtype=np.int64),
+        'gender': frame['gender'].to_numpy(dtype=object),
+        'age': frame['age'].to_numpy(dtype=float),
+        'import_job': frame['import_job_id'].to_numpy(dtype=float),  # NaN sin importación
+        'scores': frame[SCORE_COLUMNS].to_numpy(dtype=np.float32),  # Los decatipos caben sin pérdida
+    }
+
+
+def score_columns():
+    """
+    Todos los respondientes en arreglos de NumPy (``id``, ``gender``, ``age``,
+    ``import_job`` y la matriz ``scores`` con las columnas de ``SCORE_COLUMNS``).
+
+    Se lee de la base de datos una vez por versión de los datos y se mantiene en memoria
+    del proceso: convertir las filas a Python cuesta segundos con cientos de miles de
+    respondientes, mientras que los cálculos sobre los arreglos toman milisegundos.
+    """
+    return versioned('score-columns', _load_score_columns, shared=False)
+
+
+def cohort_masks(cohorts, data):
+    """
+    Matriz booleana cohorte x respondiente para las cohortes (filtros de
+    ``parse_cohort``) sobre los arreglos de ``score_columns``.
+    """
+    masks = np.ones((len(cohorts), len(data['id'])), dtype=bool)
+    for i, filters in enumerate(cohorts):
+        for key, value in filters.items():
+            field, compare = COHORT_FILTERS[key]
+            masks[i] &= compare(data[field], value)
+    return masks
+
+
+def group_moments(masks, matrix):
+    """
+    Conteo, media y desviación estándar muestral de cada columna de ``matrix`` para cada
+    grupo de ``masks`` (matriz booleana grupo x fila), con tres productos de matrices en
+    lugar de un recorrido por grupo. Devuelve arreglos grupo x columna.
+    """
+    valid = ~np.isnan(matrix)
+    values = np.where(valid, matrix, 0.0)
+    weights = masks.astype(float)
+    count = weights @ valid
+    total = weights @ values
+    total_sq = weights @ (values * values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        variance = np.maximum((total_sq - total * mean) / (count - 1), 0.0)
+    variance[count < 2] = np.nan
+    return count.astype(np.int64), mean, np.sqrt(variance)
+
+
+def _beta_fraction(a, b, x, iterations=300, epsilon=3e-14):
+    # Fracción continua de la beta incompleta (método de Lentz)
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, iterations + 1):
+        for numerator in (
+            m * (b - m) * x / ((a - 1 + 2 * m) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 1 + 2 * m)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < epsilon:
+            break
+    return h
+
+
+def _regularized_beta(a, b, x):
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_fraction(a, b, x) / a
+    return 1.0 - front * _beta_fraction(b, a, 1.0 - x) / b
+
+
+def t_test_p_values(t, df):
+    """
+    p-valores bilaterales de los estadísticos ``t`` con ``df`` grados de libertad
+    (distribución t de Student), sin depender de SciPy.
+    """
+    t, df = np.broadcast_arrays(np.asarray(t, dtype=float), np.asarray(df, dtype=float))
+    return np.array([
+        _regularized_beta(n / 2, 0.5, n / (n + value * value)) if np.isfinite(value) and n > 0 else np.nan
+        for value, n in zip(t.ravel(), df.ravel())
+    ]).reshape(t.shape)
+
+
+def compare_groups(count, mean, std, first, second):
+    """
+    Comparación de los grupos ``first`` y ``second`` (filas de ``group_moments``) en
+    cada columna: diferencia de medias, d de Cohen (desviación estándar combinada) y
+    prueba t de Welch con sus grados de libertad y p-valor bilateral.
+    """
+    n1, n2 = count[first].astype(float), count[second].astype(float)
+    m1, m2 = mean[first], mean[second]
+    v1, v2 = std[first] ** 2, std[second] ** 2
+    difference = m1 - m2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled = np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+        cohens_d = difference / pooled
+        a, b = v1 / n1, v2 / n2
+        t = difference / np.sqrt(a + b)
+        df = (a + b) ** 2 / (a * a / (n1 - 1) + b * b / (n2 - 1))
+    # Sin varianza en ambos grupos los estadísticos no están definidos
+    cohens_d, t, df = (np.where(np.isfinite(values), values, np.nan) for values in (cohens_d, t, df))
+    return {
+        'mean_difference': difference,
+        'cohens_d': cohens_d,
+        't': t,
+        'df': df,
+        'p_value': t_test_p_values(t, df),
+    }
+
+
+def compare_cohorts(labels, cohorts, columns=PERSONALITY_COLUMNS):
+    """
+    Estadísticas de cada cohorte y comparación de cada par de cohortes en ``columns``,
+    calculadas sobre los arreglos en memoria de ``score_columns``.
+    """
+    data = score_columns()
+    masks = cohort_masks(cohorts, data)
+    matrix = data['scores'][:, [SCORE_COLUMNS.index(col) for col in columns]].astype(float)
+    count, mean, std = group_moments(masks, matrix)
+
+    results = []
+    for i, label in enumerate(labels):
+        means, stds = _nullable(mean[i]), _nullable(std[i])
+        results.append({
+            'label': label,
+            'count': int(masks[i].sum()),
+            'scores': {
+                col: {'count': int(count[i, j]), 'mean': means[j], 'std': stds[j]}
+                for j, col in enumerate(columns)
+            },
+        })
+
+    comparisons = []
+    for first in range(len(labels)):
+        for second in range(first + 1, len(labels)):
+            stats = {name: _nullable(values) for name, values in compare_groups(count, mean, std, first, second).items()}
+            comparisons.append({
+                'cohorts': [labels[first], labels[second]],
+                'scores': {col: {name: values[j] for name, values in stats.items()} for j, col in enumerate(columns)},
+            })
+    return {'columns': list(columns), 'cohorts': results, 'comparisons': comparisons}
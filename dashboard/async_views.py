@@ -0,0 +1,171 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAcceptable
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .caching import AsyncCachedResponseMixin
+from .columnar import acolumnar_queryset, columns_from_tuples, value_names, wants_columnar
+from .exceptions import InvalidParameter
+from .models import Respondent, PersonalityFactors, Categorization, PERSONALITY_COLUMNS, CATEGORIZATION_COLUMNS
+from .pagination import KeysetPagination
+from .routers import ReplicaReadMixin
+from .serializer import RespondentSerializer, PersonalityFactorsSerializer, CategorizationSerializer
+from .streaming import astream_json, wants_stream
+from .views import CATEGORY_PARAMS, FACTOR_PARAMS, CategorizationByRespondentView, CategorizationFilterView, \
+    PersonalityFactorsByRespondentView, PersonalityFactorsFilterView, RespondentDetailView, RespondentListView, \
+    category_rows, factor_rows, scatter_mode_data, selected_columns
+
+
+class AsyncAPIView(View):
+    """
+    Base de las vistas de lectura asíncronas.
+
+    DRF no tiene vistas asíncronas, así que aquí se hace lo que estas vistas necesitan de
+    ``APIView``: la petición se envuelve en un ``Request`` de DRF, el formato se negocia con
+    los mismos renderers (salvo la API navegable), ``InvalidParameter`` y ``Http404`` se
+    responden con el mismo cuerpo de error y la ``Response`` se renderiza al final (Django
+    lo hace en un hilo, fuera del event loop).
+    """
+    renderer_classes = [
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+        if not issubclass(renderer, BrowsableAPIRenderer)
+    ]
+    content_negotiation_class = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request)
+        self.request = request
+        renderers = [renderer() for renderer in self.renderer_classes]
+        try:
+            request.accepted_renderer, request.accepted_media_type = (
+                self.content_negotiation_class().select_renderer(request, renderers)
+            )
+            response = await super().dispatch(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            if isinstance(exc, NotAcceptable) or not hasattr(request, 'accepted_renderer'):
+                request.accepted_renderer, request.accepted_media_type = renderers[0], renderers[0].media_type
+            response = self.error_response(exc)
+
+        if isinstance(response, Response):
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = {'view': self, 'args': args, 'kwargs': kwargs, 'request': request}
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def error_response(self, exc):
+        if isinstance(exc, Http404):
+            return Response({'detail': str(exc) or 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(exc.detail, status=exc.status_code)
+
+
+async def akeyset_response(request, queryset, view, key_field='respondent_id', key_name='annotated_respondent_id'):
+    """
+    ``keyset_response`` con el ORM asíncrono.
+    """
+    columnar = wants_columnar(request)
+    # Las páginas columnares se leen como tuplas de ``values_list``, sin un dict por fila
+    names = value_names(queryset) if columnar else None
+    paginator = KeysetPagination(key_field=key_field, key_name=key_name, names=names)
+    if wants_stream(request):
+        if columnar:
+            raise InvalidParameter("'stream' is only available as JSON rows.")
+        return astream_json(paginator.apply_after(queryset, request))
+    if not columnar:
+        page = await paginator.apaginate_queryset(queryset, request, view=view)
+        if page is not None:
+            return paginator.get_paginated_response(page)
+        return Response([row async for row in queryset], status=status.HTTP_200_OK)
+
+    page = await paginator.apaginate_queryset(queryset.values_list(*names), request, view=view)
+    if page is not None:
+        return paginator.get_paginated_response(columns_from_tuples(page, names))
+    return Response(await acolumnar_queryset(queryset), status=status.HTTP_200_OK)
+
+
+class AsyncRespondentListView(ReplicaReadMixin, AsyncCachedResponseMixin, AsyncAPIView):
+    """
+    ``RespondentListView`` asíncrona.
+    """
+    async def get(self, request, *args, **kwargs):
+        rows = Respondent.objects.values(*RespondentSerializer.Meta.fields)
+        return await akeyset_response(request, rows, self, key_field='id', key_name='id')
+
+
+class AsyncRespondentDetailView(ReplicaReadMixin, AsyncCachedResponseMixin, AsyncAPIView):
+    """
+    ``RespondentDetailView`` asíncrona.
+    """
+    async def get(self, request, pk, *args, **kwargs):
+        row = await Respondent.objects.filter(pk=pk).values(*RespondentSerializer.Meta.fields).afirst()
+        if row is None:
+            raise Http404('No Respondent matches the given query.')
+        return Response(row, status=status.HTTP_200_OK)
+
+
+class AsyncPersonalityFactorsByRespondentView(ReplicaReadMixin, AsyncCachedResponseMixin, AsyncAPIView):
+    """
+    ``PersonalityFactorsByRespondentView`` asíncrona.
+    """
+    async def get(self, request, respondent_id, *args, **kwargs):
+        queryset = PersonalityFactors.objects.filter(respondent_id=respondent_id).select_related('respondent')
+        factors = [obj async for obj in queryset]
+        return Response(PersonalityFactorsSerializer(factors, many=True).data, status=status.HTTP_200_OK)
+
+
+class AsyncCategorizationByRespondentView(ReplicaReadMixin, AsyncCachedResponseMixin, AsyncAPIView):
+    """
+    ``CategorizationByRespondentView`` asíncrona.
+    """
+    async def get(self, request, respondent_id, *args, **kwargs):
+        queryset = Categorization.objects.filter(respondent_id=respondent_id).select_related('respondent')
+        categories = [obj async for obj in queryset]
+        return Response(CategorizationSerializer(categories, many=True).data, status=status.HTTP_200_OK)
+
+
+class AsyncPersonalityFactorsFilterView(ReplicaReadMixin, AsyncCachedResponseMixin, AsyncAPIView):
+    """
+    ``PersonalityFactorsFilterView`` asíncrona. Los modos agregados (NumPy) se calculan en
+    un hilo para no bloquear el event loop.
+    """
+    async def get(self, request, *args, **kwargs):
+        factor1, factor2 = selected_columns(request.query_params, FACTOR_PARAMS, PERSONALITY_COLUMNS, 'factors')
+        if 'mode' in request.query_params:
+            data = await sync_to_async(scatter_mode_data)(
+                request, PersonalityFactors, (factor1, factor2), FACTOR_PARAMS
+            )
+            return Response(data, status=status.HTTP_200_OK)
+        return await akeyset_response(request, factor_rows(factor1, factor2), self)
+
+
+class AsyncCategorizationFilterView(ReplicaReadMixin, AsyncCachedResponseMixin, AsyncAPIView):
+    """
+    ``CategorizationFilterView`` asíncrona.
+    """
+    async def get(self, request, *args, **kwargs):
+        category1, category2 = selected_columns(
+            request.query_params, CATEGORY_PARAMS, CATEGORIZATION_COLUMNS, 'categories'
+        )
+        if 'mode' in request.query_params:
+            data = await sync_to_async(scatter_mode_data)(
+                request, Categorization, (category1, category2), CATEGORY_PARAMS
+            )
+            return Response(data, status=status.HTTP_200_OK)
+        return await akeyset_response(request, category_rows(category1, category2), self)
+
+
+# Vista asíncrona que reemplaza a cada vista de lectura con DASHBOARD_ASYNC_VIEWS
+ASYNC_READ_VIEWS = {
+    RespondentListView: AsyncRespondentListView,
+    RespondentDetailView: AsyncRespondentDetailView,
+    PersonalityFactorsByRespondentView: AsyncPersonalityFactorsByRespondentView,
+    CategorizationByRespondentView: AsyncCategorizationByRespondentView,
+    PersonalityFactorsFilterView: AsyncPersonalityFactorsFilterView,
+    CategorizationFilterView: AsyncCategorizationFilterView,
+}
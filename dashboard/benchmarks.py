@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Endpoints de lectura: (nombre, ruta, parámetros, máximo de consultas por petición).
+# ``{pk}`` es el id de un respondiente con puntajes e ``{ids}`` una lista de ids. El
+# máximo no depende del número de filas: una consulta por fila (N+1) lo supera. Se mide
+# sin la caché de respuestas, así que incluye la lectura de la versión de los datos en
+# los endpoints que reutilizan resultados calculados.
+READ_ENDPOINTS = [
+    ('respondents', '/api/respontents/', {'limit': 100}, 1),
+    ('respondent-detail', '/api/respondents/{pk}/', {}, 1),
+    ('respondent-profile', '/api/respondents/{pk}/profile/', {}, 1),
+    ('profiles', '/api/profiles/', {'ids': '{ids}'}, 1),
+    ('personality-factors', '/api/personality-factors/{pk}/', {}, 1),
+    ('categorization', '/api/categorization/{pk}/', {}, 1),
+    ('personality-factors-filter', '/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B', 'limit': 100}, 1),
+    ('personality-factors-histogram', '/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B', 'mode': 'histogram'}, 1),
+    ('categorization-filter', '/api/categorization-filter/', {'category1': 'An', 'category2': 'Ex', 'limit': 100}, 1),
+    ('query', '/api/query/', {'A__gte': 7, 'Q4__lte': 3, 'limit': 100}, 1),
+    ('stats', '/api/stats/', {}, 1),
+    ('group-stats', '/api/stats/groups/', {}, 1),
+    ('correlations', '/api/correlations/', {}, 2),
+    ('cohorts', '/api/cohorts/', {'cohort': ['gender:M', 'gender:F']}, 2),
+    ('similar', '/api/respondents/{pk}/similar/', {'k': 10}, 3),
+    ('export', '/api/export/', {}, 1),
+]
+
+
+def resolve_endpoint(path, params, ids):
+    """
+    Ruta y parámetros de un endpoint de ``READ_ENDPOINTS`` para los respondientes ``ids``.
+    """
+    values = {'pk': ids[0], 'ids': ','.join(str(pk) for pk in ids[:50])}
+    params = {key: value.format(**values) if isinstance(value, str) else value for key, value in params.items()}
+    return path.format(**values), params
+
+
+def measure(client, path, params, repeat=5):
+    """
+    Hace ``repeat`` peticiones GET y devuelve ``(status, queries, mediana en ms)``, con
+    ``queries`` el número de consultas de la primera petición (sin resultados en memoria).
+    """
+    timings = []
+    queries = None
+    status = None
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = client.get(path, params)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            timings.append((time.perf_counter() - start) * 1000)
+        if queries is None:
+            queries = len(captured)
+            status = response.status_code
+    return status, queries, statistics.median(timings)
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+def _complete(x, y):
+    # Puntos sin valores faltantes
+    return ~(np.isnan(x) | np.isnan(y))
+
+
+def histogram2d(x, y, bins, value_range):
+    """
+    Conteos de un histograma 2-D de ``bins`` x ``bins`` celdas sobre ``value_range``.
+    """
+    mask = _complete(x, y)
+    counts, x_edges, y_edges = np.histogram2d(x[mask], y[mask], bins=bins, range=[value_range, value_range])
+    return {
+        'x_edges': x_edges.tolist(),
+        'y_edges': y_edges.tolist(),
+        'counts': counts.astype(int).tolist(),  # counts[i][j]: celda i en x, j en y
+    }
+
+
+def hexbin(x, y, gridsize, value_range):
+    """
+    Conteos por hexágono, con la misma malla que ``matplotlib.pyplot.hexbin``:
+    ``gridsize`` hexágonos a lo ancho. Solo se devuelven los hexágonos no vacíos.
+    """
+    mask = _complete(x, y)
+    x, y = x[mask], y[mask]
+    low, high = value_range
+    nx = gridsize
+    ny = max(int(nx / np.sqrt(3)), 1)
+    sx = (high - low) / nx
+    sy = (high - low) / ny
+
+    # Coordenadas en unidades de la malla; cada punto va al centro más cercano de las
+    # dos mallas rectangulares desplazadas que forman la malla hexagonal
+    px = (x - low) / sx
+    py = (y - low) / sy
+    ix1, iy1 = np.round(px), np.round(py)
+    ix2, iy2 = np.floor(px), np.floor(py)
+    d1 = (px - ix1) ** 2 + 3.0 * (py - iy1) ** 2
+    d2 = (px - ix2 - 0.5) ** 2 + 3.0 * (py - iy2 - 0.5) ** 2
+    first = d1 < d2
+
+    cx = np.where(first, ix1, ix2 + 0.5) * sx + low
+    cy = np.where(first, iy1, iy2 + 0.5) * sy + low
+    centers, counts = np.unique(np.column_stack([cx, cy]), axis=0, return_counts=True)
+    return {
+        'gridsize': gridsize,
+        'hex_width': sx,
+        'hex_height': sy,
+        'hexagons': [
+            {'x': float(center[0]), 'y': float(center[1]), 'count': int(count)}
+            for center, count in zip(centers, counts)
+        ],
+    }
+
+
+def sample_indices(x, y, size, strategy, rng, bins, value_range):
+    """
+    Posiciones de una muestra de como máximo ``size`` puntos.
+
+    ``random`` es un muestreo simple sin reemplazo. ``stratified`` reparte la muestra
+    entre las celdas de un histograma 2-D en proporción a su conteo, con al menos un
+    punto por celda no vacía, para que las zonas poco densas sigan apareciendo.
+    """
+    total = len(x)
+    if total <= size:
+        return np.arange(total)
+    if strategy == 'random':
+        return np.sort(rng.choice(total, size=size, replace=False))
+
+    # Celda de cada punto (los valores faltantes van a una celda propia)
+    low, high = value_range
+    scale = bins / (high - low)
+    cx = np.clip(np.floor((np.nan_to_num(x, nan=low - 1) - low) * scale), -1, bins)
+    cy = np.clip(np.floor((np.nan_to_num(y, nan=low - 1) - low) * scale), -1, bins)
+    cells = ((cx + 1) * (bins + 2) + (cy + 1)).astype(np.int64)
+
+    _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    quotas = np.maximum(np.floor(counts * size / total), 1).astype(np.int64)
+
+    # El mínimo de un punto por celda puede pasar el tope: se descuenta de las celdas
+    # más grandes y, si hay más celdas que ``size``, se eligen celdas al azar
+    excess = int(quotas.sum()) - size
+    while excess > 0 and quotas.max() > 1:
+        quotas[np.argmax(quotas)] -= 1
+        excess -= 1
+    if excess > 0:
+        quotas[rng.choice(len(quotas), size=excess, replace=False)] = 0
+
+    # Orden aleatorio dentro de cada celda; se toman los primeros ``quota`` de cada una
+    order = rng.permutation(total)
+    order = order[np.argsort(inverse[order], kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(total) - np.repeat(starts, counts)
+    chosen = order[rank < np.repeat(quotas, counts)]
+    return np.sort(chosen)
@@ -0,0 +1,137 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .dataset import aget_dataset_version, get_dataset_version, pinned_version, version_timestamp
+
+DEFAULT_RESPONSE_CACHE = 'responses'
+DEFAULT_RESPONSE_CACHE_MAX_SIZE = 1024 * 1024
+
+
+def _request_key(request):
+    # La respuesta depende de la ruta, los parámetros y el formato pedido
+    raw = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # El cliente puede guardar la respuesta, pero debe revalidarla en cada uso
+    patch_cache_control(response, no_cache=True)
+    # La clave y el ETag dependen del formato pedido; los aciertos y los 304 no pasan por
+    # DRF, que es quien agrega este encabezado
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _cache_alias(request):
+    alias = getattr(settings, 'DASHBOARD_RESPONSE_CACHE', DEFAULT_RESPONSE_CACHE)
+    return alias if request.method == 'GET' else None
+
+
+class _CachedRequest:
+    """
+    Validadores y clave de caché de una petición GET para la versión ``version`` de los datos.
+    """
+
+    def __init__(self, request, version):
+        # La versión se lee antes de consultar los datos: si cambia mientras tanto, la
+        # respuesta queda asociada a la versión anterior y no se vuelve a usar
+        request_key = _request_key(request)
+        self.etag = quote_etag(f'{version}-{request_key[:16]}')
+        self.last_modified = int(version_timestamp(version))
+        self.cache_key = f'dashboard:response:{version}:{request_key}'
+        self.request = request
+
+    def not_modified(self):
+        response = get_conditional_response(self.request, etag=self.etag, last_modified=self.last_modified)
+        return None if response is None else _set_validators(response, self.etag, self.last_modified)
+
+    def hit(self, cached):
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['X-Cache'] = 'hit'
+        return _set_validators(response, self.etag, self.last_modified)
+
+    def store(self, response):
+        """
+        Devuelve ``(respuesta, valor a guardar o None)``. Solo se guardan los cuerpos de
+        las respuestas 200 que no son streaming y caben en ``DASHBOARD_RESPONSE_CACHE_MAX_SIZE``.
+        """
+        if response.status_code != 200 or response.streaming:
+            return response, None
+        if hasattr(response, 'render'):
+            response.render()
+        max_size = getattr(settings, 'DASHBOARD_RESPONSE_CACHE_MAX_SIZE', DEFAULT_RESPONSE_CACHE_MAX_SIZE)
+        value = (response.content, response['Content-Type']) if len(response.content) <= max_size else None
+        response['X-Cache'] = 'miss'
+        return _set_validators(response, self.etag, self.last_modified), value
+
+
+class CachedResponseMixin:
+    """
+    Caché de respuestas para vistas de solo lectura, asociada a la versión de los datos.
+
+    Cada respuesta GET lleva ``ETag`` (versión + petición) y ``Last-Modified`` (momento de
+    la última modificación de los datos). Un ``If-None-Match``/``If-Modified-Since`` vigente
+    recibe 304 con una sola consulta (la versión), y el cuerpo de las respuestas 200 se
+    guarda en la caché ``DASHBOARD_RESPONSE_CACHE`` para servirlo a otros clientes hasta que
+    cambien los datos. La vista se ejecuta con esa versión fijada (ver ``pinned_version``).
+    Las respuestas en streaming y las mayores que ``DASHBOARD_RESPONSE_CACHE_MAX_SIZE``
+    bytes no se guardan.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        alias = _cache_alias(request)
+        if alias is None:
+            return super().dispatch(request, *args, **kwargs)
+
+        version = get_dataset_version()
+        cached_request = _CachedRequest(request, version)
+        not_modified = cached_request.not_modified()
+        if not_modified is not None:
+            return not_modified
+
+        cache = caches[alias]
+        cached = cache.get(cached_request.cache_key)
+        if cached is not None:
+            return cached_request.hit(cached)
+
+        with pinned_version(version):
+            response, value = cached_request.store(super().dispatch(request, *args, **kwargs))
+        if value is not None:
+            cache.set(cached_request.cache_key, value)
+        return response
+
+
+class AsyncCachedResponseMixin:
+    """
+    ``CachedResponseMixin`` para las vistas asíncronas (ver ``dashboard.async_views``).
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        alias = _cache_alias(request)
+        if alias is None:
+            return await super().dispatch(request, *args, **kwargs)
+
+        version = await aget_dataset_version()
+        cached_request = _CachedRequest(request, version)
+        not_modified = cached_request.not_modified()
+        if not_modified is not None:
+            return not_modified
+
+        cache = caches[alias]
+        cached = await cache.aget(cached_request.cache_key)
+        if cached is not None:
+            return cached_request.hit(cached)
+
+        with pinned_version(version):
+            response, value = cached_request.store(await super().dispatch(request, *args, **kwargs))
+        if value is not None:
+            await cache.aset(cached_request.cache_key, value)
+        return response
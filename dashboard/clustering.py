@@ -0,0 +1,211 @@
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .dataset import get_dataset_version
+from .jobs import submit
+from .models import ClusterAssignment, ClusteringRun, PERSONALITY_COLUMNS
+from .similarity import factor_index
+
+MIN_CLUSTERS = 2
+MAX_CLUSTERS = 20
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_TOLERANCE = 1e-4
+# Con más filas que el umbral se usa k-means por mini-lotes
+DEFAULT_MINI_BATCH_THRESHOLD = 50000
+DEFAULT_MINI_BATCH_SIZE = 4096
+# Filas por bloque al calcular distancias a los centroides (limita la memoria usada)
+DISTANCE_CHUNK_SIZE = 65536
+ASSIGNMENT_BATCH_SIZE = 2000
+# Segundos tras los que un agrupamiento pendiente o en curso se da por perdido (por
+# ejemplo, si el proceso se reinició con el trabajo en la cola) y se vuelve a encolar
+DEFAULT_STALE_AFTER = 3600
+
+
+def _squared_distances(X, centroids):
+    # ||x||² - 2 x·c + ||c||², para todas las filas y centroides a la vez
+    distances = (
+        np.einsum('ij,ij->i', X, X)[:, None]
+        - 2 * X @ centroids.T
+        + np.einsum('ij,ij->i', centroids, centroids)[None, :]
+    )
+    return np.maximum(distances, 0.0)
+
+
+def assign(X, centroids):
+    """
+    Centroide más cercano a cada fila de ``X`` y la distancia cuadrada a él, por bloques.
+    """
+    labels = np.empty(len(X), dtype=np.int64)
+    distances = np.empty(len(X))
+    for start in range(0, len(X), DISTANCE_CHUNK_SIZE):
+        chunk = _squared_distances(X[start:start + DISTANCE_CHUNK_SIZE], centroids)
+        labels[start:start + len(chunk)] = chunk.argmin(axis=1)
+        distances[start:start + len(chunk)] = chunk[np.arange(len(chunk)), labels[start:start + len(chunk)]]
+    return labels, distances
+
+
+def _cluster_sums(X, labels, k):
+    # Suma de las filas de cada grupo, columna por columna con bincount
+    return np.column_stack([np.bincount(labels, weights=X[:, j], minlength=k) for j in range(X.shape[1])])
+
+
+def kmeans_plus_plus(X, k, rng):
+    """
+    Centroides iniciales de k-means++: cada centro nuevo se elige con probabilidad
+    proporcional a la distancia cuadrada al centro más cercano ya elegido.
+    """
+    centroids = [X[rng.integers(len(X))]]
+    closest = _squared_distances(X, centroids[0][None, :])[:, 0]
+    for _ in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(X), p=closest / total) if total > 0 else rng.integers(len(X))
+        centroids.append(X[index])
+        closest = np.minimum(closest, _squared_distances(X, X[index][None, :])[:, 0])
+    return np.array(centroids)
+
+
+def kmeans(X, k, rng, max_iterations=DEFAULT_MAX_ITERATIONS, tolerance=DEFAULT_TOLERANCE, batch_size=None):
+    """
+    k-means vectorizado sobre las filas de ``X``.
+
+    Sin ``batch_size`` usa el algoritmo de Lloyd; con ``batch_size`` actualiza los
+    centroides con mini-lotes aleatorios (Sculley, 2010), con una tasa de aprendizaje por
+    centroide, y al final asigna todas las filas. Se detiene cuando el desplazamiento de
+    los centroides es menor que ``tolerance`` veces la varianza media de ``X``.
+
+    Devuelve ``(centroids, labels, distances, iterations)`` con ``distances`` la
+    distancia cuadrada de cada fila a su centroide.
+    """
+    threshold = tolerance * X.var(axis=0).mean()
+    if batch_size is None:
+        centroids = kmeans_plus_plus(X, k, rng)
+    else:
+        # La inicialización se hace sobre una muestra para no recorrer todas las filas k veces
+        sample = X[rng.choice(len(X), size=min(len(X), 10 * batch_size), replace=False)]
+        centroids = kmeans_plus_plus(sample, k, rng)
+        seen = np.zeros(k)
+
+    for iteration in range(1, max_iterations + 1):
+        if batch_size is None:
+            labels, _ = assign(X, centroids)
+            counts = np.bincount(labels, minlength=k)
+            sums = _cluster_sums(X, labels, k)
+            # Un grupo vacío conserva su centroide anterior
+            updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centroids)
+        else:
+            batch = X[rng.integers(len(X), size=batch_size)]
+            labels, _ = assign(batch, centroids)
+            counts = np.bincount(labels, minlength=k)
+            seen += counts
+            rate = np.divide(counts, seen, out=np.zeros(k), where=seen > 0)[:, None]
+            means = _cluster_sums(batch, labels, k) / np.maximum(counts, 1)[:, None]
+            updated = np.where(counts[:, None] > 0, (1 - rate) * centroids + rate * means, centroids)
+        shift = ((updated - centroids) ** 2).sum(axis=1).max()
+        centroids = updated
+        if shift <= threshold:
+            break
+
+    labels, distances = assign(X, centroids)
+    return centroids, labels, distances, iteration
+
+
+def latest_run(k, version=None):
+    """
+    Agrupamiento más reciente para ``k`` y la versión de los datos (la actual por defecto),
+    en cualquier estado. Uno fallido no se reintenta hasta que cambien los datos: con los
+    mismos datos fallaría otra vez (por ejemplo, con menos de ``k`` perfiles completos).
+    """
+    version = version or get_dataset_version()
+    return ClusteringRun.objects.filter(k=k, dataset_version=version).order_by('-created_at', '-id').first()
+
+
+def is_stale(run):
+    """
+    Indica si ``run`` lleva pendiente o en curso más de ``DASHBOARD_CLUSTERING_STALE_AFTER``
+    segundos, es decir, si ya no hay un trabajador que lo vaya a terminar.
+    """
+    if run.status not in (ClusteringRun.PENDING, ClusteringRun.RUNNING):
+        return False
+    stale_after = getattr(settings, 'DASHBOARD_CLUSTERING_STALE_AFTER', DEFAULT_STALE_AFTER)
+    return run.created_at < timezone.now() - timedelta(seconds=stale_after)
+
+
+def request_clustering(k):
+    """
+    Devuelve el agrupamiento de la versión actual de los datos para ``k``, encolando un
+    cálculo nuevo si todavía no existe (por ejemplo, después de una importación) o si el
+    último quedó abandonado (ver ``is_stale``).
+    """
+    version = get_dataset_version()
+    run = latest_run(k, version)
+    if run is not None and is_stale(run):
+        run.status = ClusteringRun.FAILED
+        run.error = 'Clustering run timed out.'
+        run.finished_at = timezone.now()
+        run.save(update_fields=['status', 'error', 'finished_at'])
+        run = None
+    if run is None:
+        run = ClusteringRun.objects.create(k=k, dataset_version=version)
+        submit(run_clustering, run.pk)
+        run.refresh_from_db()
+    return run
+
+
+def run_clustering(run_id):
+    run = ClusteringRun.objects.get(pk=run_id)
+
+    try:
+        # Dentro del try: si no se puede marcar como iniciado, el agrupamiento termina como fallido
+        run.status = ClusteringRun.RUNNING
+        run.started_at = timezone.now()
+        run.save(update_fields=['status', 'started_at'])
+
+        # Misma matriz de factores que la búsqueda de parecidos (una lectura por versión)
+        index = factor_index()
+        if len(index.ids) < run.k:
+            raise ValueError(f"At least {run.k} respondents with all 16 factors are required.")
+
+        threshold = getattr(settings, 'DASHBOARD_CLUSTERING_MINI_BATCH_THRESHOLD', DEFAULT_MINI_BATCH_THRESHOLD)
+        batch_size = DEFAULT_MINI_BATCH_SIZE if len(index.ids) > threshold else None
+        centroids, labels, distances, iterations = kmeans(
+            index.vectors, run.k, np.random.default_rng(run.pk), batch_size=batch_size
+        )
+
+        # Un lote por transacción, como las importaciones: el bloqueo de escritura de
+        # SQLite no se retiene mientras se guardan todas las asignaciones
+        rows = list(zip(index.ids.tolist(), labels.tolist(), np.sqrt(distances).tolist()))
+        for start in range(0, len(rows), ASSIGNMENT_BATCH_SIZE):
+            with transaction.atomic():
+                ClusterAssignment.objects.bulk_create([
+                    ClusterAssignment(run=run, respondent_id=respondent_id, cluster=cluster, distance=distance)
+                    for respondent_id, cluster, distance in rows[start:start + ASSIGNMENT_BATCH_SIZE]
+                ])
+
+        with transaction.atomic():
+            run.status = ClusteringRun.SUCCEEDED
+            run.algorithm = 'lloyd' if batch_size is None else 'mini-batch'
+            run.respondents = len(index.ids)
+            run.centroids = [dict(zip(PERSONALITY_COLUMNS, centroid.tolist())) for centroid in centroids]
+            run.sizes = np.bincount(labels, minlength=run.k).tolist()
+            run.inertia = float(distances.sum())
+            run.iterations = iterations
+            run.finished_at = timezone.now()
+            run.save()
+            # Solo se conserva el último agrupamiento terminado para cada k
+            ClusteringRun.objects.filter(
+                k=run.k, status__in=[ClusteringRun.SUCCEEDED, ClusteringRun.FAILED]
+            ).exclude(pk=run.pk).delete()
+    except Exception as e:
+        run.status = ClusteringRun.FAILED
+        run.error = str(e)
+        run.finished_at = timezone.now()
+        run.save()
+        # Las asignaciones de los lotes ya guardados no sirven sin el resto
+        ClusterAssignment.objects.filter(run=run).delete()
+        # De los fallidos para cada k solo se conserva el último
+        ClusteringRun.objects.filter(k=run.k, status=ClusteringRun.FAILED).exclude(pk=run.pk).delete()
+    return run
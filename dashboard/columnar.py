@@ -0,0 +1,67 @@
+from .exceptions import InvalidParameter
+from .models import PERSONALITY_COLUMNS, CATEGORIZATION_COLUMNS
+
+SHAPES = ['rows', 'columnar']
+
+# Nombre de cada columna en la forma columnar; las demás conservan el nombre de la fila
+COLUMN_NAMES = {
+    'id': 'ids',
+    'annotated_respondent_id': 'ids',
+    'name': 'names',
+    'respondent_name': 'names',
+}
+
+# Columnas con puntajes o distancias: siempre double en Arrow, aunque todos sus valores
+# sean nulos (la inferencia les daría el tipo null)
+FLOAT_COLUMNS = frozenset(
+    ['factor1', 'factor2', 'category1', 'category2', 'distance'] + PERSONALITY_COLUMNS + CATEGORIZATION_COLUMNS
+)
+
+
+def wants_columnar(request):
+    """
+    ``?shape=columnar`` pide las filas como un objeto con una lista por columna
+    (``{"ids": [...], "names": [...], "factor1": [...]}``) en lugar de una lista de
+    objetos que repite las claves en cada fila. Es la forma por defecto con los
+    renderers binarios (Arrow, MessagePack), que tienen ``columnar = True``.
+    """
+    shape = request.query_params.get('shape')
+    if shape is None:
+        return getattr(getattr(request, 'accepted_renderer', None), 'columnar', False)
+    if shape not in SHAPES:
+        raise InvalidParameter(f"Invalid shape. Valid shapes are: {', '.join(SHAPES)}.")
+    return shape == 'columnar'
+
+
+def value_names(queryset):
+    """
+    Claves de las filas de un queryset ``.values()``, en el orden en que Django las devuelve.
+    """
+    query = queryset.query
+    return [*query.extra_select, *query.values_select, *query.annotation_select]
+
+
+def columns_from_tuples(rows, names):
+    """
+    Convierte filas ``values_list`` en el objeto columnar.
+    """
+    # Una lista por comprensión por columna: ``zip(*rows)`` es varias veces más lento
+    # con cientos de miles de filas
+    rows = rows if isinstance(rows, list) else list(rows)
+    return {COLUMN_NAMES.get(name, name): [row[i] for row in rows] for i, name in enumerate(names)}
+
+
+def columnar_queryset(queryset):
+    """
+    Columnas de un queryset ``.values()`` leídas con ``values_list``: sin crear un dict por fila.
+    """
+    names = value_names(queryset)
+    return columns_from_tuples(queryset.values_list(*names), names)
+
+
+async def acolumnar_queryset(queryset):
+    """
+    ``columnar_queryset`` con el ORM asíncrono.
+    """
+    names = value_names(queryset)
+    return columns_from_tuples([row async for row in queryset.values_list(*names)], names)
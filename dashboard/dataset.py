@@ -0,0 +1,113 @@
+import contextlib
+import contextvars
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import DatasetVersion
+
+VERSION_ID = 1
+
+# Versión fijada para la petición en curso (ver ``pinned_version``)
+_pinned_version = contextvars.ContextVar('dashboard_pinned_version', default=None)
+
+# Últimos resultados calculados en este proceso: nombre -> (versión, valor)
+_local_results = {}
+
+
+def _new_version():
+    # Marca de tiempo en nanosegundos, en hexadecimal
+    return f'{time.time_ns():x}'
+
+
+def _versions():
+    return DatasetVersion.objects.filter(pk=VERSION_ID).values_list('version', flat=True)
+
+
+def _create_version():
+    return DatasetVersion.objects.get_or_create(pk=VERSION_ID, defaults={'version': _new_version()})[0].version
+
+
+def get_dataset_version():
+    """
+    Versión actual de los datos. Cambia cada vez que se modifican respondientes o
+    puntajes, así que sirve como parte de la clave de cualquier resultado en caché.
+
+    Se guarda en la base de datos (``DatasetVersion``) y no en la caché: con varios
+    procesos (gunicorn, uvicorn con ``--workers``) la importación corre en uno solo y
+    todos deben ver la versión nueva. Las cachés de respuestas y resultados pueden ser
+    locales a cada proceso o compartidas, porque sus claves llevan la versión.
+    """
+    version = _pinned_version.get()
+    if version is None:
+        version = _versions().first() or _create_version()
+    return version
+
+
+async def aget_dataset_version():
+    """
+    ``get_dataset_version`` para las vistas asíncronas.
+    """
+    version = _pinned_version.get()
+    if version is None:
+        version = await _versions().afirst() or await sync_to_async(_create_version)()
+    return version
+
+
+@contextlib.contextmanager
+def pinned_version(version):
+    """
+    Dentro del bloque ``get_dataset_version`` devuelve ``version`` sin consultarla: una
+    petición lee la versión una vez y todo lo que calcula queda asociado a ella.
+    """
+    token = _pinned_version.set(version)
+    try:
+        yield
+    finally:
+        _pinned_version.reset(token)
+
+
+def version_timestamp(version):
+    """
+    Momento (segundos desde la época) en que se creó ``version``.
+    """
+    return int(version, 16) / 1e9
+
+
+def bump_dataset_version():
+    """
+    Marca los datos como modificados.
+
+    La versión nueva se escribe en la transacción de los cambios, así que los demás
+    procesos la ven exactamente cuando ven los datos. Cada cambio la reescribe (es una
+    sola fila): lo calculado dentro de la transacción antes del último cambio queda
+    asociado a una versión que nunca se confirma.
+    """
+    if not DatasetVersion.objects.filter(pk=VERSION_ID).update(version=_new_version()):
+        _create_version()
+
+
+def versioned(name, compute, shared=True):
+    """
+    Devuelve el resultado de ``compute()`` para la versión actual de los datos,
+    calculándolo solo si la versión cambió.
+
+    El último resultado se guarda en memoria del proceso, así que las consultas
+    repetidas solo leen la versión (nada si la petición ya la fijó). Con ``shared``
+    también se guarda en la caché de Django para que otros procesos lo reutilicen.
+    """
+    version = get_dataset_version()
+    entry = _local_results.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    cache_key = f'dashboard:{name}:{version}'
+    value = cache.get(cache_key) if shared else None
+    if value is None:
+        value = compute()
+        if shared:
+            cache.set(cache_key, value, getattr(settings, 'DASHBOARD_RESULTS_CACHE_TIMEOUT', None))
+    _local_results[name] = (version, value)
+    return value
@@ -0,0 +1,14 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class InvalidParameter(APIException):
+    """
+    Parámetro de consulta inválido. Se responde con el mismo formato ``{"error": ...}``
+    que usan las vistas.
+    """
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = 'invalid'
+
+    def __init__(self, message):
+        super().__init__({'error': message})
@@ -0,0 +1,257 @@
+import csv
+import io
+import zipfile
+from xml.sax.saxutils import escape
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+
+from .analytics import SCORE_COLUMNS, SCORE_LOOKUPS
+from .models import Respondent
+from .readers import ARROW, CSV, FORMAT_LABELS, PARQUET, XLSX, import_pyarrow
+from .renderers import ARROW_STREAM_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, import_msgpack
+
+MSGPACK = 'msgpack'
+
+EXPORT_COLUMNS = ['id', 'name', 'age', 'gender'] + SCORE_COLUMNS
+EXPORT_FORMATS = [CSV, XLSX, PARQUET, ARROW, MSGPACK]
+EXPORT_CONTENT_TYPES = {
+    CSV: 'text/csv',
+    XLSX: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    PARQUET: 'application/vnd.apache.parquet',
+    ARROW: ARROW_STREAM_MEDIA_TYPE,
+    MSGPACK: MSGPACK_MEDIA_TYPE,
+}
+DEFAULT_CHUNK_SIZE = 5000
+
+# Partes fijas del .xlsx: un libro con una sola hoja, sin estilos ni cadenas compartidas
+# (los textos van en línea en cada celda)
+XLSX_SHEET = 'xl/worksheets/sheet1.xml'
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Respondents" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+def export_rows(filters=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Filas de la tabla unida respondiente + factores + categorización (en el orden de
+    ``EXPORT_COLUMNS``), leídas por bloques con ``.iterator()``.
+    """
+    rows = Respondent.objects.filter(**(filters or {})).order_by('id').values_list(
+        'id', 'name', 'age', 'gender', *SCORE_LOOKUPS
+    )
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Pipe(io.RawIOBase):
+    """
+    Archivo de solo escritura que acumula lo escrito hasta que se retira con ``drain``.
+    Permite enviar por partes lo que produce un escritor que espera un archivo.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def csv_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in _batches(rows, chunk_size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _xlsx_cell(reference, value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        text = escape(ILLEGAL_CHARACTERS_RE.sub('', value))
+        return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    return f'<c r="{reference}"><v>{value!r}</v></c>'
+
+
+def _xlsx_rows(rows, first_row):
+    letters = [get_column_letter(i + 1) for i in range(len(EXPORT_COLUMNS))]
+    return ''.join(
+        f'<row r="{number}">'
+        + ''.join(_xlsx_cell(f'{letter}{number}', value) for letter, value in zip(letters, row))
+        + '</row>'
+        for number, row in enumerate(rows, start=first_row)
+    )
+
+
+def xlsx_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    # El .xlsx es un zip: las partes fijas van primero y la hoja se comprime y se envía
+    # por bloques de filas a medida que se leen (el zip, sin posiciones conocidas de
+    # antemano, lleva los tamaños de cada parte después de sus datos)
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open(XLSX_SHEET, 'w', force_zip64=True) as sheet:
+            sheet.write((XLSX_SHEET_START + _xlsx_rows([EXPORT_COLUMNS], 1)).encode())
+            yield pipe.drain()
+            written = 1
+            for batch in _batches(rows, chunk_size):
+                sheet.write(_xlsx_rows(batch, written + 1).encode())
+                written += len(batch)
+                yield pipe.drain()
+            sheet.write(XLSX_SHEET_END.encode())
+    yield pipe.drain()
+
+
+def _arrow_schema(pa):
+    return pa.schema(
+        [('id', pa.int64()), ('name', pa.string()), ('age', pa.int64()), ('gender', pa.string())]
+        + [(col, pa.float64()) for col in SCORE_COLUMNS]
+    )
+
+
+def _arrow_batches(pa, schema, rows, chunk_size):
+    # Columnas tipadas armadas directamente desde las tuplas de ``values_list``
+    for batch in _batches(rows, chunk_size):
+        columns = [pa.array([row[i] for row in batch], type=field.type) for i, field in enumerate(schema)]
+        yield pa.Table.from_arrays(columns, schema=schema)
+
+
+def parquet_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Un row group por bloque, enviado apenas se escribe
+    pa = import_pyarrow('Parquet')
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(pa)
+    pipe = _Pipe()
+    writer = pq.ParquetWriter(pipe, schema)
+    for table in _arrow_batches(pa, schema, rows, chunk_size):
+        writer.write_table(table)
+        yield pipe.drain()
+    writer.close()
+    yield pipe.drain()
+
+
+def arrow_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Formato de streaming IPC: un record batch por bloque
+    pa = import_pyarrow('Arrow')
+
+    schema = _arrow_schema(pa)
+    pipe = _Pipe()
+    writer = pa.ipc.new_stream(pipe, schema)
+    for table in _arrow_batches(pa, schema, rows, chunk_size):
+        writer.write_table(table)
+        yield pipe.drain()
+    writer.close()
+    yield pipe.drain()
+
+
+def msgpack_chunks(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Una secuencia de objetos MessagePack, uno por bloque, con una lista por columna
+    # (se leen con ``msgpack.Unpacker``)
+    packer = import_msgpack().Packer(use_bin_type=True)
+    for batch in _batches(rows, chunk_size):
+        yield packer.pack({col: [row[i] for row in batch] for i, col in enumerate(EXPORT_COLUMNS)})
+
+
+EXPORT_WRITERS = {
+    CSV: csv_chunks,
+    XLSX: xlsx_chunks,
+    PARQUET: parquet_chunks,
+    ARROW: arrow_chunks,
+    MSGPACK: msgpack_chunks,
+}
+
+
+def export_chunks(file_format, rows):
+    """
+    Generador con los bytes del archivo exportado. Las dependencias opcionales se
+    verifican antes de empezar (``ValueError`` si faltan), no a mitad de la respuesta.
+    """
+    if file_format in (PARQUET, ARROW):
+        import_pyarrow(FORMAT_LABELS[file_format])
+    elif file_format == MSGPACK:
+        import_msgpack()
+    return EXPORT_WRITERS[file_format](rows)
+
+
+def accepted_export_format(accept):
+    """
+    Primer formato de exportación cuyo tipo de contenido aparece en el encabezado
+    ``Accept``, o None.
+    """
+    formats = {content_type: file_format for file_format, content_type in EXPORT_CONTENT_TYPES.items()}
+    for media_range in accept.split(','):
+        file_format = formats.get(media_range.split(';')[0].strip())
+        if file_format is not None:
+            return file_format
+    return None
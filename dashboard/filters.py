@@ -0,0 +1,110 @@
+from .analytics import SCORE_COLUMNS, SCORE_LOOKUPS
+from .exceptions import InvalidParameter
+from .validation import GENDER_MAP
+
+# Claves de la definición de una cohorte, por ejemplo ``gender:F,age_min:18,label:Mujeres``
+COHORT_KEYS = ('label', 'gender', 'age_min', 'age_max', 'import_job')
+
+# Operadores de los predicados ``<columna>__<op>=<valor>``
+PREDICATE_OPERATORS = {'gt': 'gt', 'gte': 'gte', 'lt': 'lt', 'lte': 'lte', 'eq': 'exact'}
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidParameter(f"'{name}' must be an integer.")
+
+
+def bounded_int_param(params, name, default, minimum, maximum):
+    """
+    Parámetro entero con valor por defecto, validado dentro de ``[minimum, maximum]``.
+    """
+    value = _int_param(params, name)
+    if value is None:
+        return default
+    if not minimum <= value <= maximum:
+        raise InvalidParameter(f"'{name}' must be between {minimum} and {maximum}.")
+    return value
+
+
+def respondent_filters(params, prefix=''):
+    """
+    Traduce los parámetros ``gender``, ``age_min`` y ``age_max`` a argumentos de
+    ``filter()``. ``prefix`` es la ruta hasta Respondent (por ejemplo ``'respondent__'``).
+    """
+    filters = {}
+    gender = params.get('gender')
+    if gender:
+        filters[f'{prefix}gender'] = GENDER_MAP.get(gender.strip().lower(), gender)
+
+    age_min = _int_param(params, 'age_min')
+    age_max = _int_param(params, 'age_max')
+    if age_min is not None and age_max is not None and age_min > age_max:
+        raise InvalidParameter("'age_min' cannot be greater than 'age_max'.")
+    if age_min is not None:
+        filters[f'{prefix}age__gte'] = age_min
+    if age_max is not None:
+        filters[f'{prefix}age__lte'] = age_max
+    return filters
+
+
+def parse_cohort(spec):
+    """
+    Traduce una definición de cohorte (pares ``clave:valor`` separados por comas, con
+    las claves de ``COHORT_KEYS``) a ``(label, filters)``: ``filters`` tiene el formato
+    de ``respondent_filters`` más ``import_job``. Sin ``label``, la etiqueta es la
+    propia definición.
+    """
+    params = {}
+    for part in spec.split(','):
+        key, separator, value = part.partition(':')
+        key = key.strip()
+        if not separator or key not in COHORT_KEYS:
+            raise InvalidParameter(
+                f"Invalid cohort '{spec}'. Use comma-separated key:value pairs with keys: {', '.join(COHORT_KEYS)}."
+            )
+        params[key] = value.strip()
+
+    filters = respondent_filters(params)
+    import_job = _int_param(params, 'import_job')
+    if import_job is not None:
+        filters['import_job'] = import_job
+    return params.get('label') or spec, filters
+
+
+def score_predicates(params, reserved=()):
+    """
+    Traduce los parámetros ``<columna>__<op>=<valor>`` (por ejemplo ``A__gte=7``) a
+    argumentos de ``filter()`` sobre Respondent. Devuelve ``(filters, columns)``, con
+    las columnas usadas en el orden en que aparecen.
+
+    Cualquier parámetro que no esté en ``reserved`` debe ser un predicado válido.
+    """
+    filters = {}
+    columns = []
+    for key in params:
+        if key in reserved:
+            continue
+        column, _, operator = key.partition('__')
+        if column not in SCORE_COLUMNS:
+            raise InvalidParameter(
+                f"Invalid factor or category '{column}'. Valid values are: {', '.join(SCORE_COLUMNS)}."
+            )
+        if operator not in PREDICATE_OPERATORS:
+            raise InvalidParameter(
+                f"Invalid operator in '{key}'. Valid operators are: {', '.join(PREDICATE_OPERATORS)}."
+            )
+        try:
+            value = float(params.get(key))
+        except ValueError:
+            raise InvalidParameter(f"'{key}' must be a number.")
+
+        lookup = SCORE_LOOKUPS[SCORE_COLUMNS.index(column)]
+        filters[f'{lookup}__{PREDICATE_OPERATORS[operator]}'] = value
+        if column not in columns:
+            columns.append(column)
+    return filters, columns
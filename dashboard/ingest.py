@@ -0,0 +1,210 @@
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .aggregates import apply_score_deltas, score_sums
+from .analytics import SCORE_COLUMNS, SCORE_LOOKUPS
+from .dataset import bump_dataset_version
+from .models import Respondent, PersonalityFactors, Categorization, PERSONALITY_COLUMNS, CATEGORIZATION_COLUMNS
+from .validation import validate_frame
+
+# Columnas requeridas en cualquier archivo de importación
+REQUIRED_COLUMNS = ['name', 'age', 'gender'] + PERSONALITY_COLUMNS + CATEGORIZATION_COLUMNS
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_ERRORS = 1000
+
+
+def missing_columns(columns):
+    """
+    Devuelve las columnas requeridas que no están presentes en ``columns``.
+    """
+    return [col for col in REQUIRED_COLUMNS if col not in columns]
+
+
+class BulkImporter:
+    """
+    Motor de importación masiva.
+
+    Valida cada bloque completo con ``validate_frame`` y escribe las filas válidas por
+    lotes en Respondent, PersonalityFactors y Categorization con ``bulk_create`` e
+    ``INSERT ... ON CONFLICT DO UPDATE`` sobre las claves únicas (nombre del respondiente
+    y respondiente de cada puntaje): cada lote cuesta un número fijo de consultas, sin
+    importar cuántas filas tenga. ``write`` debe usarse dentro de una transacción
+    atómica (ver ``import_dataframe``); ``write_chunk`` abre una por bloque.
+    """
+
+    def __init__(self, batch_size=None, job=None):
+        self.job = job  # ImportJob que se registra en los respondientes escritos
+        self.batch_size = batch_size or getattr(settings, 'DASHBOARD_IMPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+        self.max_errors = getattr(settings, 'DASHBOARD_IMPORT_MAX_ERRORS', DEFAULT_MAX_ERRORS)
+        # Contador para nombres automáticos
+        self.next_auto_number = Respondent.objects.count() + 1
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.rejected = 0
+        # Solo se guardan los primeros errores; ``rejected`` lleva la cuenta total
+        self.errors = []
+        # Cambios pendientes en ScoreAggregate: sumas de los valores nuevos menos las de
+        # los valores reemplazados (ver ``apply_score_deltas``)
+        self.score_deltas = score_sums(pd.DataFrame())
+        # Filas escritas ya reflejadas en ScoreAggregate y en la versión de los datos
+        self.flushed = 0
+
+    def write(self, frame):
+        self.write_valid(self.validate(frame))
+
+    def write_chunk(self, frame):
+        """
+        Valida ``frame`` fuera de la transacción y lo escribe en una transacción propia,
+        junto con sus cambios en ScoreAggregate y en la versión de los datos. El bloqueo
+        de escritura de SQLite solo se toma mientras se escribe el bloque. Si falla, los
+        contadores y los errores vuelven a los del último bloque guardado.
+        """
+        saved = (self.rows, self.created, self.updated, self.rejected, len(self.errors),
+                 self.next_auto_number, self.flushed)
+        try:
+            valid = self.validate(frame)
+            with transaction.atomic():
+                if valid['name'].isna().any():
+                    # Otras importaciones pueden haber creado respondientes desde el bloque anterior
+                    self.next_auto_number = max(self.next_auto_number, Respondent.objects.count() + 1)
+                self.write_valid(valid)
+                self.flush()
+        except Exception:
+            (self.rows, self.created, self.updated, self.rejected, errors,
+             self.next_auto_number, self.flushed) = saved
+            del self.errors[errors:]
+            self.score_deltas = score_sums(pd.DataFrame())
+            raise
+
+    def flush(self):
+        """
+        Aplica a ScoreAggregate los cambios acumulados y, si se escribieron filas, cambia
+        la versión de los datos. Debe usarse en la transacción que escribió las filas.
+        """
+        apply_score_deltas(self.score_deltas)
+        self.score_deltas = score_sums(pd.DataFrame())
+        if self.created + self.updated > self.flushed:
+            bump_dataset_version()
+            self.flushed = self.created + self.updated
+
+    def validate(self, frame):
+        """
+        Valida ``frame`` y devuelve sus filas válidas; no consulta la base de datos.
+        """
+        # Número de fila en el archivo de la primera fila del bloque (la fila 1 es el encabezado)
+        valid, rejected, errors = validate_frame(
+            frame, first_row=self.rows + 2, max_errors=self.max_errors - len(self.errors)
+        )
+        self.rows += len(frame)
+        self.rejected += rejected
+        self.errors.extend(errors)
+        return valid
+
+    def write_valid(self, valid):
+        # Contador para nombres automáticos
+        unnamed = valid['name'].isna()
+        count = int(unnamed.sum())
+        if count:
+            valid.loc[unnamed, 'name'] = [
+                f"Estudiante {number}" for number in range(self.next_auto_number, self.next_auto_number + count)
+            ]
+            self.next_auto_number += count
+
+        # Si un nombre se repite, la última fila gana (como con update_or_create)
+        valid = valid.drop_duplicates('name', keep='last')
+        self.score_deltas = self.score_deltas.add(score_sums(valid), fill_value=0)
+        # Los NaN de pandas se guardan como NULL
+        valid = valid.astype(object).where(valid.notna(), None)
+
+        for start in range(0, len(valid), self.batch_size):
+            self.write_batch(valid.iloc[start:start + self.batch_size])
+
+    def write_batch(self, batch):
+        records = {record['name']: record for record in batch.to_dict('records')}
+        respondents = self._upsert_respondents(records)
+        self._upsert_scores(PersonalityFactors, PERSONALITY_COLUMNS, respondents, records)
+        self._upsert_scores(Categorization, CATEGORIZATION_COLUMNS, respondents, records)
+
+    def _upsert_respondents(self, records):
+        # Respondientes ya registrados (usa el índice único): distinguen altas de
+        # actualizaciones y sus valores anteriores se descuentan de ScoreAggregate
+        existing = pd.DataFrame.from_records(
+            list(Respondent.objects.filter(name__in=list(records)).values_list('name', 'gender', 'age', *SCORE_LOOKUPS)),
+            columns=['name', 'gender', 'age'] + SCORE_COLUMNS,
+        )
+        self.score_deltas = self.score_deltas.sub(score_sums(existing), fill_value=0)
+
+        respondents = {
+            name: Respondent(name=name, age=record['age'], gender=record['gender'], import_job=self.job)
+            for name, record in records.items()
+        }
+        # INSERT ... ON CONFLICT (name) DO UPDATE: también es seguro con importaciones concurrentes
+        objs = list(respondents.values())
+        update_fields = ['age', 'gender'] if self.job is None else ['age', 'gender', 'import_job']
+        Respondent.objects.bulk_create(
+            objs, batch_size=self.batch_size,
+            update_conflicts=True, unique_fields=['name'], update_fields=update_fields,
+        )
+        if objs[0].pk is None:
+            # El backend no devuelve las claves primarias de un INSERT masivo
+            ids = dict(Respondent.objects.filter(name__in=list(respondents)).values_list('name', 'id'))
+            for respondent in objs:
+                respondent.pk = ids[respondent.name]
+
+        self.created += len(records) - len(existing)
+        self.updated += len(existing)
+        return respondents
+
+    def _upsert_scores(self, model, columns, respondents, records):
+        objs = [
+            model(respondent=respondents[name], **{col: record[col] for col in columns})
+            for name, record in records.items()
+        ]
+        # INSERT ... ON CONFLICT (respondent_id) DO UPDATE
+        model.objects.bulk_create(
+            objs, batch_size=self.batch_size,
+            update_conflicts=True, unique_fields=['respondent'], update_fields=columns,
+        )
+
+
+def import_dataframe(frame, batch_size=None):
+    """
+    Importa un DataFrame completo en una única transacción atómica.
+    """
+    return import_chunks([frame], batch_size)
+
+
+def import_chunks(chunks, batch_size=None, progress=None, job=None, atomic=True, importer=None):
+    """
+    Importa una secuencia de DataFrames (por ejemplo, los bloques de un lector en
+    streaming) en una única transacción atómica. Solo un bloque está en memoria a la vez.
+
+    Con ``atomic=False`` cada bloque se guarda en su propia transacción: el bloqueo de
+    escritura de SQLite se libera entre bloques, así que las demás escrituras no esperan
+    a que termine la importación completa, pero si falla quedan guardados los bloques
+    anteriores.
+
+    ``progress`` se llama después de cada bloque con el número de filas procesadas. Si se
+    indica ``job``, los respondientes creados o actualizados quedan asociados a él. Con
+    ``atomic=False`` puede pasarse el ``importer`` para leer sus contadores (lo guardado
+    hasta el momento) aunque la importación falle.
+    """
+    if not atomic:
+        importer = importer or BulkImporter(batch_size, job=job)
+        for chunk in chunks:
+            importer.write_chunk(chunk)
+            if progress is not None:
+                progress(importer.rows)
+        return importer
+
+    with transaction.atomic():
+        importer = BulkImporter(batch_size, job=job)
+        for chunk in chunks:
+            importer.write(chunk)
+            if progress is not None:
+                progress(importer.rows)
+        importer.flush()
+    return importer
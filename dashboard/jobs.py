@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .ingest import DEFAULT_BATCH_SIZE, BulkImporter, import_chunks
+from .metrics import record_import
+from .models import ImportJob
+from .readers import open_reader
+
+DEFAULT_WORKERS = 2
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_import_executor = None
+_executor_lock = threading.Lock()
+
+# Filas procesadas por los trabajos en curso de este proceso (el avance no se guarda en
+# la base de datos para no escribir en ella después de cada bloque).
+_progress = {}
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DASHBOARD_IMPORT_WORKERS', DEFAULT_WORKERS),
+                thread_name_prefix='import-job',
+            )
+        return _executor
+
+
+def get_import_executor():
+    """
+    Pool de las importaciones. Con SQLite, que admite una sola escritura a la vez, es un
+    hilo dedicado: las importaciones se ejecutan de a una en lugar de alternar sus bloques,
+    y las que esperan turno no ocupan los hilos de ``get_executor`` (agrupamientos).
+    """
+    global _import_executor
+    if connection.vendor != 'sqlite':
+        return get_executor()
+    with _executor_lock:
+        if _import_executor is None:
+            _import_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='import-job-sqlite')
+        return _import_executor
+
+
+def get_progress(job_id):
+    return _progress.get(job_id)
+
+
+def submit(function, pk, executor=get_executor):
+    """
+    Encola ``function(pk)`` en el pool que devuelve ``executor`` (por defecto el de los
+    trabajadores generales). Con ``DASHBOARD_IMPORT_JOBS_EAGER`` se ejecuta en el mismo
+    hilo (útil en pruebas).
+    """
+    if getattr(settings, 'DASHBOARD_IMPORT_JOBS_EAGER', False):
+        function(pk)
+    else:
+        # Esperar a que el trabajo esté guardado antes de que otro hilo lo lea
+        transaction.on_commit(lambda: executor().submit(_run_in_worker, function, pk))
+
+
+def submit_import(job):
+    submit(run_import, job.pk, executor=get_import_executor)
+
+
+def _run_in_worker(function, pk):
+    try:
+        function(pk)
+    except Exception:
+        # El pool descarta las excepciones de las tareas
+        logger.exception('Background job %s(%s) failed', function.__name__, pk)
+    finally:
+        # Cada hilo del pool abre su propia conexión
+        connection.close()
+
+
+def run_import(job_id):
+    job = ImportJob.objects.get(pk=job_id)
+    start = time.perf_counter()
+    importer = None
+
+    def progress(rows):
+        _progress[job.pk] = rows
+
+    chunk_size = getattr(settings, 'DASHBOARD_IMPORT_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    try:
+        # Dentro del try: si no se puede marcar como iniciado, el trabajo termina como fallido
+        job.status = ImportJob.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+        _progress[job.pk] = 0
+        importer = BulkImporter(job=job)
+        with job.file.open('rb') as file, open_reader(file, job.original_name, chunk_size) as reader:
+            # Un bloque por transacción: la importación no retiene el bloqueo de escritura
+            # de SQLite, y las subidas y los demás trabajos pueden guardarse mientras corre
+            import_chunks(reader, progress=progress, atomic=False, importer=importer)
+    except Exception as e:
+        job.status = ImportJob.FAILED
+        job.error = str(e)
+    else:
+        job.status = ImportJob.SUCCEEDED
+    finally:
+        if importer is not None:
+            # También si falló: los bloques anteriores quedaron guardados
+            job.rows_processed = importer.rows
+            job.rows_created = importer.created
+            job.rows_updated = importer.updated
+            job.rows_rejected = importer.rejected
+            job.errors = importer.errors
+        job.finished_at = timezone.now()
+        # El archivo subido solo hace falta para importarlo
+        job.file.delete(save=False)
+        job.save()
+        _progress.pop(job.pk, None)
+        record_import(job.status, time.perf_counter() - start, importer)
+    return job
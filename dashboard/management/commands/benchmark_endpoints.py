@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from ...benchmarks import READ_ENDPOINTS, measure, resolve_endpoint
+from ...models import Respondent
+from ...synthetic import populate
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la velocidad de importación y la latencia de los endpoints de lectura con '
+        'cohortes sintéticas de distintos tamaños. Los datos se revierten al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--endpoints', nargs='+', choices=[name for name, *_ in READ_ENDPOINTS],
+                            help='Medir solo estos endpoints.')
+
+    def handle(self, *args, **options):
+        endpoints = [e for e in READ_ENDPOINTS if not options['endpoints'] or e[0] in options['endpoints']]
+        # Sin caché de respuestas, para medir el cálculo completo de cada petición
+        with override_settings(ALLOWED_HOSTS=['testserver'], DASHBOARD_RESPONSE_CACHE=None):
+            client = Client()
+            for size in options['sizes']:
+                # Todo se revierte para no dejar datos sintéticos en la base
+                with transaction.atomic():
+                    start = time.perf_counter()
+                    populate(size)
+                    elapsed = time.perf_counter() - start
+                    self.stdout.write(f"\n{size:,} rows: import {size / elapsed:,.0f} rows/s ({elapsed:.1f} s)")
+                    self.stdout.write(f"{'endpoint':<32}{'status':>8}{'queries':>9}{'budget':>8}{'median ms':>12}")
+
+                    ids = list(Respondent.objects.filter(name__startswith='Synthetic').order_by('id').values_list('id', flat=True)[:50])
+                    for name, path, params, budget in endpoints:
+                        status, queries, median = measure(client, *resolve_endpoint(path, params, ids), options['repeat'])
+                        flag = '' if queries <= budget else '  over budget'
+                        self.stdout.write(f"{name:<32}{status:>8}{queries:>9}{budget:>8}{median:>12.1f}{flag}")
+                    transaction.set_rollback(True)
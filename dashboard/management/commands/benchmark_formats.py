@@ -0,0 +1,51 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...ingest import DEFAULT_BATCH_SIZE, import_chunks
+from ...readers import open_reader
+from ...synthetic import WRITERS, synthetic_frame
+
+
+class Command(BaseCommand):
+    help = 'Mide filas/segundo de lectura e importación para cada formato soportado.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--formats', nargs='+', choices=list(WRITERS), default=list(WRITERS))
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--skip-import', action='store_true',
+                            help='Medir solo la lectura, sin escribir en la base de datos.')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        frame = synthetic_frame(rows)
+        self.stdout.write(f"{'format':<10}{'size (KB)':>12}{'parse rows/s':>16}{'import rows/s':>16}")
+
+        for file_format in options['formats']:
+            buffer = io.BytesIO()
+            WRITERS[file_format](frame, buffer)
+            size = buffer.tell()
+
+            buffer.seek(0)
+            start = time.perf_counter()
+            with open_reader(buffer, f'benchmark.{file_format}', options['chunk_size'], file_format) as reader:
+                for _ in reader:
+                    pass
+            parse_rate = rows / (time.perf_counter() - start)
+
+            import_rate = None
+            if not options['skip_import']:
+                buffer.seek(0)
+                # La importación se revierte para no dejar datos sintéticos en la base
+                with transaction.atomic():
+                    start = time.perf_counter()
+                    with open_reader(buffer, f'benchmark.{file_format}', options['chunk_size'], file_format) as reader:
+                        import_chunks(reader)
+                    import_rate = rows / (time.perf_counter() - start)
+                    transaction.set_rollback(True)
+
+            import_column = f"{import_rate:>16,.0f}" if import_rate is not None else f"{'-':>16}"
+            self.stdout.write(f"{file_format:<10}{size / 1024:>12.1f}{parse_rate:>16,.0f}{import_column}")
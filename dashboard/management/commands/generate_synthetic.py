@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...readers import CSV
+from ...synthetic import WRITERS, populate, synthetic_frame
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera una cohorte sintética del 16PF: la escribe en un archivo de importación '
+        '(--output) o la carga en la base de datos (--populate).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--format', dest='file_format', choices=list(WRITERS), default=CSV)
+        parser.add_argument('--output', help='Ruta del archivo a generar.')
+        parser.add_argument('--populate', action='store_true',
+                            help='Cargar la cohorte en la base de datos con el importador masivo.')
+
+    def handle(self, *args, **options):
+        if not options['output'] and not options['populate']:
+            raise CommandError('Use --output and/or --populate.')
+        rows = options['rows']
+
+        if options['output']:
+            with open(options['output'], 'wb') as file:
+                WRITERS[options['file_format']](synthetic_frame(rows, seed=options['seed']), file)
+            self.stdout.write(f"{rows} rows written to {options['output']}")
+
+        if options['populate']:
+            start = time.perf_counter()
+            result = populate(rows, seed=options['seed'])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{result.created} created, {result.updated} updated in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s)"
+            )
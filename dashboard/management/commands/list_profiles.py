@@ -0,0 +1,52 @@
+import pstats
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...profiling import list_profiles, profile_path
+
+SORT_KEYS = ['cumulative', 'tottime', 'ncalls']
+
+
+class Command(BaseCommand):
+    help = (
+        'Lista los perfiles guardados por ProfilingMiddleware. Con --show muestra las funciones '
+        'más costosas y las consultas SQL más lentas de uno de ellos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--show', metavar='ID', help='Id del perfil a resumir.')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='cumulative')
+        parser.add_argument('--limit', type=int, default=25, help='Funciones y consultas a mostrar.')
+
+    def handle(self, *args, **options):
+        profiles = list_profiles()
+        if options['show']:
+            profile = next((p for p in profiles if p['id'] == options['show']), None)
+            if profile is None:
+                raise CommandError(f"Profile {options['show']} not found")
+            self.show(profile, options['sort'], options['limit'])
+            return
+
+        if not profiles:
+            self.stdout.write('No stored profiles')
+            return
+        self.stdout.write(f"{'id':<32}{'status':>7}{'ms':>10}{'sql ms':>10}{'queries':>9}  request")
+        for p in profiles:
+            self.stdout.write(
+                f"{p['id']:<32}{p['status']:>7}{p['ms']:>10.1f}{p['sql_ms']:>10.1f}{len(p['queries']):>9}"
+                f"  {p['method']} {p['path']}"
+            )
+
+    def show(self, profile, sort, limit):
+        self.stdout.write(f"{profile['method']} {profile['path']} -> {profile['status']} ({profile['created']})")
+        self.stdout.write(
+            f"{profile['ms']:.1f} ms total, {profile['sql_ms']:.1f} ms in {len(profile['queries'])} SQL queries\n"
+        )
+        stats = pstats.Stats(str(profile_path(profile['id'])), stream=self.stdout)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+
+        slowest = sorted(profile['queries'], key=lambda query: query['ms'], reverse=True)[:limit]
+        if slowest:
+            self.stdout.write('Slowest queries:')
+            for query in slowest:
+                self.stdout.write(f"{query['ms']:>10.2f} ms  [{query['alias']}] {query['sql']}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from ...aggregates import rebuild_aggregates
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde cero las sumas por género y rango de edad (ScoreAggregate). "
+        "Necesario tras editar datos fuera de la importación sin señales o al cambiar DASHBOARD_AGE_BANDS."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_aggregates()
+        self.stdout.write(self.style.SUCCESS(f"{rows} aggregate rows rebuilt"))
@@ -0,0 +1,259 @@
+import bisect
+import contextlib
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+
+DEFAULT_METRICS = True
+DEFAULT_METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+IMPORT_ROW_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+IMPORT_DURATION_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 600)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(names, values, extra=''):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield f'{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        # Por combinación de etiquetas: [conteo por bucket (no acumulado)..., +Inf, suma]
+        self.values = {}
+
+    def observe(self, value, *labels):
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self):
+        for labels, counts in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f'{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labels, labels)} {_format_number(counts[-1])}'
+            yield f'{self.name}_count{_format_labels(self.labels, labels)} {cumulative}'
+
+
+class Registry:
+    """
+    Métricas en memoria de este proceso. Con varios procesos (gunicorn con varios
+    workers) cada uno expone las suyas y Prometheus debe consultarlos por separado.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def clear(self):
+        with self.lock:
+            for metric in self.metrics:
+                metric.values.clear()
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f'# HELP {metric.name} {metric.help}')
+                lines.append(f'# TYPE {metric.name} {metric.kind}')
+                lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_LABELS = ('route', 'method')
+request_duration = registry.add(Histogram(
+    'dashboard_request_duration_seconds', 'Time to produce the response.', LATENCY_BUCKETS, REQUEST_LABELS,
+))
+requests_total = registry.add(Counter(
+    'dashboard_requests_total', 'Responses by status code.', REQUEST_LABELS + ('status',),
+))
+request_queries = registry.add(Histogram(
+    'dashboard_request_db_queries', 'SQL queries per request.', QUERY_BUCKETS, REQUEST_LABELS,
+))
+db_duration = registry.add(Counter(
+    'dashboard_db_duration_seconds_total', 'Time spent in SQL queries.', REQUEST_LABELS,
+))
+import_jobs = registry.add(Counter(
+    'dashboard_import_jobs_total', 'Finished import jobs by status.', ('status',),
+))
+import_rows = registry.add(Histogram(
+    'dashboard_import_rows', 'Rows processed per import.', IMPORT_ROW_BUCKETS,
+))
+import_rows_total = registry.add(Counter(
+    'dashboard_import_rows_total', 'Imported rows by outcome.', ('outcome',),
+))
+import_duration = registry.add(Histogram(
+    'dashboard_import_duration_seconds', 'Duration of each import.', IMPORT_DURATION_BUCKETS,
+))
+
+
+def metrics_enabled():
+    return getattr(settings, 'DASHBOARD_METRICS', DEFAULT_METRICS)
+
+
+def record_import(status, duration, result=None):
+    """
+    Registra una importación terminada; ``result`` es el ``BulkImporter`` con lo guardado
+    (también si falló después de guardar algunos bloques).
+    """
+    if not metrics_enabled():
+        return
+    with registry.lock:
+        import_jobs.inc(status)
+        import_duration.observe(duration)
+        if result is not None:
+            import_rows.observe(result.rows)
+            import_rows_total.inc('created', amount=result.created)
+            import_rows_total.inc('updated', amount=result.updated)
+            import_rows_total.inc('rejected', amount=result.rejected)
+
+
+class QueryTimer:
+    """
+    ``execute_wrapper`` que cuenta las consultas SQL y suma su duración.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def wrap_connections(stack, wrapper):
+    """
+    Instala ``wrapper`` en las conexiones de este hilo hasta que se cierre ``stack``.
+    """
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+
+
+class MetricsMiddleware:
+    """
+    Mide cada petición: latencia, número de consultas SQL y tiempo en la base de datos,
+    agrupados por ruta (el patrón de la URL, no la URL concreta) y método. Agrega el
+    encabezado ``Server-Timing`` con el tiempo total y el de la base de datos.
+
+    En las respuestas en streaming se mide hasta el primer byte: las consultas que se
+    hacen mientras se envía el cuerpo no se cuentan. Funciona también con ASGI: el ORM
+    asíncrono ejecuta las consultas en el hilo sincrónico de la petición, así que el
+    contador se instala en las conexiones de ese hilo.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            wrap_connections(stack, timer)
+            response = self.get_response(request)
+        return self.record(request, response, time.perf_counter() - start, timer)
+
+    async def __acall__(self, request):
+        if not metrics_enabled():
+            return await self.get_response(request)
+
+        timer = QueryTimer()
+        stack = contextlib.ExitStack()
+        start = time.perf_counter()
+        await sync_to_async(wrap_connections)(stack, timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.record(request, response, time.perf_counter() - start, timer)
+
+    def record(self, request, response, duration, timer):
+        match = request.resolver_match
+        labels = (match.route if match else 'unmatched', request.method)
+        with registry.lock:
+            request_duration.observe(duration, *labels)
+            requests_total.inc(*labels, response.status_code)
+            request_queries.observe(timer.count, *labels)
+            db_duration.inc(*labels, amount=timer.duration)
+
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+        )
+        return response
+
+
+def metrics_view(request):
+    """
+    Métricas en el formato de texto de Prometheus. Solo se responden a las direcciones de
+    ``DASHBOARD_METRICS_ALLOWED_IPS`` (por defecto, la máquina local).
+    """
+    allowed = getattr(settings, 'DASHBOARD_METRICS_ALLOWED_IPS', DEFAULT_METRICS_ALLOWED_IPS)
+    if request.META.get('REMOTE_ADDR') not in allowed:
+        return JsonResponse({'error': 'Metrics are only available locally'}, status=403)
+    if not metrics_enabled():
+        return JsonResponse({'error': 'Metrics are disabled'}, status=404)
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_importjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='respondent',
+            index=models.Index(fields=['gender', 'age'], name='respondent_gender_age_idx'),
+        ),
+    ]
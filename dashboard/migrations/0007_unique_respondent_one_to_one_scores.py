@@ -0,0 +1,84 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+CHUNK_SIZE = 500
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def dedupe_respondents(apps, schema_editor):
+    """
+    Une los respondientes con el mismo nombre y deja un solo registro de factores y de
+    categorización por respondiente, antes de crear las restricciones únicas.
+
+    Se conserva el respondiente con el id más bajo, con la edad y el género del más
+    reciente, y de los puntajes se conserva el registro más reciente.
+    """
+    db = schema_editor.connection.alias
+    Respondent = apps.get_model('dashboard', 'Respondent')
+
+    # id de cada respondiente repetido -> id del respondiente que se conserva
+    canonical = {}
+    repeated = (
+        Respondent.objects.using(db).values('name').annotate(total=Count('id')).filter(total__gt=1)
+    )
+    for name in [row['name'] for row in repeated]:
+        group = list(Respondent.objects.using(db).filter(name=name).order_by('id'))
+        keeper, latest = group[0], group[-1]
+        keeper.age, keeper.gender = latest.age, latest.gender
+        keeper.save(update_fields=['age', 'gender'])
+        for respondent in group:
+            canonical[respondent.pk] = keeper.pk
+
+    for model_name in ('PersonalityFactors', 'Categorization'):
+        model = apps.get_model('dashboard', model_name)
+        survivors = {}
+        all_ids = []
+        rows = model.objects.using(db).order_by('id').values_list('id', 'respondent_id')
+        for row_id, respondent_id in rows.iterator():
+            # El último registro (id más alto) de cada respondiente ya unificado es el que se conserva
+            survivors[canonical.get(respondent_id, respondent_id)] = (row_id, respondent_id)
+            all_ids.append(row_id)
+
+        keep = {row_id for row_id, _ in survivors.values()}
+        for chunk in _chunks(row_id for row_id in all_ids if row_id not in keep):
+            model.objects.using(db).filter(id__in=chunk).delete()
+        for keeper_id, (row_id, respondent_id) in survivors.items():
+            if keeper_id != respondent_id:
+                model.objects.using(db).filter(id=row_id).update(respondent_id=keeper_id)
+
+    for chunk in _chunks(pk for pk, keeper_id in canonical.items() if pk != keeper_id):
+        Respondent.objects.using(db).filter(id__in=chunk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_respondents, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='categorization',
+            name='respondent',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='dashboard.respondent'),
+        ),
+        migrations.AlterField(
+            model_name='personalityfactors',
+            name='respondent',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='dashboard.respondent'),
+        ),
+        migrations.AlterField(
+            model_name='respondent',
+            name='name',
+            field=models.CharField(max_length=100, unique=True),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:48
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Sum, Value, When
+
+# Copia fija de las columnas y los rangos de edad vigentes al crear la migración: el
+# resultado no debe cambiar si cambian los de ``dashboard.aggregates`` (que en todo caso
+# se recalculan con ``rebuild_aggregates``)
+PERSONALITY_COLUMNS = ['A', 'B', 'C', 'E', 'F', 'G', 'H', 'I', 'L', 'M', 'N', 'O', 'Q1', 'Q2', 'Q3', 'Q4']
+CATEGORIZATION_COLUMNS = ['An', 'Ex', 'So', 'In', 'Ob', 'Cr', 'Ne', 'Ps', 'Li', 'Ac']
+SCORE_COLUMNS = [
+    *((f'personalityfactors__{col}', col) for col in PERSONALITY_COLUMNS),
+    *((f'categorization__{col}', col) for col in CATEGORIZATION_COLUMNS),
+]
+AGE_BANDS = [(18, '<18'), (25, '18-24'), (35, '25-34'), (45, '35-44'), (55, '45-54'), (65, '55-64')]
+LAST_AGE_BAND = '65+'
+
+
+def populate_aggregates(apps, schema_editor):
+    """
+    Calcula los agregados de los datos ya existentes.
+    """
+    Respondent = apps.get_model('dashboard', 'Respondent')
+    ScoreAggregate = apps.get_model('dashboard', 'ScoreAggregate')
+
+    sums = {}
+    for lookup, column in SCORE_COLUMNS:
+        sums[f'{column}_count'] = Count(lookup)
+        sums[f'{column}_total'] = Sum(lookup)
+        sums[f'{column}_total_sq'] = Sum(F(lookup) * F(lookup))
+    age_band = Case(
+        *[When(age__lt=edge, then=Value(label)) for edge, label in AGE_BANDS], default=Value(LAST_AGE_BAND)
+    )
+    groups = Respondent.objects.annotate(age_band=age_band).values('gender', 'age_band').annotate(**sums).order_by()
+
+    ScoreAggregate.objects.bulk_create(
+        ScoreAggregate(
+            gender=group['gender'], age_band=group['age_band'], column=column,
+            count=group[f'{column}_count'], total=group[f'{column}_total'], total_sq=group[f'{column}_total_sq'],
+        )
+        for group in groups
+        for _, column in SCORE_COLUMNS
+        if group[f'{column}_count']
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0007_unique_respondent_one_to_one_scores'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gender', models.CharField(max_length=100)),
+                ('age_band', models.CharField(max_length=20)),
+                ('column', models.CharField(max_length=10)),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+                ('total_sq', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('gender', 'age_band', 'column'), name='score_aggregate_group_unique')],
+            },
+        ),
+        migrations.RunPython(populate_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_score_aggregate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='respondent',
+            name='import_job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='respondents', to='dashboard.importjob'),
+        ),
+    ]
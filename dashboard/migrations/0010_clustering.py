@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-18 10:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_respondent_import_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClusteringRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('k', models.IntegerField()),
+                ('dataset_version', models.CharField(max_length=40)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('algorithm', models.CharField(blank=True, max_length=20)),
+                ('respondents', models.IntegerField(default=0)),
+                ('centroids', models.JSONField(blank=True, default=list)),
+                ('sizes', models.JSONField(blank=True, default=list)),
+                ('inertia', models.FloatField(blank=True, null=True)),
+                ('iterations', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['k', 'dataset_version'], name='clustering_k_version_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClusterAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.IntegerField()),
+                ('distance', models.FloatField()),
+                ('respondent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cluster_assignments', to='dashboard.respondent')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='dashboard.clusteringrun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'cluster'], name='cluster_assignment_cluster_idx')],
+                'constraints': [models.UniqueConstraint(fields=('run', 'respondent'), name='cluster_assignment_unique')],
+            },
+        ),
+    ]
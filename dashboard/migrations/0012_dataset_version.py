@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-18 11:32
+
+import time
+
+from django.db import migrations, models
+
+
+def create_version(apps, schema_editor):
+    """
+    Crea la fila de la versión de los datos (ver ``dashboard.dataset``).
+    """
+    DatasetVersion = apps.get_model('dashboard', 'DatasetVersion')
+    DatasetVersion.objects.using(schema_editor.connection.alias).create(pk=1, version=f'{time.time_ns():x}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_clustering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=40)),
+            ],
+        ),
+        migrations.RunPython(create_version, migrations.RunPython.noop),
+    ]
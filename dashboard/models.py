@@ -1,17 +1,32 @@
 from django.db import models
+from django.utils import timezone
+
+# Columnas de los 16 factores primarios y de las categorías globales
+PERSONALITY_COLUMNS = [
+    'A', 'B', 'C', 'E', 'F', 'G', 'H',
+    'I', 'L', 'M', 'N', 'O', 'Q1', 'Q2', 'Q3', 'Q4'
+]
+CATEGORIZATION_COLUMNS = ['An', 'Ex', 'So', 'In', 'Ob', 'Cr', 'Ne', 'Ps', 'Li', 'Ac']
 
 # Modelo para Respondent
 class Respondent(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, unique=True)  # Clave natural usada por la importación
     age = models.IntegerField()
     gender = models.CharField(max_length=100)
+    # Última importación que creó o actualizó al respondiente (cohortes por carga)
+    import_job = models.ForeignKey('ImportJob', null=True, blank=True, on_delete=models.SET_NULL,
+                                   related_name='respondents')
+
+    class Meta:
+        # Filtros por género y rango de edad
+        indexes = [models.Index(fields=['gender', 'age'], name='respondent_gender_age_idx')]
 
     def __str__(self):
         return self.name
 
 # Modelo para PersonalityFactors
 class PersonalityFactors(models.Model):
-    respondent = models.ForeignKey(Respondent, on_delete=models.CASCADE)
+    respondent = models.OneToOneField(Respondent, on_delete=models.CASCADE)
     A = models.FloatField(null=True, blank=True)
     B = models.FloatField(null=True, blank=True)
     C = models.FloatField(null=True, blank=True)
@@ -34,7 +49,7 @@ class PersonalityFactors(models.Model):
 
 # Modelo para Categorization
 class Categorization(models.Model):
-    respondent = models.ForeignKey(Respondent, on_delete=models.CASCADE)
+    respondent = models.OneToOneField(Respondent, on_delete=models.CASCADE)
     An = models.FloatField(null=True, blank=True)
     Ex = models.FloatField(null=True, blank=True)
     So = models.FloatField(null=True, blank=True)
@@ -48,3 +63,126 @@ class Categorization(models.Model):
 
     def __str__(self):
         return f"Categorization({self.respondent.name})"
+
+# Modelo para ImportJob
+class ImportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    file = models.FileField(upload_to='imports/')
+    original_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    rows_processed = models.IntegerField(default=0)
+    rows_created = models.IntegerField(default=0)
+    rows_updated = models.IntegerField(default=0)
+    rows_rejected = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # Errores por fila: [{"row": ..., "error": ...}]
+    error = models.TextField(blank=True)  # Error que detuvo la importación completa
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def duration(self):
+        if self.started_at is None:
+            return None
+        end = self.finished_at or timezone.now()
+        return (end - self.started_at).total_seconds()
+
+    def __str__(self):
+        return f"ImportJob({self.pk}, {self.original_name}, {self.status})"
+
+# Modelo para DatasetVersion
+class DatasetVersion(models.Model):
+    """
+    Versión actual de los datos, en una sola fila (ver ``dashboard.dataset``). Está en la
+    base de datos para que todos los procesos vean el mismo valor y para que cambie en la
+    misma transacción que los datos.
+    """
+    version = models.CharField(max_length=40)
+
+    def __str__(self):
+        return f"DatasetVersion({self.version})"
+
+# Modelo para ScoreAggregate
+class ScoreAggregate(models.Model):
+    """
+    Sumas acumuladas de un puntaje (factor o categoría) para un grupo de género y rango
+    de edad. Con ``count``, ``total`` y ``total_sq`` se obtienen la media y la varianza del
+    grupo sin leer los puntajes individuales (ver ``dashboard.aggregates``).
+    """
+    gender = models.CharField(max_length=100)
+    age_band = models.CharField(max_length=20)
+    column = models.CharField(max_length=10)
+    count = models.IntegerField(default=0)  # Puntajes no vacíos
+    total = models.FloatField(default=0)
+    total_sq = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['gender', 'age_band', 'column'], name='score_aggregate_group_unique'),
+        ]
+
+    def __str__(self):
+        return f"ScoreAggregate({self.gender}, {self.age_band}, {self.column})"
+
+# Modelo para ClusteringRun
+class ClusteringRun(models.Model):
+    """
+    Agrupamiento k-means de los 16 factores calculado en segundo plano para una versión
+    de los datos (ver ``dashboard.clustering``).
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    k = models.IntegerField()
+    dataset_version = models.CharField(max_length=40)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    algorithm = models.CharField(max_length=20, blank=True)  # lloyd o mini-batch
+    respondents = models.IntegerField(default=0)  # Respondientes con los 16 factores
+    centroids = models.JSONField(default=list, blank=True)  # [{"A": ..., ..., "Q4": ...}, ...]
+    sizes = models.JSONField(default=list, blank=True)
+    inertia = models.FloatField(null=True, blank=True)
+    iterations = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['k', 'dataset_version'], name='clustering_k_version_idx')]
+
+    def __str__(self):
+        return f"ClusteringRun({self.pk}, k={self.k}, {self.status})"
+
+# Modelo para ClusterAssignment
+class ClusterAssignment(models.Model):
+    run = models.ForeignKey(ClusteringRun, on_delete=models.CASCADE, related_name='assignments')
+    respondent = models.ForeignKey(Respondent, on_delete=models.CASCADE, related_name='cluster_assignments')
+    cluster = models.IntegerField()
+    distance = models.FloatField()  # Distancia euclidiana al centroide
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'respondent'], name='cluster_assignment_unique'),
+        ]
+        indexes = [models.Index(fields=['run', 'cluster'], name='cluster_assignment_cluster_idx')]
+
+    def __str__(self):
+        return f"ClusterAssignment(run={self.run_id}, respondent={self.respondent_id}, cluster={self.cluster})"
@@ -0,0 +1,102 @@
+from django.conf import settings
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .exceptions import InvalidParameter
+
+DEFAULT_MAX_PAGE_SIZE = 1000
+
+
+def _positive_int(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise InvalidParameter(f"'{param}' must be a positive integer.")
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor sobre un campo creciente (``id`` por defecto).
+
+    Cada página se obtiene con ``WHERE key > after ORDER BY key LIMIT n``, así que el
+    costo no depende de la posición de la página. Solo se activa cuando se pide
+    ``limit``; sin él la vista responde igual que antes.
+    """
+    limit_query_param = 'limit'
+    after_query_param = 'after'
+    key_field = 'id'  # Campo del ORM para ordenar y filtrar
+    key_name = 'id'  # Atributo (o clave, si las filas son dicts) con el valor del cursor
+
+    def __init__(self, key_field=None, key_name=None, names=None):
+        self.key_field = key_field or self.key_field
+        self.key_name = key_name or self.key_name
+        # Columnas de las filas cuando son tuplas de ``values_list``
+        self.names = names
+
+    def get_after(self, request):
+        return _positive_int(request, self.after_query_param)
+
+    def apply_after(self, queryset, request):
+        """
+        Ordena por la clave y descarta las filas hasta el cursor ``after`` (si se envió).
+        """
+        queryset = queryset.order_by(self.key_field)
+        after = self.get_after(request)
+        if after is not None:
+            queryset = queryset.filter(**{f'{self.key_field}__gt': after})
+        return queryset
+
+    def get_limit(self, request):
+        limit = _positive_int(request, self.limit_query_param)
+        if limit is None:
+            return None
+        return min(limit, getattr(settings, 'DASHBOARD_MAX_PAGE_SIZE', DEFAULT_MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        limit = self.get_limit(request)
+        if limit is None:
+            return None
+        # Pedir una fila extra para saber si hay página siguiente
+        rows = list(self.apply_after(queryset, request)[:limit + 1])
+        return self._page(rows, limit, request)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        ``paginate_queryset`` con el ORM asíncrono.
+        """
+        limit = self.get_limit(request)
+        if limit is None:
+            return None
+        rows = [row async for row in self.apply_after(queryset, request)[:limit + 1]]
+        return self._page(rows, limit, request)
+
+    def _page(self, rows, limit, request):
+        page = rows[:limit]
+        self.request = request
+        self.next_after = self._key(page[-1]) if len(rows) > limit else None
+        return page
+
+    def _key(self, row):
+        if isinstance(row, tuple):
+            return row[self.names.index(self.key_name)]
+        return row[self.key_name] if isinstance(row, dict) else getattr(row, self.key_name)
+
+    def get_next_link(self):
+        if self.next_after is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.after_query_param, self.next_after)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_after': self.next_after,
+            'results': data,
+        })
@@ -0,0 +1,169 @@
+import contextlib
+import cProfile
+import json
+import random
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .metrics import wrap_connections
+
+DEFAULT_PROFILING = False
+DEFAULT_PROFILING_HEADER = 'X-Profile'
+DEFAULT_PROFILING_SAMPLE_RATE = 0.0
+DEFAULT_PROFILING_MAX_FILES = 200
+# Caracteres guardados de cada consulta SQL
+MAX_SQL_LENGTH = 2000
+
+# cProfile no admite dos perfiles activos a la vez: si ya hay uno, la petición se atiende
+# sin perfilar
+_profile_lock = threading.Lock()
+
+
+def profiles_dir():
+    return Path(getattr(settings, 'DASHBOARD_PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+
+class QueryLog:
+    """
+    ``execute_wrapper`` que guarda cada consulta SQL con su duración en milisegundos.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            self.queries.append({
+                'alias': context['connection'].alias, 'sql': sql[:MAX_SQL_LENGTH], 'ms': round(duration, 3),
+            })
+
+
+def wants_profile(request):
+    if not getattr(settings, 'DASHBOARD_PROFILING', DEFAULT_PROFILING):
+        return False
+    header = getattr(settings, 'DASHBOARD_PROFILING_HEADER', DEFAULT_PROFILING_HEADER)
+    if header and request.headers.get(header):
+        return True
+    return random.random() < getattr(settings, 'DASHBOARD_PROFILING_SAMPLE_RATE', DEFAULT_PROFILING_SAMPLE_RATE)
+
+
+def save_profile(profile, metadata):
+    """
+    Guarda ``<id>.prof`` (formato de ``pstats``) y ``<id>.json`` (petición, tiempos y SQL)
+    en ``DASHBOARD_PROFILING_DIR`` y borra los más antiguos si se pasa de
+    ``DASHBOARD_PROFILING_MAX_FILES`` perfiles.
+    """
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    profile.dump_stats(directory / f'{profile_id}.prof')
+    (directory / f'{profile_id}.json').write_text(json.dumps({'id': profile_id, **metadata}, indent=1))
+
+    max_files = getattr(settings, 'DASHBOARD_PROFILING_MAX_FILES', DEFAULT_PROFILING_MAX_FILES)
+    for old in sorted(directory.glob('*.json'))[:-max_files]:
+        old.unlink(missing_ok=True)
+        old.with_suffix('.prof').unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles():
+    """
+    Metadatos de los perfiles guardados, del más reciente al más antiguo.
+    """
+    directory = profiles_dir()
+    if not directory.exists():
+        return []
+    return [json.loads(path.read_text()) for path in sorted(directory.glob('*.json'), reverse=True)]
+
+
+def profile_path(profile_id):
+    return profiles_dir() / f'{profile_id}.prof'
+
+
+class ProfilingMiddleware:
+    """
+    Perfilado bajo demanda. Con ``DASHBOARD_PROFILING`` activo, las peticiones con el
+    encabezado ``DASHBOARD_PROFILING_HEADER`` (y una fracción
+    ``DASHBOARD_PROFILING_SAMPLE_RATE`` del resto) se ejecutan bajo cProfile, incluido el
+    renderizado de la respuesta. El perfil se guarda con la ruta, la duración y las
+    consultas SQL (ver ``save_profile``) y su id se devuelve en ``X-Profile-Id``.
+
+    Con ASGI el perfil cubre el hilo del event loop (donde pueden aparecer también otras
+    peticiones en curso); el ORM corre en otro hilo y se ve en el registro de SQL.
+
+    Para ver los perfiles: ``python manage.py list_profiles``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not wants_profile(request) or not _profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            log = QueryLog()
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            with contextlib.ExitStack() as stack:
+                wrap_connections(stack, log)
+                profile.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profile.disable()
+            duration = (time.perf_counter() - start) * 1000
+        finally:
+            _profile_lock.release()
+        return self.save(request, response, profile, log, duration)
+
+    async def __acall__(self, request):
+        if not wants_profile(request) or not _profile_lock.acquire(blocking=False):
+            return await self.get_response(request)
+
+        try:
+            log = QueryLog()
+            profile = cProfile.Profile()
+            stack = contextlib.ExitStack()
+            await sync_to_async(wrap_connections)(stack, log)
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profile.disable()
+                await sync_to_async(stack.close)()
+            duration = (time.perf_counter() - start) * 1000
+        finally:
+            _profile_lock.release()
+        return await sync_to_async(self.save)(request, response, profile, log, duration)
+
+    def save(self, request, response, profile, log, duration):
+        profile_id = save_profile(profile, {
+            'created': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'ms': round(duration, 3),
+            'sql_ms': round(sum(query['ms'] for query in log.queries), 3),
+            'queries': log.queries,
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,266 @@
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from .ingest import missing_columns
+
+# Formatos de importación soportados
+XLSX = 'xlsx'
+XLS = 'xls'
+CSV = 'csv'
+PARQUET = 'parquet'
+ARROW = 'arrow'
+
+FORMAT_LABELS = {
+    XLSX: 'Excel',
+    XLS: 'Excel',
+    CSV: 'CSV',
+    PARQUET: 'Parquet',
+    ARROW: 'Arrow',
+}
+
+FORMAT_EXTENSIONS = {
+    '.xlsx': XLSX,
+    '.xlsm': XLSX,
+    '.xls': XLS,
+    '.csv': CSV,
+    '.txt': CSV,
+    '.parquet': PARQUET,
+    '.pq': PARQUET,
+    '.arrow': ARROW,
+    '.arrows': ARROW,
+    '.feather': ARROW,
+    '.ipc': ARROW,
+}
+
+# Firmas al inicio del archivo, se revisan antes que la extensión
+FORMAT_SIGNATURES = [
+    (b'PAR1', PARQUET),
+    (b'ARROW1', ARROW),  # Arrow IPC, formato de archivo
+    (b'\xff\xff\xff\xff', ARROW),  # Arrow IPC, formato de stream
+    (b'PK\x03\x04', XLSX),  # Contenedor zip de Office Open XML
+    (b'\xd0\xcf\x11\xe0', XLS),  # Contenedor OLE de Excel 97-2003
+]
+
+
+class MissingColumnsError(ValueError):
+    def __init__(self, columns):
+        self.columns = columns
+        super().__init__(f"Missing columns: {', '.join(columns)}")
+
+
+def detect_format(file, name):
+    """
+    Detecta el formato del archivo por su firma y, si no la tiene, por su extensión.
+    Los archivos sin firma ni extensión conocida se tratan como CSV.
+    """
+    head = file.read(8)
+    file.seek(0)
+    for signature, file_format in FORMAT_SIGNATURES:
+        if head.startswith(signature):
+            return file_format
+    extension = os.path.splitext(name.lower())[1]
+    return FORMAT_EXTENSIONS.get(extension, CSV)
+
+
+class ChunkReader:
+    """
+    Interfaz común de los lectores: ``columns`` tiene el encabezado (validado al abrir el
+    archivo) y al iterar se obtienen DataFrames de como máximo ``chunk_size`` filas.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.columns = []
+
+    def validate_columns(self):
+        missing = missing_columns(self.columns)
+        if missing:
+            self.close()
+            raise MissingColumnsError(missing)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ExcelChunkReader(ChunkReader):
+    """
+    Lector de archivos .xlsx por bloques de filas.
+
+    Usa el iterador de solo lectura de openpyxl, así que la memoria usada depende del
+    tamaño del bloque y no del tamaño del archivo. La fila de encabezados se valida al
+    abrir el archivo, antes de leer cualquier dato.
+    """
+
+    def __init__(self, file, chunk_size):
+        super().__init__(chunk_size)
+        self.workbook = load_workbook(file, read_only=True, data_only=True)
+        self.rows = self.workbook.active.iter_rows(values_only=True)
+        header = next(self.rows, ())
+        self.columns = [str(col) if col is not None else '' for col in header]
+        self.validate_columns()
+
+    def __iter__(self):
+        chunk = []
+        for row in self.rows:
+            # Las filas vacías se entregan igual (``validate_frame`` las descarta) para que
+            # los números de fila de los errores coincidan con los del archivo
+            chunk.append(self._pad(row))
+            if len(chunk) == self.chunk_size:
+                yield self._to_frame(chunk)
+                chunk = []
+        if chunk:
+            yield self._to_frame(chunk)
+
+    def _pad(self, row):
+        width = len(self.columns)
+        return tuple(row[:width]) + (None,) * (width - len(row))
+
+    def _to_frame(self, chunk):
+        return pd.DataFrame.from_records(chunk, columns=self.columns)
+
+    def close(self):
+        self.workbook.close()
+
+
+class CsvChunkReader(ChunkReader):
+    """
+    Lector de archivos CSV por bloques usando ``pd.read_csv(chunksize=...)``.
+    """
+
+    def __init__(self, file, chunk_size):
+        super().__init__(chunk_size)
+        self.reader = pd.read_csv(file, chunksize=chunk_size)
+        # Leer el primer bloque para conocer el encabezado
+        self.first_chunk = next(self.reader, None)
+        if self.first_chunk is not None:
+            self.columns = list(self.first_chunk.columns)
+        self.validate_columns()
+
+    def __iter__(self):
+        if self.first_chunk is not None:
+            chunk, self.first_chunk = self.first_chunk, None
+            yield chunk
+        yield from self.reader
+
+    def close(self):
+        self.reader.close()
+
+
+def import_pyarrow(label):
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError(f"{label} support requires pyarrow")
+    return pyarrow
+
+
+class ArrowBatchReader(ChunkReader):
+    """
+    Base para los formatos columnares (Parquet y Arrow IPC): convierte cada record batch
+    a DataFrame, dividiéndolo si es más grande que ``chunk_size``.
+    """
+
+    def __iter__(self):
+        for batch in self.batches():
+            for offset in range(0, batch.num_rows, self.chunk_size):
+                yield batch.slice(offset, self.chunk_size).to_pandas()
+
+    def batches(self):
+        raise NotImplementedError
+
+
+class ParquetChunkReader(ArrowBatchReader):
+
+    def __init__(self, file, chunk_size):
+        super().__init__(chunk_size)
+        import_pyarrow('Parquet')
+        import pyarrow.parquet as pq
+
+        self.parquet_file = pq.ParquetFile(file)
+        self.columns = self.parquet_file.schema_arrow.names
+        self.validate_columns()
+
+    def batches(self):
+        return self.parquet_file.iter_batches(batch_size=self.chunk_size)
+
+    def close(self):
+        self.parquet_file.close()
+
+
+class ArrowChunkReader(ArrowBatchReader):
+
+    def __init__(self, file, chunk_size):
+        super().__init__(chunk_size)
+        pa = import_pyarrow('Arrow')
+        import pyarrow.ipc
+
+        is_file_format = file.read(6) == b'ARROW1'
+        file.seek(0)
+        source = pa.PythonFile(file, mode='r')
+        self.reader = pyarrow.ipc.open_file(source) if is_file_format else pyarrow.ipc.open_stream(source)
+        self.columns = self.reader.schema.names
+        self.validate_columns()
+
+    def batches(self):
+        if hasattr(self.reader, 'num_record_batches'):
+            return (self.reader.get_batch(i) for i in range(self.reader.num_record_batches))
+        return self.reader
+
+
+class FrameReader(ChunkReader):
+    """
+    Adaptador que entrega un DataFrame ya cargado en bloques, con la misma interfaz que
+    los demás lectores. Se usa para formatos que no pueden leerse en streaming (.xls).
+    """
+
+    def __init__(self, frame, chunk_size):
+        super().__init__(chunk_size)
+        self.frame = frame
+        self.columns = list(frame.columns)
+        self.validate_columns()
+
+    def __iter__(self):
+        for start in range(0, len(self.frame), self.chunk_size):
+            yield self.frame.iloc[start:start + self.chunk_size]
+
+
+READERS = {
+    XLSX: ExcelChunkReader,
+    CSV: CsvChunkReader,
+    PARQUET: ParquetChunkReader,
+    ARROW: ArrowChunkReader,
+}
+
+
+def open_reader(file, name, chunk_size, file_format=None):
+    """
+    Abre el lector adecuado según el formato del archivo.
+    """
+    file_format = file_format or detect_format(file, name)
+    if file_format == XLS:
+        return FrameReader(pd.read_excel(file), chunk_size)
+    return READERS[file_format](file, chunk_size)
+
+
+def validate_header(file, name, file_format=None):
+    """
+    Verifica las columnas del archivo leyendo solo el encabezado y deja el archivo
+    listo para volver a leerse desde el principio.
+    """
+    file_format = file_format or detect_format(file, name)
+    if file_format == XLS:
+        missing = missing_columns(pd.read_excel(file, nrows=0).columns)
+        if missing:
+            raise MissingColumnsError(missing)
+    else:
+        # Los lectores validan el encabezado al abrirse
+        open_reader(file, name, 1, file_format).close()
+    file.seek(0)
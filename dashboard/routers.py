@@ -0,0 +1,116 @@
+import contextlib
+import contextvars
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_READ_REPLICA = 'replica'
+
+# Activo mientras se atiende una vista de solo lectura (ver ``ReplicaReadMixin``)
+_replica_reads = contextvars.ContextVar('dashboard_replica_reads', default=False)
+_END = object()
+
+
+def replica_alias():
+    """
+    Alias de ``DATABASES`` que atiende las lecturas de las vistas de solo lectura, o None
+    si no hay réplica configurada.
+    """
+    alias = getattr(settings, 'DASHBOARD_READ_REPLICA', DEFAULT_READ_REPLICA)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """
+    Envía a la réplica las consultas de lectura hechas dentro del bloque (también desde
+    ``sync_to_async``, que copia el contexto).
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def _replica_iterator(iterator):
+    # Los cuerpos en streaming se generan después de ``dispatch``
+    iterator = iter(iterator)
+    while True:
+        with replica_reads():
+            chunk = next(iterator, _END)
+        if chunk is _END:
+            return
+        yield chunk
+
+
+async def _areplica_iterator(iterator):
+    iterator = aiter(iterator)
+    while True:
+        with replica_reads():
+            chunk = await anext(iterator, _END)
+        if chunk is _END:
+            return
+        yield chunk
+
+
+class ReplicaReadMixin:
+    """
+    Marca una vista como de solo lectura: sus consultas, incluidas las del cuerpo de las
+    respuestas en streaming y las del renderizado, van a la réplica (ver
+    ``ReadReplicaRouter``). Sirve para las vistas síncronas y para las asíncronas.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            # Las respuestas de DRF pueden llevar un queryset sin evaluar
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        if response.streaming and not response.is_async:
+            response.streaming_content = _replica_iterator(response.streaming_content)
+        return response
+
+    async def _adispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            response = await super().dispatch(request, *args, **kwargs)
+        if response.streaming and response.is_async:
+            response.streaming_content = _areplica_iterator(response.streaming_content)
+        return response
+
+
+class ReadReplicaRouter:
+    """
+    Las lecturas de las vistas de solo lectura van a ``DASHBOARD_READ_REPLICA`` y todo lo
+    demás (escrituras, importaciones, agrupamientos, migraciones) a ``default``.
+
+    Mientras ``default`` tenga una transacción abierta en el hilo, las lecturas también
+    van a ``default`` para ver lo escrito en ella (es el caso de las pruebas, que corren
+    dentro de una transacción).
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        alias = replica_alias()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Sin esto, un objeto leído de la réplica se guardaría en ella
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica tiene el mismo esquema que ``default``
+        if db == replica_alias():
+            return False
+        return None
@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Respondent, PersonalityFactors, Categorization
+from .jobs import get_progress
+from .models import Respondent, PersonalityFactors, Categorization, ImportJob, ClusteringRun, PERSONALITY_COLUMNS, \
+    CATEGORIZATION_COLUMNS
 
 class RespondentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -7,7 +9,8 @@ class RespondentSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'age', 'gender']
 
 class PersonalityFactorsSerializer(serializers.ModelSerializer):
-    respondent = serializers.StringRelatedField()  # Puedes usar esto para mostrar el nombre del respondente en lugar de su ID
+    # Nombre del respondente en lugar de su ID; la vista debe usar select_related('respondent')
+    respondent = serializers.CharField(source='respondent.name', read_only=True)
     respondent_id = serializers.PrimaryKeyRelatedField(queryset=Respondent.objects.all(), source='respondent', write_only=True)
 
     class Meta:
@@ -19,7 +22,7 @@ class PersonalityFactorsSerializer(serializers.ModelSerializer):
         ]
 
 class CategorizationSerializer(serializers.ModelSerializer):
-    respondent = serializers.StringRelatedField()  # También muestra el nombre del respondente
+    respondent = serializers.CharField(source='respondent.name', read_only=True)  # También muestra el nombre del respondente
     respondent_id = serializers.PrimaryKeyRelatedField(queryset=Respondent.objects.all(), source='respondent', write_only=True)
 
     class Meta:
@@ -29,3 +32,69 @@ class CategorizationSerializer(serializers.ModelSerializer):
             'An', 'Ex', 'So', 'In', 'Ob',
             'Cr', 'Ne', 'Ps', 'Li', 'Ac'
         ]
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    rows_processed = serializers.SerializerMethodField()
+    duration = serializers.FloatField(read_only=True)
+    throughput = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'original_name', 'status',
+            'rows_processed', 'rows_created', 'rows_updated', 'rows_rejected',
+            'duration', 'throughput', 'errors', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+
+    def get_rows_processed(self, obj):
+        # Para trabajos en curso se usa el avance en memoria del pool
+        live = get_progress(obj.pk) if obj.status == ImportJob.RUNNING else None
+        return obj.rows_processed if live is None else live
+
+    def get_throughput(self, obj):
+        # Filas por segundo
+        duration = obj.duration
+        if not duration:
+            return None
+        return self.get_rows_processed(obj) / duration
+
+class ClusteringRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ClusteringRun
+        fields = [
+            'id', 'k', 'dataset_version', 'status', 'algorithm', 'respondents',
+            'centroids', 'sizes', 'inertia', 'iterations', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+
+
+# Campos que se leen en una sola consulta para armar el perfil de un respondiente
+PROFILE_FIELDS = (
+    ['id', 'name', 'age', 'gender', 'personalityfactors__id', 'categorization__id']
+    + [f'personalityfactors__{col}' for col in PERSONALITY_COLUMNS]
+    + [f'categorization__{col}' for col in CATEGORIZATION_COLUMNS]
+)
+
+
+def profile_from_row(row):
+    """
+    Arma el perfil (respondiente, factores y categorización) a partir de una fila de
+    ``Respondent.objects.values(*PROFILE_FIELDS)``.
+    """
+    factors = None
+    if row['personalityfactors__id'] is not None:
+        factors = {'id': row['personalityfactors__id']}
+        factors.update({col: row[f'personalityfactors__{col}'] for col in PERSONALITY_COLUMNS})
+    categorization = None
+    if row['categorization__id'] is not None:
+        categorization = {'id': row['categorization__id']}
+        categorization.update({col: row[f'categorization__{col}'] for col in CATEGORIZATION_COLUMNS})
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'age': row['age'],
+        'gender': row['gender'],
+        'personality_factors': factors,
+        'categorization': categorization,
+    }
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .aggregates import schedule_rebuild
+from .dataset import bump_dataset_version
+from .models import Respondent, PersonalityFactors, Categorization
+
+DEFAULT_SQLITE_JOURNAL_MODE = 'WAL'
+
+
+# Los cambios hechos fuera de la importación (admin, shell) también invalidan la caché y
+# recalculan ScoreAggregate al confirmarse. Las operaciones masivas no envían señales;
+# BulkImporter cambia la versión y ajusta los agregados por su cuenta.
+@receiver([post_save, post_delete], sender=Respondent)
+@receiver([post_save, post_delete], sender=PersonalityFactors)
+@receiver([post_save, post_delete], sender=Categorization)
+def dataset_changed(sender, **kwargs):
+    bump_dataset_version()
+    schedule_rebuild()
+
+
+def set_journal_mode(using, **kwargs):
+    """
+    Al terminar ``migrate``, deja la base SQLite en ``DASHBOARD_SQLITE_JOURNAL_MODE``. El
+    modo queda guardado en el archivo, así que no hace falta fijarlo en cada conexión.
+    """
+    mode = getattr(settings, 'DASHBOARD_SQLITE_JOURNAL_MODE', DEFAULT_SQLITE_JOURNAL_MODE)
+    connection = connections[using]
+    if mode and connection.vendor == 'sqlite' and not connection.is_in_memory_db():
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode={mode}')
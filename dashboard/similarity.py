@@ -0,0 +1,67 @@
+import numpy as np
+
+from .analytics import SCORE_COLUMNS, score_columns
+from .dataset import versioned
+from .models import PERSONALITY_COLUMNS
+
+DISTANCE_METRICS = ['euclidean', 'cosine']
+
+
+class FactorIndex:
+    """
+    Índice en memoria de los vectores de 16 factores de los respondientes con el perfil
+    completo, para buscar los más parecidos a uno dado.
+
+    Las distancias a todos los vectores se calculan con un producto matriz-vector (con
+    las normas precalculadas), que con cientos de miles de filas toma milisegundos; los
+    ``k`` más cercanos se eligen con ``argpartition`` sin ordenar todo el arreglo.
+    """
+
+    def __init__(self, ids, vectors):
+        self.ids = ids
+        self.vectors = vectors
+        self.squared_norms = np.einsum('ij,ij->i', vectors, vectors)
+        self.norms = np.sqrt(self.squared_norms)
+
+    @classmethod
+    def from_columns(cls, data):
+        factors = data['scores'][:, [SCORE_COLUMNS.index(col) for col in PERSONALITY_COLUMNS]].astype(float)
+        complete = ~np.isnan(factors).any(axis=1)
+        return cls(data['id'][complete], factors[complete])
+
+    def position(self, respondent_id):
+        # Los ids están ordenados (ver ``score_columns``)
+        position = np.searchsorted(self.ids, respondent_id)
+        if position < len(self.ids) and self.ids[position] == respondent_id:
+            return int(position)
+        return None
+
+    def distances(self, vector, metric):
+        dot = self.vectors @ vector
+        if metric == 'cosine':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                similarity = dot / (self.norms * np.sqrt(vector @ vector))
+            return 1.0 - np.nan_to_num(similarity)
+        return np.sqrt(np.maximum(self.squared_norms - 2 * dot + vector @ vector, 0.0))
+
+    def neighbors(self, position, k, metric='euclidean'):
+        """
+        Posiciones y distancias de los ``k`` vectores más cercanos al de ``position``
+        (sin incluirlo), de menor a mayor distancia.
+        """
+        distances = self.distances(self.vectors[position], metric)
+        distances[position] = np.inf
+        k = min(k, len(distances) - 1)
+        if k <= 0:
+            return np.array([], dtype=np.int64), np.array([])
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+        return nearest, distances[nearest]
+
+
+def factor_index():
+    """
+    Índice de la versión actual de los datos. Se construye la primera vez que se usa y
+    se reconstruye cuando una importación u otra modificación cambia la versión.
+    """
+    return versioned('factor-index', lambda: FactorIndex.from_columns(score_columns()), shared=False)
@@ -0,0 +1,58 @@
+from django.http import StreamingHttpResponse
+
+from .renderers import dumps
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def wants_stream(request):
+    return request.query_params.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def _json_array(rows, chunk_size):
+    # Codificar fila por fila y enviar grupos de ``chunk_size`` filas
+    yield b'['
+    separator = b''
+    buffer = []
+    for row in rows:
+        buffer.append(dumps(row))
+        if len(buffer) == chunk_size:
+            yield separator + b','.join(buffer)
+            separator = b','
+            buffer = []
+    if buffer:
+        yield separator + b','.join(buffer)
+    yield b']'
+
+
+def stream_json(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Respuesta JSON que se escribe a medida que se leen las filas con ``.iterator()``:
+    la memoria usada no depende del número de filas.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    return StreamingHttpResponse(_json_array(rows, chunk_size), content_type='application/json')
+
+
+async def _ajson_array(rows, chunk_size):
+    yield b'['
+    separator = b''
+    buffer = []
+    async for row in rows:
+        buffer.append(dumps(row))
+        if len(buffer) == chunk_size:
+            yield separator + b','.join(buffer)
+            separator = b','
+            buffer = []
+    if buffer:
+        yield separator + b','.join(buffer)
+    yield b']'
+
+
+def astream_json(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    ``stream_json`` para las vistas asíncronas: las filas se leen con ``.aiterator()`` sin
+    ocupar un hilo mientras el cliente recibe la respuesta.
+    """
+    rows = queryset.aiterator(chunk_size=chunk_size)
+    return StreamingHttpResponse(_ajson_array(rows, chunk_size), content_type='application/json')
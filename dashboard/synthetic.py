@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from .ingest import DEFAULT_BATCH_SIZE, import_chunks
+from .models import PERSONALITY_COLUMNS, CATEGORIZATION_COLUMNS
+from .readers import XLSX, CSV, PARQUET, ARROW
+
+
+def synthetic_frame(rows, seed=0, offset=0):
+    """
+    Cohorte sintética con el mismo contrato de columnas que las importaciones reales:
+    nombres ``Synthetic <n>`` a partir de ``offset``, edades de 18 a 65, género en
+    español y decatipos de 1 a 10.
+    """
+    rng = np.random.default_rng(seed)
+    data = {
+        'name': [f'Synthetic {i}' for i in range(offset, offset + rows)],
+        'age': rng.integers(18, 66, rows),
+        'gender': rng.choice(['Masculino', 'Femenino'], rows),
+    }
+    for col in PERSONALITY_COLUMNS + CATEGORIZATION_COLUMNS:
+        data[col] = rng.integers(1, 11, rows).astype(float)
+    return pd.DataFrame(data)
+
+
+def synthetic_chunks(rows, chunk_size=DEFAULT_BATCH_SIZE, seed=0):
+    """
+    La misma cohorte en bloques de ``chunk_size`` filas, para no tenerla completa en memoria.
+    """
+    for number, offset in enumerate(range(0, rows, chunk_size)):
+        yield synthetic_frame(min(chunk_size, rows - offset), seed=seed + number, offset=offset)
+
+
+def _write_arrow(frame, buffer):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.ipc.new_file(buffer, table.schema) as writer:
+        writer.write_table(table)
+
+
+WRITERS = {
+    XLSX: lambda frame, buffer: frame.to_excel(buffer, index=False),
+    CSV: lambda frame, buffer: frame.to_csv(buffer, index=False),
+    PARQUET: lambda frame, buffer: frame.to_parquet(buffer, index=False),
+    ARROW: _write_arrow,
+}
+
+
+def populate(rows, seed=0, batch_size=None):
+    """
+    Carga una cohorte sintética de ``rows`` respondientes con el importador masivo (el
+    mismo camino que las subidas) y devuelve el resultado de la importación.
+    """
+    chunk_size = batch_size or DEFAULT_BATCH_SIZE
+    return import_chunks(synthetic_chunks(rows, chunk_size, seed), batch_size=batch_size)
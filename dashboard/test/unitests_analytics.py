@@ -0,0 +1,393 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from datetime import timedelta
+from django.db import OperationalError, transaction
+from django.utils import timezone
+from unittest import mock
+import numpy as np
+import pandas as pd
+from ..aggregates import age_band, rebuild_aggregates
+from ..clustering import kmeans, run_clustering
+from ..dataset import get_dataset_version
+from ..ingest import import_chunks, import_dataframe
+from ..models import Respondent, PersonalityFactors, Categorization, ScoreAggregate, ImportJob, ClusteringRun, \
+    ClusterAssignment, PERSONALITY_COLUMNS
+from .unitests_ingest import make_frame
+
+
+def create_respondent(name, age, gender, factors=None, categories=None):
+    respondent = Respondent.objects.create(name=name, age=age, gender=gender)
+    PersonalityFactors.objects.create(respondent=respondent, **(factors or {}))
+    Categorization.objects.create(respondent=respondent, **(categories or {}))
+    return respondent
+
+
+class StatsViewTests(APITestCase):
+
+    def setUp(self):
+        create_respondent('Ana', 20, 'F', {'A': 2, 'B': 4}, {'An': 1})
+        create_respondent('Luis', 30, 'M', {'A': 4, 'B': 6}, {'An': 3})
+        create_respondent('Eva', 40, 'F', {'A': 6}, {'An': 5})
+
+    def test_descriptive_statistics(self):
+        response = self.client.get('/api/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        a = response.data['factors']['A']
+        self.assertEqual(a['count'], 3)
+        self.assertAlmostEqual(a['mean'], 4.0)
+        self.assertAlmostEqual(a['std'], 2.0)
+        self.assertEqual((a['min'], a['max']), (2.0, 6.0))
+        self.assertEqual(a['percentiles'], {'25': 3.0, '50': 4.0, '75': 5.0})
+        # Los valores faltantes se ignoran
+        self.assertEqual(response.data['factors']['B']['count'], 2)
+        self.assertIsNone(response.data['factors']['C']['mean'])
+        self.assertAlmostEqual(response.data['categories']['An']['mean'], 3.0)
+
+    def test_filters_and_custom_percentiles(self):
+        response = self.client.get('/api/stats/', {'gender': 'femenino', 'age_min': 25, 'percentiles': '10,90'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['factors']['A']['percentiles'], {'10': 6.0, '90': 6.0})
+
+    def test_empty_selection(self):
+        response = self.client.get('/api/stats/', {'age_min': 90})
+        self.assertEqual(response.data['count'], 0)
+        self.assertIsNone(response.data['factors']['A']['max'])
+
+    def test_invalid_parameters(self):
+        response = self.client.get('/api/stats/', {'percentiles': '50,200'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        for value in ('nan', 'inf', '50,-inf'):
+            response = self.client.get('/api/stats/', {'percentiles': value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, value)
+        response = self.client.get('/api/stats/', {'age_min': 'old'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("'age_min' must be an integer", response.data['error'])
+
+
+class CorrelationMatrixViewTests(APITestCase):
+
+    def setUp(self):
+        create_respondent('Ana', 20, 'F', {'A': 1, 'B': 2, 'C': 9}, {'An': 1})
+        create_respondent('Luis', 30, 'M', {'A': 2, 'B': 4, 'C': 5}, {'An': 4})
+        create_respondent('Eva', 40, 'F', {'A': 3, 'B': 7, 'C': 4}, {'An': 9})
+
+    def cell(self, data, row, col):
+        columns = data['columns']
+        return data['matrix'][columns.index(row)][columns.index(col)]
+
+    def test_pearson_and_spearman(self):
+        pearson = self.client.get('/api/correlations/').data
+        self.assertEqual(len(pearson['matrix']), 26)
+        self.assertEqual(pearson['count'], 3)
+        self.assertAlmostEqual(self.cell(pearson, 'A', 'A'), 1.0)
+        self.assertLess(self.cell(pearson, 'A', 'C'), 0)
+        self.assertIsNone(self.cell(pearson, 'A', 'Q4'))
+
+        spearman = self.client.get('/api/correlations/', {'method': 'spearman'}).data
+        self.assertAlmostEqual(self.cell(spearman, 'A', 'B'), 1.0)
+        self.assertAlmostEqual(self.cell(spearman, 'A', 'An'), 1.0)
+
+    def test_cached_until_data_changes(self):
+        self.client.get('/api/correlations/')
+        with self.assertNumQueries(1):  # solo la versión de los datos
+            response = self.client.get('/api/correlations/')
+        self.assertEqual(response.json()['count'], 3)
+
+        create_respondent('Juan', 50, 'M', {'A': 4, 'B': 1, 'C': 1})
+        response = self.client.get('/api/correlations/')
+        self.assertEqual(response.data['count'], 4)
+
+    def test_invalid_method(self):
+        response = self.client.get('/api/correlations/', {'method': 'kendall'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ScoreAggregateTests(APITestCase):
+
+    def stored(self):
+        return {
+            (row.gender, row.age_band, row.column): (row.count, row.total, row.total_sq)
+            for row in ScoreAggregate.objects.filter(count__gt=0)
+        }
+
+    def test_one_rebuild_per_transaction(self):
+        respondents = [create_respondent(f'R{i}', 30, 'M', {'A': i % 10 + 1}) for i in range(20)]
+        with mock.patch('dashboard.aggregates.rebuild_aggregates', wraps=rebuild_aggregates) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    # Cada respondiente borra en cascada sus factores y su categorización
+                    for respondent in respondents[:10]:
+                        respondent.delete()
+                    Respondent.objects.filter(pk__in=[r.pk for r in respondents[10:15]]).delete()
+        self.assertEqual(rebuild.call_count, 1)
+        self.assertEqual(self.stored()[('M', '25-34', 'A')][0], 5)
+
+    def test_band_labels(self):
+        self.assertEqual(list(age_band([5, 18, 24, 25, 64, 65, 90])),
+                         ['<18', '18-24', '18-24', '25-34', '55-64', '65+', '65+'])
+
+    def test_import_updates_aggregates_incrementally(self):
+        import_dataframe(make_frame(40))
+        # 20 actualizaciones (cambian de grupo y de valores) y 5 altas
+        frame = pd.concat([make_frame(20), make_frame(5, offset=100)], ignore_index=True)
+        frame.loc[:19, ['age', 'gender', 'A', 'Q4']] = [70, 'Femenino', 9.0, None]
+        import_dataframe(frame)
+
+        incremental = self.stored()
+        rebuild_aggregates()
+        rebuilt = self.stored()
+        self.assertEqual(incremental.keys(), rebuilt.keys())
+        for key, values in rebuilt.items():
+            for value, expected in zip(incremental[key], values):
+                self.assertAlmostEqual(value, expected)
+        self.assertEqual(incremental['F', '65+', 'A'], (20, 180.0, 1620.0))
+        self.assertNotIn(('F', '65+', 'Q4'), incremental)
+
+    def test_group_stats_endpoint(self):
+        frame = make_frame(40)
+        import_dataframe(frame)
+        with self.assertNumQueries(2):  # versión de los datos y ScoreAggregate
+            response = self.client.get('/api/stats/groups/', {'gender': 'Femenino'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        groups = response.data['groups']
+        self.assertEqual([g['age_band'] for g in groups], ['18-24', '25-34', '35-44', '45-54'])
+        self.assertTrue(all(g['gender'] == 'F' for g in groups))
+
+        expected = frame[(frame['gender'] == 'Femenino') & (frame['age'] < 25)]['Ex']
+        stats = groups[0]['categories']['Ex']
+        self.assertEqual(stats['count'], len(expected))
+        self.assertAlmostEqual(stats['mean'], expected.mean())
+        self.assertAlmostEqual(stats['std'], expected.std())
+
+
+class CohortComparisonTests(APITestCase):
+
+    def setUp(self):
+        self.frame = make_frame(60)
+        import_dataframe(self.frame)
+
+    def test_two_cohorts(self):
+        response = self.client.get('/api/cohorts/', {'cohort': ['gender:M,label:Hombres', 'gender:F,label:Mujeres'],
+                                                     'columns': 'A,Ex'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        men = self.frame[self.frame['gender'] == 'Masculino']['A']
+        women = self.frame[self.frame['gender'] == 'Femenino']['A']
+
+        cohorts = response.data['cohorts']
+        self.assertEqual([c['label'] for c in cohorts], ['Hombres', 'Mujeres'])
+        self.assertEqual(cohorts[0]['count'], len(men))
+        self.assertAlmostEqual(cohorts[0]['scores']['A']['mean'], men.mean())
+        self.assertAlmostEqual(cohorts[1]['scores']['A']['std'], women.std())
+
+        comparison = response.data['comparisons'][0]
+        self.assertEqual(comparison['cohorts'], ['Hombres', 'Mujeres'])
+        pooled = (((len(men) - 1) * men.var() + (len(women) - 1) * women.var()) / (len(men) + len(women) - 2)) ** 0.5
+        welch_t = (men.mean() - women.mean()) / (men.var() / len(men) + women.var() / len(women)) ** 0.5
+        stats = comparison['scores']['A']
+        self.assertAlmostEqual(stats['cohens_d'], (men.mean() - women.mean()) / pooled)
+        self.assertAlmostEqual(stats['t'], welch_t)
+        self.assertTrue(0 <= stats['p_value'] <= 1)
+        self.assertIn('Ex', comparison['scores'])
+
+    def test_overlapping_cohorts_and_age_ranges(self):
+        response = self.client.get('/api/cohorts/', {'cohort': ['age_max:29', 'age_min:30', 'gender:F']})
+        counts = [c['count'] for c in response.data['cohorts']]
+        self.assertEqual(counts, [(self.frame['age'] <= 29).sum(), (self.frame['age'] >= 30).sum(), 30])
+        self.assertEqual(len(response.data['comparisons']), 3)
+        self.assertEqual(response.data['columns'], PERSONALITY_COLUMNS)
+
+    def test_import_job_cohorts(self):
+        job = ImportJob.objects.create(original_name='batch.csv')
+        import_chunks([make_frame(10, offset=1000)], job=job)
+        response = self.client.get('/api/cohorts/', {'cohort': [f'import_job:{job.pk}', 'label:Todos']})
+        self.assertEqual([c['count'] for c in response.data['cohorts']], [10, 70])
+
+    def test_invalid_cohorts(self):
+        response = self.client.get('/api/cohorts/', {'cohort': 'gender:M'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/cohorts/', {'cohort': ['gender:M', 'height:2']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Invalid cohort', response.data['error'])
+        response = self.client.get('/api/cohorts/', {'cohort': ['gender:M', 'gender:F'], 'columns': 'A,Z'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SimilarRespondentsTests(APITestCase):
+
+    def setUp(self):
+        # Puntajes aleatorios para que no haya empates en las distancias
+        self.frame = make_frame(30)
+        self.frame[PERSONALITY_COLUMNS] = np.random.default_rng(0).uniform(1, 10, (30, len(PERSONALITY_COLUMNS)))
+        import_dataframe(self.frame)
+        self.ids = dict(Respondent.objects.values_list('name', 'id'))
+
+    def expected(self, name, k, metric):
+        vectors = self.frame.set_index('name')[PERSONALITY_COLUMNS]
+        target = vectors.loc[name]
+        if metric == 'cosine':
+            distances = 1 - vectors @ target / ((vectors ** 2).sum(axis=1) ** 0.5 * (target ** 2).sum() ** 0.5)
+        else:
+            distances = ((vectors - target) ** 2).sum(axis=1) ** 0.5
+        return distances.drop(name).sort_values(kind='stable')[:k]
+
+    def test_euclidean_neighbors(self):
+        pk = self.ids['Respondent 3']
+        response = self.client.get(f'/api/respondents/{pk}/similar/', {'k': 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        expected = self.expected('Respondent 3', 5, 'euclidean')
+        self.assertEqual(len(results), 5)
+        self.assertNotIn(pk, [r['id'] for r in results])
+        for result, distance in zip(results, expected):
+            self.assertAlmostEqual(result['distance'], distance, places=5)
+        self.assertEqual(results[0]['name'], expected.index[0])
+
+    def test_cosine_neighbors(self):
+        pk = self.ids['Respondent 7']
+        results = self.client.get(f'/api/respondents/{pk}/similar/', {'k': 3, 'metric': 'cosine'}).data['results']
+        expected = self.expected('Respondent 7', 3, 'cosine')
+        self.assertEqual([round(r['distance'], 6) for r in results], [round(d, 6) for d in expected])
+
+    def test_index_follows_uploads(self):
+        pk = self.ids['Respondent 0']
+        self.client.get(f'/api/respondents/{pk}/similar/')
+        twin = self.frame.iloc[[0]].copy()
+        twin['name'] = 'Twin'
+        import_dataframe(twin)
+        with self.assertNumQueries(3):  # versión, índice nuevo (una lectura) y datos de los resultados
+            results = self.client.get(f'/api/respondents/{pk}/similar/', {'k': 1}).data['results']
+        self.assertEqual(results[0]['name'], 'Twin')
+        self.assertEqual(results[0]['distance'], 0.0)
+        with self.assertNumQueries(2):  # versión de los datos y datos de los resultados
+            self.client.get(f'/api/respondents/{pk}/similar/', {'k': 2})
+
+    def test_errors(self):
+        pk = self.ids['Respondent 0']
+        response = self.client.get(f'/api/respondents/{pk}/similar/', {'metric': 'manhattan'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(f'/api/respondents/{pk}/similar/', {'k': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/respondents/999999/similar/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ClusteringTests(APITestCase):
+
+    def setUp(self):
+        # Tres grupos bien separados en los 16 factores
+        self.frame = make_frame(60)
+        centers = np.array([2.0, 5.5, 9.0])
+        rng = np.random.default_rng(1)
+        self.groups = np.arange(60) % 3
+        self.frame[PERSONALITY_COLUMNS] = np.clip(centers[self.groups][:, None] + rng.normal(0, 0.3, (60, 16)), 1, 10)
+        import_dataframe(self.frame)
+        settings_override = self.settings(DASHBOARD_IMPORT_JOBS_EAGER=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def assert_recovers_groups(self, labels):
+        # Cada grupo original cae completo en un solo grupo, distinto para cada uno
+        mapping = {group: set(labels[self.groups == group]) for group in range(3)}
+        self.assertTrue(all(len(found) == 1 for found in mapping.values()))
+        self.assertEqual(len(set.union(*mapping.values())), 3)
+
+    def test_kmeans_lloyd_and_mini_batch(self):
+        X = self.frame[PERSONALITY_COLUMNS].to_numpy()
+        for batch_size in (None, 16):
+            centroids, labels, distances, iterations = kmeans(X, 3, np.random.default_rng(0), batch_size=batch_size)
+            self.assertEqual(centroids.shape, (3, 16))
+            self.assert_recovers_groups(labels)
+            self.assertLess(distances.mean(), 16 * 0.3 ** 2 * 2)
+
+    def test_clusters_endpoint(self):
+        response = self.client.get('/api/clusters/', {'k': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ClusteringRun.SUCCEEDED)
+        self.assertEqual(response.data['algorithm'], 'lloyd')
+        self.assertEqual(sorted(response.data['sizes']), [20, 20, 20])
+        self.assertEqual(set(response.data['centroids'][0]), set(PERSONALITY_COLUMNS))
+
+        # El resultado se reutiliza mientras no cambien los datos
+        run_id = response.data['id']
+        with self.assertNumQueries(2):  # la versión de los datos y la lectura del agrupamiento
+            self.assertEqual(self.client.get('/api/clusters/', {'k': 3}).data['id'], run_id)
+
+        assignments = self.client.get(f'/api/clustering-runs/{run_id}/assignments/').data
+        self.assertEqual(len(assignments), 60)
+        names = self.frame['name'].tolist()
+        labels = np.array([a['cluster'] for a in sorted(assignments, key=lambda a: names.index(a['respondent_name']))])
+        self.assert_recovers_groups(labels)
+
+        page = self.client.get(f'/api/clustering-runs/{run_id}/assignments/', {'cluster': 0, 'limit': 5}).data
+        self.assertEqual(len(page['results']), 5)
+        self.assertTrue(all(a['cluster'] == 0 for a in page['results']))
+
+    def test_recomputed_after_upload(self):
+        first = self.client.get('/api/clusters/', {'k': 3}).data['id']
+        import_dataframe(make_frame(3, offset=500))
+        second = self.client.get('/api/clusters/', {'k': 3}).data
+        self.assertNotEqual(second['id'], first)
+        self.assertEqual(second['respondents'], 63)
+        # Solo se conserva el último agrupamiento de cada k
+        self.assertFalse(ClusteringRun.objects.filter(pk=first).exists())
+
+    def test_failed_run_not_retried_until_data_changes(self):
+        Respondent.objects.exclude(pk__in=Respondent.objects.order_by('id')[:2]).delete()
+        responses = [self.client.get('/api/clusters/', {'k': 3}) for _ in range(3)]
+        self.assertEqual({response.status_code for response in responses}, {status.HTTP_200_OK})
+        self.assertEqual({response.data['status'] for response in responses}, {ClusteringRun.FAILED})
+        self.assertEqual(len({response.data['id'] for response in responses}), 1)
+        self.assertEqual(ClusteringRun.objects.count(), 1)
+
+        # Con datos nuevos se reintenta y el fallido se descarta
+        import_dataframe(make_frame(3, offset=500))
+        response = self.client.get('/api/clusters/', {'k': 3})
+        self.assertEqual(response.data['status'], ClusteringRun.SUCCEEDED)
+        self.assertEqual(list(ClusteringRun.objects.values_list('id', flat=True)), [response.data['id']])
+
+    def test_abandoned_run_is_requeued(self):
+        # Encolado por un proceso que se reinició antes de ejecutarlo
+        abandoned = ClusteringRun.objects.create(k=3, dataset_version=get_dataset_version())
+        ClusteringRun.objects.filter(pk=abandoned.pk).update(created_at=timezone.now() - timedelta(hours=2))
+        with self.settings(DASHBOARD_IMPORT_JOBS_EAGER=False):
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.client.get('/api/clusters/', {'k': 3})
+        self.assertNotEqual(response.data['id'], abandoned.pk)
+        self.assertEqual(len(callbacks), 1)
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, ClusteringRun.FAILED)
+
+        # Uno reciente sigue en espera
+        with self.settings(DASHBOARD_IMPORT_JOBS_EAGER=False):
+            self.assertEqual(self.client.get('/api/clusters/', {'k': 3}).status_code, status.HTTP_202_ACCEPTED)
+
+    def test_run_fails_when_it_cannot_start(self):
+        run = ClusteringRun.objects.create(k=3, dataset_version=get_dataset_version())
+        save = ClusteringRun.save
+
+        def locked_save(instance, *args, **kwargs):
+            if kwargs.get('update_fields') == ['status', 'started_at']:
+                raise OperationalError('database is locked')
+            return save(instance, *args, **kwargs)
+
+        with mock.patch.object(ClusteringRun, 'save', locked_save):
+            run_clustering(run.pk)
+        run.refresh_from_db()
+        self.assertEqual(run.status, ClusteringRun.FAILED)
+        self.assertEqual(run.error, 'database is locked')
+
+    def test_assignments_written_in_batches(self):
+        run = ClusteringRun.objects.create(k=3, dataset_version=get_dataset_version())
+        bulk_create = ClusterAssignment.objects.bulk_create
+        with mock.patch('dashboard.clustering.ASSIGNMENT_BATCH_SIZE', 25), \
+                mock.patch.object(ClusterAssignment.objects, 'bulk_create', wraps=bulk_create) as batches:
+            run_clustering(run.pk)
+        self.assertEqual([len(call.args[0]) for call in batches.call_args_list], [25, 25, 10])
+        self.assertEqual(run.assignments.count(), 60)
+
+    def test_invalid_k(self):
+        response = self.client.get('/api/clusters/', {'k': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/clustering-runs/999999/assignments/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,22 +1,47 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.core.files.uploadedfile import SimpleUploadedFile
-from ..models import Respondent, PersonalityFactors, Categorization
+from django.conf import settings
+from django.core.management import call_command
+from django.db import OperationalError
+from ..exports import EXPORT_COLUMNS, xlsx_chunks
+from ..ingest import BulkImporter
+from ..jobs import get_executor, get_import_executor, run_import
+from ..metrics import registry
+from ..profiling import list_profiles
+from ..renderers import FastJSONRenderer
+from ..models import Respondent, PersonalityFactors, Categorization, ImportJob, DatasetVersion
+import msgpack
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
 
 class ExcelUploadViewTests(APITestCase):
 
     def setUp(self):
+        # Guardar los archivos subidos en un directorio temporal y ejecutar las importaciones en el mismo hilo
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = self.settings(MEDIA_ROOT=media_root, DASHBOARD_IMPORT_JOBS_EAGER=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
         # Crear un archivo Excel simulado
         data = {
             'name': ['John Doe'],
             'age': [25],
             'gender': ['Male'],
             'A': [1], 'B': [2], 'C': [3], 'D': [4], 'E': [5], 'F': [6], 'G': [7], 'H': [8],
-            'I': [9], 'L': [10], 'M': [11], 'N': [12], 'O': [13], 'Q1': [14], 'Q2': [15], 'Q3': [16], 'Q4': [17],
-            'An': [18], 'Ex': [19], 'So': [20], 'In': [21], 'Ob': [22], 'Cr': [23], 'Ne': [24], 'Ps': [25], 'Li': [26], 'Ac': [27]
+            'I': [9], 'L': [10], 'M': [1], 'N': [2], 'O': [3], 'Q1': [4], 'Q2': [5], 'Q3': [6], 'Q4': [7],
+            'An': [8], 'Ex': [9], 'So': [10], 'In': [1], 'Ob': [2], 'Cr': [3], 'Ne': [4], 'Ps': [5], 'Li': [6], 'Ac': [7]
         }
         self.df = pd.DataFrame(data)
         excel_buffer = io.BytesIO()
@@ -25,11 +50,119 @@ class ExcelUploadViewTests(APITestCase):
 
     def test_valid_excel_upload(self):
         response = self.client.post('/api/upload-excel/', {'file': self.excel_file}, format='multipart')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(Respondent.objects.count(), 1)
         self.assertEqual(PersonalityFactors.objects.count(), 1)
         self.assertEqual(Categorization.objects.count(), 1)
 
+    def test_upload_returns_job_status(self):
+        response = self.client.post('/api/upload-excel/', {'file': self.excel_file}, format='multipart')
+        job_id = response.data['job_id']
+        self.assertEqual(ImportJob.objects.get(pk=job_id).original_name, 'test.xlsx')
+
+        response = self.client.get(f'/api/import-jobs/{job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ImportJob.SUCCEEDED)
+        self.assertEqual(response.data['rows_processed'], 1)
+        self.assertEqual(response.data['rows_created'], 1)
+        self.assertIsNotNone(response.data['throughput'])
+
+    def test_uploaded_file_deleted_after_import(self):
+        response = self.client.post('/api/upload-excel/', {'file': self.excel_file}, format='multipart')
+        job = ImportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, ImportJob.SUCCEEDED)
+        self.assertFalse(job.file)
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'imports')), [])
+
+    def test_failed_job_reports_saved_chunks(self):
+        frame = pd.concat([self.df.assign(name=f'Person {i}') for i in range(5)], ignore_index=True)
+        frame['age'] = frame['age'].astype(object)
+        frame.loc[1, 'age'] = 'not a number'
+        upload = SimpleUploadedFile("test.csv", frame.to_csv(index=False).encode(), content_type="text/csv")
+        write_valid = BulkImporter.write_valid
+
+        def failing_write_valid(importer, valid):
+            # El segundo bloque no llega a guardarse
+            if importer.rows > 2:
+                raise OperationalError('disk I/O error')
+            return write_valid(importer, valid)
+
+        with self.settings(DASHBOARD_IMPORT_BATCH_SIZE=2), \
+                mock.patch.object(BulkImporter, 'write_valid', failing_write_valid):
+            response = self.client.post('/api/upload/', {'file': upload}, format='multipart')
+        job = ImportJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertEqual(job.error, 'disk I/O error')
+        self.assertEqual(
+            (job.rows_processed, job.rows_created, job.rows_updated, job.rows_rejected), (2, 1, 0, 1)
+        )
+        self.assertEqual([error['row'] for error in job.errors], [3])
+        self.assertEqual(Respondent.objects.count(), 1)
+
+    def test_sqlite_imports_use_a_dedicated_worker(self):
+        # Las importaciones en espera no ocupan los hilos de los agrupamientos
+        self.assertIsNot(get_import_executor(), get_executor())
+        self.assertEqual(get_import_executor()._max_workers, 1)
+        pool = mock.Mock()
+        with self.settings(DASHBOARD_IMPORT_JOBS_EAGER=False), \
+                mock.patch('dashboard.jobs.get_import_executor', return_value=pool), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/upload-excel/', {'file': self.excel_file}, format='multipart')
+        self.assertEqual(response.data['status'], ImportJob.PENDING)
+        self.assertEqual(pool.submit.call_args.args[1:], (run_import, response.data['job_id']))
+
+    def test_job_fails_when_it_cannot_start(self):
+        job = ImportJob.objects.create(file=self.excel_file, original_name='test.xlsx')
+        save = ImportJob.save
+
+        def locked_save(instance, *args, **kwargs):
+            # La primera escritura (el paso a RUNNING) encuentra la base bloqueada
+            if kwargs.get('update_fields') == ['status', 'started_at']:
+                raise OperationalError('database is locked')
+            return save(instance, *args, **kwargs)
+
+        with mock.patch.object(ImportJob, 'save', locked_save):
+            run_import(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.FAILED)
+        self.assertEqual(job.error, 'database is locked')
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(job.file)
+
+    def test_upload_records_metrics(self):
+        registry.clear()
+        self.client.post('/api/upload-excel/', {'file': self.excel_file}, format='multipart')
+        metrics = self.client.get('/api/metrics/').content.decode()
+        self.assertIn('dashboard_import_jobs_total{status="succeeded"} 1', metrics)
+        self.assertIn('dashboard_import_rows_total{outcome="created"} 1', metrics)
+        self.assertIn('dashboard_import_rows_count 1', metrics)
+
+    def test_job_reports_row_errors(self):
+        df = self.df.copy()
+        df.loc[1] = df.loc[0]
+        df.loc[1, 'name'] = 'Jane Doe'
+        df['age'] = df['age'].astype(object)
+        df.loc[1, 'age'] = 'unknown'
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        upload = SimpleUploadedFile("errors.xlsx", buffer.getvalue(), content_type="application/vnd.ms-excel")
+
+        response = self.client.post('/api/upload-excel/', {'file': upload}, format='multipart')
+        response = self.client.get(f"/api/import-jobs/{response.data['job_id']}/")
+        self.assertEqual(response.data['status'], ImportJob.SUCCEEDED)
+        self.assertEqual(response.data['rows_processed'], 2)
+        self.assertEqual(response.data['rows_rejected'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 3)
+        self.assertIn("'age'", response.data['errors'][0]['error'])
+        self.assertEqual(Respondent.objects.count(), 1)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile("test.csv", self.df.to_csv(index=False).encode(), content_type="text/csv")
+        response = self.client.post('/api/upload/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['format'], 'csv')
+        self.assertEqual(Respondent.objects.count(), 1)
+
     def test_missing_file(self):
         response = self.client.post('/api/upload-excel/', {}, format='multipart')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -119,3 +252,536 @@ class CategorizationFilterViewTests(APITestCase):
         response = self.client.get('/api/categorization-filter/', {'category1': 'X', 'category2': 'Ex'})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("Invalid categories", response.data['error'])
+
+
+class KeysetPaginationTests(APITestCase):
+
+    def setUp(self):
+        for i in range(5):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=20 + i, gender="M")
+            PersonalityFactors.objects.create(respondent=respondent, A=i, B=i + 1)
+        self.ids = list(Respondent.objects.order_by('id').values_list('id', flat=True))
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get('/api/respontents/')
+        self.assertEqual(len(response.data), 5)
+
+    def test_respondent_pages(self):
+        response = self.client.get('/api/respontents/', {'limit': 2})
+        self.assertEqual([r['id'] for r in response.data['results']], self.ids[:2])
+        self.assertEqual(response.data['next_after'], self.ids[1])
+
+        response = self.client.get('/api/respontents/', {'limit': 2, 'after': self.ids[3]})
+        self.assertEqual([r['id'] for r in response.data['results']], self.ids[4:])
+        self.assertIsNone(response.data['next'])
+
+    def test_filter_view_pages_by_respondent_id(self):
+        response = self.client.get('/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B', 'limit': 3})
+        self.assertEqual([r['annotated_respondent_id'] for r in response.data['results']], self.ids[:3])
+        self.assertIn(f'after={self.ids[2]}', response.data['next'])
+
+    def test_invalid_limit(self):
+        response = self.client.get('/api/respontents/', {'limit': 'many'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("'limit' must be a positive integer", response.data['error'])
+
+    def test_stream(self):
+        response = self.client.get('/api/respontents/', {'stream': 'true', 'after': self.ids[0]})
+        self.assertTrue(response.streaming)
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([r['id'] for r in rows], self.ids[1:])
+        self.assertEqual(set(rows[0]), {'id', 'name', 'age', 'gender'})
+
+    def test_stream_filter_view(self):
+        response = self.client.get('/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B', 'stream': '1'})
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['factor2'], 1)
+
+
+class ScatterModeTests(APITestCase):
+
+    def setUp(self):
+        for i in range(40):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=20, gender="M")
+            # 30 puntos en (2, 2) y 10 repartidos en la diagonal
+            value = 2 if i < 30 else i - 29
+            PersonalityFactors.objects.create(respondent=respondent, A=value, B=value)
+            Categorization.objects.create(respondent=respondent, An=value, Ex=10)
+        self.url = '/api/personality-factors-filter/'
+
+    def test_histogram(self):
+        response = self.client.get(self.url, {'factor1': 'A', 'factor2': 'B', 'mode': 'histogram', 'bins': 9})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 40)
+        self.assertEqual(len(response.data['counts']), 9)
+        self.assertEqual(sum(map(sum, response.data['counts'])), 40)
+        self.assertEqual(response.data['counts'][1][1], 31)
+
+    def test_hexbin(self):
+        response = self.client.get('/api/categorization-filter/',
+                                   {'category1': 'An', 'category2': 'Ex', 'mode': 'hexbin', 'gridsize': 5})
+        hexagons = response.data['hexagons']
+        self.assertEqual(sum(h['count'] for h in hexagons), 40)
+        self.assertLessEqual(len(hexagons), 40)
+
+    def test_random_sample(self):
+        params = {'factor1': 'A', 'factor2': 'B', 'mode': 'sample', 'size': 10, 'seed': 1}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.data['size'], 10)
+        self.assertEqual(len({r['annotated_respondent_id'] for r in response.data['results']}), 10)
+        self.assertTrue(all(r['respondent_name'].startswith('Respondent') for r in response.data['results']))
+        self.assertEqual(self.client.get(self.url, params).json()['results'], response.data['results'])
+
+    def test_stratified_sample_keeps_sparse_cells(self):
+        response = self.client.get(self.url, {'factor1': 'A', 'factor2': 'B', 'mode': 'sample',
+                                              'size': 10, 'strategy': 'stratified', 'seed': 3})
+        values = {r['factor1'] for r in response.data['results']}
+        self.assertLessEqual(response.data['size'], 10)
+        self.assertGreaterEqual(len(values), 9)
+
+    def test_invalid_mode_parameters(self):
+        response = self.client.get(self.url, {'factor1': 'A', 'factor2': 'B', 'mode': 'pie'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'factor1': 'A', 'factor2': 'B', 'mode': 'histogram', 'bins': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("'bins' must be between", response.data['error'])
+
+
+class ColumnarShapeTests(APITestCase):
+
+    def setUp(self):
+        for i in range(5):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=20 + i, gender="F")
+            PersonalityFactors.objects.create(respondent=respondent, A=i + 1, B=10 - i)
+        self.url = '/api/personality-factors-filter/'
+        self.params = {'factor1': 'A', 'factor2': 'B', 'shape': 'columnar'}
+
+    def test_columnar_filter(self):
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(list(data), ['ids', 'names', 'factor1', 'factor2'])
+        rows = self.client.get(self.url, {'factor1': 'A', 'factor2': 'B'}).json()
+        self.assertEqual(data['ids'], [r['annotated_respondent_id'] for r in rows])
+        self.assertEqual(data['names'], [r['respondent_name'] for r in rows])
+        self.assertEqual(data['factor2'], [r['factor2'] for r in rows])
+
+    def test_columnar_page(self):
+        response = self.client.get(self.url, {**self.params, 'limit': 2})
+        data = response.json()
+        self.assertEqual(data['results']['factor1'], [1, 2])
+        self.assertEqual(data['next_after'], data['results']['ids'][-1])
+        response = self.client.get(self.url, {**self.params, 'limit': 2, 'after': data['next_after']})
+        self.assertEqual(response.json()['results']['factor1'], [3, 4])
+
+    def test_columnar_sample(self):
+        response = self.client.get(self.url, {**self.params, 'mode': 'sample', 'size': 3, 'seed': 1})
+        results = response.json()['results']
+        self.assertEqual(set(results), {'ids', 'names', 'factor1', 'factor2'})
+        self.assertEqual(len(results['ids']), 3)
+
+    def test_columnar_respondents_and_query(self):
+        data = self.client.get('/api/respontents/', {'shape': 'columnar'}).json()
+        self.assertEqual(data['age'], [20, 21, 22, 23, 24])
+        self.assertEqual(len(data['names']), 5)
+        data = self.client.get('/api/query/', {'A__gte': 4, 'shape': 'columnar'}).json()
+        self.assertEqual(data['A'], [4, 5])
+
+    def test_empty(self):
+        data = self.client.get('/api/query/', {'A__gte': 10, 'shape': 'columnar'}).json()
+        self.assertEqual(data, {'ids': [], 'names': [], 'age': [], 'gender': [], 'A': []})
+
+    def test_fast_renderer(self):
+        data = {'values': np.array([1.5, 2.0]), 'rows': Respondent.objects.values('name')[:1], 'missing': float('nan')}
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)),
+                         {'values': [1.5, 2.0], 'rows': [{'name': 'Respondent 0'}], 'missing': None})
+
+    def test_invalid_shape(self):
+        response = self.client.get(self.url, {**self.params, 'shape': 'table'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {**self.params, 'stream': '1'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BinaryRendererTests(APITestCase):
+
+    def setUp(self):
+        for i in range(5):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=20 + i, gender="F")
+            PersonalityFactors.objects.create(respondent=respondent, A=i + 1, B=None if i == 0 else 10 - i)
+        self.url = '/api/personality-factors-filter/'
+        self.params = {'factor1': 'A', 'factor2': 'B'}
+
+    def test_arrow_filter(self):
+        response = self.client.get(self.url, self.params, HTTP_ACCEPT='application/vnd.apache.arrow.stream')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.column_names, ['ids', 'names', 'factor1', 'factor2'])
+        self.assertEqual(table.schema.field('factor2').type, pa.float64())
+        self.assertEqual(table.column('factor2').to_pylist(), [None, 9.0, 8.0, 7.0, 6.0])
+
+    def test_arrow_scores_are_double_when_all_null(self):
+        for params in ({**self.params, 'factor2': 'C'}, {**self.params, 'factor2': 'C', 'limit': 2}):
+            response = self.client.get(self.url, params, HTTP_ACCEPT='application/vnd.apache.arrow.stream')
+            table = pa.ipc.open_stream(response.content).read_all()
+            self.assertEqual(table.schema.field('factor2').type, pa.float64())
+            self.assertEqual(table.column('factor2').null_count, table.num_rows)
+
+    def test_arrow_page_metadata(self):
+        response = self.client.get(self.url, {**self.params, 'limit': 2, 'format': 'arrow'})
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(json.loads(table.schema.metadata[b'next_after']), table.column('ids')[-1].as_py())
+
+    def test_msgpack_list(self):
+        response = self.client.get('/api/respontents/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        data = msgpack.unpackb(response.content)
+        self.assertEqual(data['age'], [20, 21, 22, 23, 24])
+
+    def test_rows_shape_still_available(self):
+        response = self.client.get(self.url, {**self.params, 'shape': 'rows', 'format': 'msgpack'})
+        self.assertEqual(msgpack.unpackb(response.content)[1]['factor2'], 9.0)
+
+    def test_cached_per_format(self):
+        json_response = self.client.get(self.url, self.params)
+        binary = self.client.get(self.url, self.params, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(binary['X-Cache'], 'miss')
+        self.assertEqual(msgpack.unpackb(binary.content)['ids'], [r['annotated_respondent_id'] for r in json_response.json()])
+
+
+class QueryViewTests(APITestCase):
+
+    def setUp(self):
+        values = [(8, 2, 7, 'M', 25), (8, 5, 7, 'F', 30), (6, 2, 9, 'M', 40), (9, 1, 4, 'M', 50)]
+        for i, (a, q4, ex, gender, age) in enumerate(values):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=age, gender=gender)
+            PersonalityFactors.objects.create(respondent=respondent, A=a, Q4=q4)
+            Categorization.objects.create(respondent=respondent, Ex=ex)
+
+    def test_multiple_predicates(self):
+        response = self.client.get('/api/query/', {'A__gte': 7, 'Q4__lte': 3, 'Ex__gte': 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['name'] for r in response.data], ['Respondent 0'])
+        self.assertEqual((response.data[0]['A'], response.data[0]['Q4'], response.data[0]['Ex']), (8, 2, 7))
+
+    def test_predicates_with_respondent_filters_and_pages(self):
+        response = self.client.get('/api/query/', {'A__gt': 5, 'gender': 'M', 'age_max': 45, 'limit': 1})
+        self.assertEqual([r['name'] for r in response.data['results']], ['Respondent 0'])
+        response = self.client.get('/api/query/', {'A__gt': 5, 'gender': 'M', 'age_max': 45, 'limit': 1,
+                                                   'after': response.data['next_after']})
+        self.assertEqual([r['name'] for r in response.data['results']], ['Respondent 2'])
+        self.assertIsNone(response.data['next'])
+
+    def test_format_parameter_is_not_a_predicate(self):
+        response = self.client.get('/api/query/', {'A__gte': 7, 'Q4__lte': 3, 'format': 'json'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['name'] for r in response.data], ['Respondent 0', 'Respondent 3'])
+        response = self.client.get('/api/query/', {'A__gte': 7, 'Q4__lte': 3, 'format': 'msgpack'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(msgpack.unpackb(response.content)['names'], ['Respondent 0', 'Respondent 3'])
+
+    def test_invalid_predicates(self):
+        response = self.client.get('/api/query/', {'Z__gte': 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Invalid factor or category 'Z'", response.data['error'])
+        response = self.client.get('/api/query/', {'A__between': 1})
+        self.assertIn("Invalid operator", response.data['error'])
+        response = self.client.get('/api/query/', {'A__gte': 'high'})
+        self.assertIn("'A__gte' must be a number", response.data['error'])
+
+
+class RespondentProfileTests(APITestCase):
+
+    def setUp(self):
+        self.respondents = []
+        for i in range(3):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=20 + i, gender="F")
+            PersonalityFactors.objects.create(respondent=respondent, A=i + 1, Q4=5)
+            Categorization.objects.create(respondent=respondent, An=i + 2)
+            self.respondents.append(respondent)
+        self.lonely = Respondent.objects.create(name="No scores", age=30, gender="M")
+
+    def test_profile_in_one_query(self):
+        respondent = self.respondents[1]
+        with self.assertNumQueries(2):  # versión de los datos y perfil
+            response = self.client.get(f'/api/respondents/{respondent.pk}/profile/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Respondent 1')
+        self.assertEqual(response.data['personality_factors']['A'], 2)
+        self.assertEqual(response.data['categorization']['An'], 3)
+
+    def test_profile_without_scores(self):
+        response = self.client.get(f'/api/respondents/{self.lonely.pk}/profile/')
+        self.assertIsNone(response.data['personality_factors'])
+        self.assertIsNone(response.data['categorization'])
+
+    def test_profile_not_found(self):
+        response = self.client.get('/api/respondents/999999/profile/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_profiles_in_one_query(self):
+        ids = ','.join(str(r.pk) for r in self.respondents)
+        with self.assertNumQueries(2):  # versión de los datos y perfiles
+            response = self.client.get('/api/profiles/', {'ids': ids})
+        self.assertEqual([p['name'] for p in response.data], ['Respondent 0', 'Respondent 1', 'Respondent 2'])
+
+    def test_bulk_profiles_invalid_ids(self):
+        response = self.client.get('/api/profiles/', {'ids': '1,x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_score_serializers_do_not_query_per_row(self):
+        respondent = self.respondents[0]
+        with self.assertNumQueries(2):  # versión de los datos y puntajes
+            response = self.client.get(f'/api/personality-factors/{respondent.pk}/')
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['respondent'], 'Respondent 0')
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/categorization/{respondent.pk}/')
+        self.assertEqual(response.data[0]['respondent'], 'Respondent 0')
+
+
+class ResponseCacheTests(APITestCase):
+
+    def setUp(self):
+        respondent = Respondent.objects.create(name="Respondent 0", age=20, gender="F")
+        PersonalityFactors.objects.create(respondent=respondent, A=3, B=4)
+        self.url = '/api/personality-factors-filter/'
+        self.params = {'factor1': 'A', 'factor2': 'B'}
+
+    def test_repeated_request_served_from_cache(self):
+        first = self.client.get(self.url, self.params)
+        self.assertEqual(first['X-Cache'], 'miss')
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(1):  # solo la versión de los datos
+            second = self.client.get(self.url, self.params)
+        self.assertEqual(second['X-Cache'], 'hit')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.json(), first.json())
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        with self.assertNumQueries(1):  # solo la versión de los datos
+            response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_cached_responses_vary_on_accept(self):
+        miss = self.client.get(self.url, self.params)
+        hit = self.client.get(self.url, self.params)
+        not_modified = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=miss['ETag'])
+        for response in (miss, hit, not_modified):
+            self.assertIn('Accept', [value.strip() for value in response['Vary'].split(',')])
+
+    def test_etag_depends_on_query(self):
+        first = self.client.get(self.url, self.params)
+        other = self.client.get(self.url, {'factor1': 'A', 'factor2': 'C'})
+        self.assertNotEqual(first['ETag'], other['ETag'])
+        response = self.client.get(self.url, {'factor1': 'A', 'factor2': 'C'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_data_change_invalidates(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        respondent = Respondent.objects.create(name="Respondent 1", age=21, gender="M")
+        PersonalityFactors.objects.create(respondent=respondent, A=5, B=6)
+
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 2)
+
+    def test_version_changed_by_another_process(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        # Otro proceso importó datos: en este solo cambia la fila de la versión
+        DatasetVersion.objects.update(version=f'{time.time_ns():x}')
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'miss')
+
+    def test_errors_not_cached(self):
+        response = self.client.get(self.url, {'factor1': 'A'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('ETag', response)
+
+
+class ExportViewTests(APITestCase):
+
+    def setUp(self):
+        for i in range(5):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=20 + i, gender="F" if i % 2 else "M")
+            PersonalityFactors.objects.create(respondent=respondent, A=i + 1, Q4=5)
+            Categorization.objects.create(respondent=respondent, An=i + 2)
+
+    def export(self, accept=None, **params):
+        headers = {'HTTP_ACCEPT': accept} if accept else {}
+        response = self.client.get('/api/export/', params, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, io.BytesIO(b''.join(response.streaming_content))
+
+    def check_frame(self, frame):
+        self.assertEqual(len(frame), 5)
+        self.assertEqual(list(frame.columns[:4]), ['id', 'name', 'age', 'gender'])
+        self.assertEqual(frame['A'].tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(frame['An'].tolist(), [2, 3, 4, 5, 6])
+        self.assertTrue(frame['B'].isna().all())
+
+    def test_csv(self):
+        response, content = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('respondents.csv', response['Content-Disposition'])
+        self.check_frame(pd.read_csv(content))
+
+    def test_xlsx(self):
+        response, content = self.export(file_format='xlsx')
+        self.check_frame(pd.read_excel(content))
+
+    def test_xlsx_streams_while_reading_rows(self):
+        read = []
+
+        def rows():
+            for i in range(5):
+                read.append(i)
+                yield (i, f'R&D <{i}>\x01', 20 + i, 'F') + (None,) * (len(EXPORT_COLUMNS) - 4)
+
+        chunks = xlsx_chunks(rows(), chunk_size=2)
+        content = next(chunks)
+        # El encabezado del zip sale antes de leer cualquier fila
+        self.assertTrue(content.startswith(b'PK'))
+        self.assertEqual(read, [])
+        content += next(chunks)
+        self.assertEqual(read, [0, 1])
+        content += b''.join(chunks)
+        frame = pd.read_excel(io.BytesIO(content))
+        self.assertEqual(frame['name'].tolist(), [f'R&D <{i}>' for i in range(5)])
+        self.assertEqual(frame['age'].tolist(), [20, 21, 22, 23, 24])
+        self.assertTrue(frame['A'].isna().all())
+
+    def test_parquet(self):
+        response, content = self.export(file_format='parquet')
+        self.check_frame(pd.read_parquet(content))
+
+    def test_arrow(self):
+        response, content = self.export(accept='application/vnd.apache.arrow.stream')
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(content).read_all()
+        self.assertEqual(table.schema.field('A').type, pa.float64())
+        self.check_frame(table.to_pandas())
+
+    def test_msgpack(self):
+        response, content = self.export(file_format='msgpack')
+        batches = list(msgpack.Unpacker(content))
+        frame = pd.concat([pd.DataFrame(batch) for batch in batches])
+        self.check_frame(frame.astype({'B': float}))
+
+    def test_accept_csv(self):
+        response, content = self.export(accept='text/csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+    def test_filters(self):
+        response, content = self.export(gender='F')
+        self.assertEqual(pd.read_csv(content)['name'].tolist(), ['Respondent 1', 'Respondent 3'])
+
+    def test_invalid_format(self):
+        response = self.client.get('/api/export/', {'file_format': 'json'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MetricsTests(APITestCase):
+
+    def setUp(self):
+        registry.clear()
+        respondent = Respondent.objects.create(name="Respondent 0", age=20, gender="F")
+        PersonalityFactors.objects.create(respondent=respondent, A=3, B=4)
+
+    def test_request_metrics(self):
+        self.client.get('/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B'})
+        self.client.get('/api/personality-factors-filter/', {'factor1': 'A'})
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        metrics = response.content.decode()
+        labels = 'route="api/personality-factors-filter/",method="GET"'
+        self.assertIn(f'dashboard_request_duration_seconds_count{{{labels}}} 2', metrics)
+        self.assertIn(f'dashboard_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', metrics)
+        self.assertIn(f'dashboard_requests_total{{{labels},status="200"}} 1', metrics)
+        self.assertIn(f'dashboard_requests_total{{{labels},status="400"}} 1', metrics)
+        self.assertIn(f'dashboard_request_db_queries_count{{{labels}}} 2', metrics)
+        self.assertIn(f'dashboard_db_duration_seconds_total{{{labels}}}', metrics)
+
+    def test_routes_group_by_pattern(self):
+        self.client.get('/api/respondents/1/')
+        self.client.get('/api/respondents/2/')
+        metrics = self.client.get('/api/metrics/').content.decode()
+        self.assertIn('dashboard_request_duration_seconds_count{route="api/respondents/<int:pk>/",method="GET"} 2', metrics)
+
+    def test_server_timing_header(self):
+        response = self.client.get('/api/stats/')
+        self.assertRegex(response['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$')
+
+    def test_only_local(self):
+        response = self.client.get('/api/metrics/', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_disabled(self):
+        with self.settings(DASHBOARD_METRICS=False):
+            response = self.client.get('/api/stats/')
+            self.assertNotIn('Server-Timing', response)
+            self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProfilingTests(APITestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_override = self.settings(DASHBOARD_PROFILING=True, DASHBOARD_PROFILING_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        respondent = Respondent.objects.create(name="Respondent 0", age=20, gender="F")
+        PersonalityFactors.objects.create(respondent=respondent, A=3, B=4)
+        self.params = {'factor1': 'A', 'factor2': 'B'}
+
+    def test_header_triggers_profile(self):
+        response = self.client.get('/api/personality-factors-filter/', self.params, HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [profile] = list_profiles()
+        self.assertEqual(response['X-Profile-Id'], profile['id'])
+        self.assertEqual(profile['path'], '/api/personality-factors-filter/?factor1=A&factor2=B')
+        self.assertEqual(profile['status'], 200)
+        self.assertTrue(any('dashboard_personalityfactors' in query['sql'] for query in profile['queries']))
+
+    def test_not_profiled_without_header(self):
+        response = self.client.get('/api/personality-factors-filter/', self.params)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(list_profiles(), [])
+
+    def test_sample_rate(self):
+        with self.settings(DASHBOARD_PROFILING_SAMPLE_RATE=1.0):
+            self.client.get('/api/stats/')
+        self.assertEqual(len(list_profiles()), 1)
+
+    def test_disabled(self):
+        with self.settings(DASHBOARD_PROFILING=False):
+            response = self.client.get('/api/stats/', HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_oldest_removed(self):
+        with self.settings(DASHBOARD_PROFILING_MAX_FILES=2):
+            ids = [self.client.get('/api/stats/', HTTP_X_PROFILE='1')['X-Profile-Id'] for _ in range(3)]
+        self.assertEqual([p['id'] for p in list_profiles()], sorted(ids[1:], reverse=True))
+
+    def test_list_profiles_command(self):
+        profile_id = self.client.get('/api/stats/', HTTP_X_PROFILE='1')['X-Profile-Id']
+        out = io.StringIO()
+        call_command('list_profiles', stdout=out)
+        self.assertIn(profile_id, out.getvalue())
+        self.assertIn('GET /api/stats/', out.getvalue())
+
+        out = io.StringIO()
+        call_command('list_profiles', show=profile_id, limit=5, stdout=out)
+        self.assertIn('function calls', out.getvalue())
+        self.assertIn('Slowest queries:', out.getvalue())
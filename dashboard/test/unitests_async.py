@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pyarrow as pa
+from django.test import TestCase, override_settings
+from django.urls import include, path
+
+from ..async_views import AsyncAPIView, ASYNC_READ_VIEWS
+from ..models import Respondent, PersonalityFactors, Categorization
+from ..urls import build_urlpatterns
+
+# Las pruebas usan las rutas del perfil ASGI (DASHBOARD_ASYNC_VIEWS)
+urlpatterns = [path('api/', include(build_urlpatterns(async_views=True)))]
+
+
+@override_settings(ROOT_URLCONF='dashboard.test.unitests_async')
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            respondent = Respondent.objects.create(name=f"Respondent {i}", age=20 + i, gender="F")
+            PersonalityFactors.objects.create(respondent=respondent, A=i + 1, B=10 - i)
+            Categorization.objects.create(respondent=respondent, An=i + 2, Ex=3)
+        self.first = Respondent.objects.order_by('id').first()
+
+    def test_read_views_are_async(self):
+        for view in ASYNC_READ_VIEWS.values():
+            self.assertTrue(issubclass(view, AsyncAPIView))
+            self.assertTrue(view.view_is_async)
+
+    async def test_respondent_list(self):
+        response = await self.async_client.get('/api/respontents/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['age'] for r in response.json()], [20, 21, 22, 23, 24])
+        self.assertEqual(set(response.json()[0]), {'id', 'name', 'age', 'gender'})
+
+        page = (await self.async_client.get('/api/respontents/', {'limit': 2})).json()
+        self.assertEqual([r['name'] for r in page['results']], ['Respondent 0', 'Respondent 1'])
+        after = (await self.async_client.get('/api/respontents/', {'limit': 2, 'after': page['next_after']})).json()
+        self.assertEqual(after['results'][0]['name'], 'Respondent 2')
+
+    async def test_stream(self):
+        response = await self.async_client.get('/api/respontents/', {'stream': 'true'})
+        self.assertTrue(response.streaming)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(content)), 5)
+
+    async def test_respondent_detail(self):
+        response = await self.async_client.get(f'/api/respondents/{self.first.pk}/')
+        self.assertEqual(response.json(), {'id': self.first.pk, 'name': 'Respondent 0', 'age': 20, 'gender': 'F'})
+        response = await self.async_client.get('/api/respondents/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'detail': 'No Respondent matches the given query.'})
+
+    async def test_scores_by_respondent(self):
+        factors = (await self.async_client.get(f'/api/personality-factors/{self.first.pk}/')).json()
+        self.assertEqual(factors[0]['respondent'], 'Respondent 0')
+        self.assertEqual((factors[0]['A'], factors[0]['B']), (1.0, 10.0))
+        categories = (await self.async_client.get(f'/api/categorization/{self.first.pk}/')).json()
+        self.assertEqual(categories[0]['An'], 2.0)
+
+    async def test_filters(self):
+        rows = (await self.async_client.get('/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B'})).json()
+        self.assertEqual([r['factor1'] for r in rows], [1, 2, 3, 4, 5])
+        columns = (await self.async_client.get(
+            '/api/categorization-filter/', {'category1': 'An', 'category2': 'Ex', 'shape': 'columnar'}
+        )).json()
+        self.assertEqual(columns['category1'], [2, 3, 4, 5, 6])
+        histogram = (await self.async_client.get(
+            '/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B', 'mode': 'histogram', 'bins': 5}
+        )).json()
+        self.assertEqual(histogram['total'], 5)
+
+    async def test_errors(self):
+        response = await self.async_client.get('/api/personality-factors-filter/', {'factor1': 'A'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': "Both 'factor1' and 'factor2' query parameters are required."})
+        response = await self.async_client.get('/api/respontents/', {'limit': 0})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get('/api/respontents/', headers={'Accept': 'image/png'})
+        self.assertEqual(response.status_code, 406)
+
+    async def test_arrow(self):
+        response = await self.async_client.get(
+            '/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B'},
+            headers={'Accept': 'application/vnd.apache.arrow.stream'},
+        )
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.column('factor2').to_pylist(), [10.0, 9.0, 8.0, 7.0, 6.0])
+
+    async def test_response_cache(self):
+        first = await self.async_client.get('/api/respontents/')
+        self.assertEqual(first['X-Cache'], 'miss')
+        second = await self.async_client.get('/api/respontents/')
+        self.assertEqual(second['X-Cache'], 'hit')
+        self.assertEqual(second.json(), first.json())
+        response = await self.async_client.get('/api/respontents/', headers={'If-None-Match': first['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_metrics_count_queries(self):
+        response = await self.async_client.get(f'/api/respondents/{self.first.pk}/')
+        # La versión de los datos y el respondiente
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+    async def test_concurrent_requests(self):
+        responses = await asyncio.gather(*[
+            self.async_client.get('/api/personality-factors-filter/', {'factor1': 'A', 'factor2': 'B', 'limit': i})
+            for i in range(1, 21)
+        ])
+        self.assertEqual([r.status_code for r in responses], [200] * 20)
+        self.assertEqual([len(r.json()['results']) for r in responses], [min(i, 5) for i in range(1, 21)])
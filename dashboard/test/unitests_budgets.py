@@ -0,0 +1,31 @@
+from django.test import TestCase, override_settings
+
+from ..benchmarks import READ_ENDPOINTS, measure, resolve_endpoint
+from ..models import Respondent
+from ..synthetic import populate
+
+
+@override_settings(DASHBOARD_RESPONSE_CACHE=None)
+class QueryBudgetTests(TestCase):
+    """
+    Cada endpoint de lectura hace un número fijo de consultas: el mismo con 5 que con 40
+    respondientes y nunca más que su máximo en ``READ_ENDPOINTS``.
+    """
+
+    def query_counts(self, rows):
+        populate(rows)
+        ids = list(Respondent.objects.order_by('id').values_list('id', flat=True))
+        counts = {}
+        for name, path, params, budget in READ_ENDPOINTS:
+            status, queries, _ = measure(self.client, *resolve_endpoint(path, params, ids), repeat=1)
+            self.assertEqual(status, 200, name)
+            counts[name] = queries
+        return counts
+
+    def test_query_counts_within_budget_and_independent_of_size(self):
+        small = self.query_counts(5)
+        large = self.query_counts(40)
+        for name, path, params, budget in READ_ENDPOINTS:
+            with self.subTest(endpoint=name):
+                self.assertLessEqual(small[name], budget)
+                self.assertEqual(small[name], large[name])
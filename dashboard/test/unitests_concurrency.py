@@ -0,0 +1,197 @@
+import io
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connections
+from django.db.utils import load_backend
+from django.test import Client, SimpleTestCase, override_settings
+
+from ..ingest import BulkImporter
+from ..jobs import run_import
+from ..models import PERSONALITY_COLUMNS
+from ..routers import replica_alias
+from ..synthetic import synthetic_frame
+
+UPLOADERS = 2
+READERS = 3
+UPLOAD_ROWS = 1500
+# Ninguna lectura debe esperar a que termine una importación
+MAX_READ_SECONDS = 1.0
+READ_URLS = [
+    '/api/respontents/?limit=100',
+    f'/api/personality-factors-filter/?factor1={PERSONALITY_COLUMNS[0]}&factor2={PERSONALITY_COLUMNS[1]}&limit=100',
+    '/api/stats/',
+]
+# Importación lenta: cada bloque tarda en leerse y validarse (sin el bloqueo de
+# escritura) y en escribirse (con él); en total dura varias veces lo que SQLite espera
+# el bloqueo antes de fallar con "database is locked"
+LOCK_TIMEOUT = 0.5
+SLOW_CHUNKS = 20
+SLOW_VALIDATE_SECONDS = 0.06
+SLOW_WRITE_SECONDS = 0.04
+
+
+def file_databases(path, timeout=None):
+    """
+    ``default`` y la réplica con la configuración de ``settings`` (pragmas, timeout,
+    modo de transacción) pero sobre el archivo ``path`` en lugar de la base de pruebas.
+    ``timeout`` reemplaza los segundos que SQLite espera el bloqueo de escritura.
+    """
+    aliases = ['default', replica_alias()]
+    databases = {}
+    for alias in aliases:
+        options = dict(settings.DATABASES[alias].get('OPTIONS', {}))
+        if timeout is not None:
+            options['timeout'] = timeout
+        databases[alias] = {**settings.DATABASES[alias], 'NAME': str(path), 'OPTIONS': options, 'TEST': {}}
+    return connections.configure_settings(databases)
+
+
+def run_on_file(databases, function, *args):
+    """
+    Ejecuta ``function`` con las conexiones de este hilo apuntando a ``databases``.
+    """
+    for alias, settings_dict in databases.items():
+        connections[alias] = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, alias)
+    try:
+        return function(*args)
+    finally:
+        for alias in databases:
+            connections[alias].close()
+
+
+@override_settings(DASHBOARD_IMPORT_JOBS_EAGER=True, DASHBOARD_RESPONSE_CACHE=None)
+class ConcurrentSQLiteTests(SimpleTestCase):
+    """
+    Subidas y lecturas en paralelo sobre un archivo SQLite con la configuración de
+    producción: ninguna falla con "database is locked" y las lecturas (en la réplica)
+    no esperan a las importaciones.
+    """
+    # Las conexiones de los hilos apuntan a un archivo temporal, no a la base de pruebas
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        media_override = self.settings(MEDIA_ROOT=self.directory / 'media')
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.file_dbs = file_databases(self.directory / 'db.sqlite3')
+        self.in_thread(lambda: call_command('migrate', verbosity=0, interactive=False))
+
+    def in_thread(self, function):
+        thread = threading.Thread(target=run_on_file, args=(self.file_dbs, function))
+        thread.start()
+        thread.join()
+
+    def upload(self, number, results, rows=UPLOAD_ROWS):
+        buffer = io.StringIO()
+        synthetic_frame(rows, seed=number, offset=number * UPLOAD_ROWS).to_csv(buffer, index=False)
+        upload = SimpleUploadedFile(f'upload-{number}.csv', buffer.getvalue().encode(), content_type='text/csv')
+        start = time.perf_counter()
+        try:
+            response = Client().post('/api/upload/', {'file': upload}, format='multipart')
+            results.append((response.status_code, response.json()['status'], time.perf_counter() - start))
+        except Exception as e:
+            results.append(e)
+
+    def read(self, uploads_done, results):
+        client = Client()
+        while not uploads_done.is_set():
+            for url in READ_URLS:
+                start = time.perf_counter()
+                try:
+                    response = client.get(url)
+                    results.append((response.status_code, time.perf_counter() - start))
+                except Exception as e:
+                    results.append(e)
+
+    def test_parallel_uploads_and_reads(self):
+        uploads, reads = [], []
+        uploads_done = threading.Event()
+        uploaders = [
+            threading.Thread(target=run_on_file, args=(self.file_dbs, self.upload, number, uploads))
+            for number in range(UPLOADERS)
+        ]
+        readers = [
+            threading.Thread(target=run_on_file, args=(self.file_dbs, self.read, uploads_done, reads))
+            for _ in range(READERS)
+        ]
+        for thread in readers + uploaders:
+            thread.start()
+        for thread in uploaders:
+            thread.join()
+        uploads_done.set()
+        for thread in readers:
+            thread.join()
+
+        errors = [result for result in uploads + reads if isinstance(result, Exception)]
+        self.assertEqual(errors, [])
+        self.assertEqual([(status, job) for status, job, _ in uploads], [(202, 'succeeded')] * UPLOADERS)
+        self.assertTrue(reads)
+        self.assertEqual({status for status, _ in reads}, {200})
+        latencies = [seconds for _, seconds in reads]
+        slowest_upload = max(seconds for _, _, seconds in uploads)
+        self.assertLess(
+            max(latencies), MAX_READ_SECONDS,
+            f'{len(reads)} reads, median {statistics.median(latencies):.3f}s, slowest upload {slowest_upload:.2f}s',
+        )
+
+        counts = []
+        self.in_thread(lambda: counts.append(Client().get('/api/stats/').json()))
+        self.assertEqual(counts[0]['count'], UPLOADERS * UPLOAD_ROWS)
+
+    @override_settings(DASHBOARD_IMPORT_BATCH_SIZE=10)
+    def test_upload_while_an_import_outlasts_the_lock_timeout(self):
+        databases = file_databases(self.directory / 'db.sqlite3', timeout=LOCK_TIMEOUT)
+        validate, write_valid = BulkImporter.validate, BulkImporter.write_valid
+        importing = threading.Event()
+
+        def slow_validate(importer, frame):
+            time.sleep(SLOW_VALIDATE_SECONDS)
+            return validate(importer, frame)
+
+        def slow_write_valid(importer, valid):
+            importing.set()
+            time.sleep(SLOW_WRITE_SECONDS)
+            return write_valid(importer, valid)
+
+        queued = []
+
+        def submit_import(job):
+            # Como con el hilo dedicado a las importaciones de SQLite: la que llega mientras
+            # otra corre espera su turno
+            if importing.is_set():
+                queued.append(job.pk)
+            else:
+                run_import(job.pk)
+
+        slow, other = [], []
+        with mock.patch.object(BulkImporter, 'validate', slow_validate), \
+                mock.patch.object(BulkImporter, 'write_valid', slow_write_valid), \
+                mock.patch('dashboard.views.submit_import', submit_import):
+            importer = threading.Thread(target=run_on_file, args=(databases, self.upload, 0, slow, SLOW_CHUNKS * 10))
+            importer.start()
+            importing.wait()
+            # Subida (crea su ImportJob) mientras tanto
+            uploader = threading.Thread(target=run_on_file, args=(databases, self.upload, 1, other, 10))
+            uploader.start()
+            uploader.join()
+            importer.join()
+            self.in_thread(lambda: [run_import(pk) for pk in queued])
+
+        self.assertEqual([result for result in slow + other if isinstance(result, Exception)], [])
+        self.assertEqual([result[:2] for result in other], [(202, 'pending')])
+        self.assertEqual([result[:2] for result in slow], [(202, 'succeeded')])
+        self.assertGreater(slow[0][2], 2 * LOCK_TIMEOUT)
+        counts = []
+        self.in_thread(lambda: counts.append(Client().get('/api/stats/').json()))
+        self.assertEqual(counts[0]['count'], (SLOW_CHUNKS + 1) * 10)
@@ -0,0 +1,234 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ..dataset import get_dataset_version
+from ..ingest import import_chunks, import_dataframe
+from ..validation import validate_frame
+from ..readers import ExcelChunkReader, MissingColumnsError, CSV, PARQUET, ARROW, XLSX, detect_format, open_reader
+from ..synthetic import WRITERS
+from ..models import Respondent, PersonalityFactors, Categorization, ScoreAggregate, PERSONALITY_COLUMNS, \
+    CATEGORIZATION_COLUMNS
+import pandas as pd
+import io
+
+
+def make_frame(rows, offset=0):
+    # Genera un DataFrame con el formato de importación y puntajes válidos
+    data = {
+        'name': [f'Respondent {offset + i}' for i in range(rows)],
+        'age': [20 + i % 30 for i in range(rows)],
+        'gender': ['Masculino' if i % 2 else 'Femenino' for i in range(rows)],
+    }
+    for j, col in enumerate(PERSONALITY_COLUMNS + CATEGORIZATION_COLUMNS):
+        data[col] = [float((i + j) % 10 + 1) for i in range(rows)]
+    return pd.DataFrame(data)
+
+
+class BulkImporterTests(TestCase):
+
+    def test_creates_all_tables(self):
+        result = import_dataframe(make_frame(5), batch_size=2)
+        self.assertEqual(result.rows, 5)
+        self.assertEqual(result.created, 5)
+        self.assertEqual(Respondent.objects.count(), 5)
+        self.assertEqual(PersonalityFactors.objects.count(), 5)
+        self.assertEqual(Categorization.objects.count(), 5)
+        self.assertEqual(Respondent.objects.get(name='Respondent 1').gender, 'M')
+
+    def test_reimport_updates_existing_rows(self):
+        import_dataframe(make_frame(3))
+        frame = make_frame(3)
+        frame['age'] = 40
+        frame['A'] = 9.0
+        result = import_dataframe(frame)
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.updated, 3)
+        self.assertEqual(Respondent.objects.count(), 3)
+        self.assertEqual(PersonalityFactors.objects.count(), 3)
+        self.assertTrue(all(age == 40 for age in Respondent.objects.values_list('age', flat=True)))
+        self.assertTrue(all(a == 9.0 for a in PersonalityFactors.objects.values_list('A', flat=True)))
+
+    def test_missing_names_get_automatic_names(self):
+        Respondent.objects.create(name='Existing', age=30, gender='F')
+        frame = make_frame(2)
+        frame['name'] = None
+        import_dataframe(frame)
+        self.assertTrue(Respondent.objects.filter(name='Estudiante 2').exists())
+        self.assertTrue(Respondent.objects.filter(name='Estudiante 3').exists())
+
+    def test_nan_scores_are_stored_as_null(self):
+        frame = make_frame(1)
+        frame['Q4'] = float('nan')
+        import_dataframe(frame)
+        self.assertIsNone(PersonalityFactors.objects.get().Q4)
+
+    def test_import_changes_dataset_version(self):
+        version = get_dataset_version()
+        import_dataframe(make_frame(2))
+        self.assertNotEqual(get_dataset_version(), version)
+
+    def test_query_count_scales_with_batches_not_rows(self):
+        with CaptureQueriesContext(connection) as queries:
+            import_dataframe(make_frame(200), batch_size=1000)
+        # Los INSERT se dividen solo por el límite de parámetros de SQLite
+        self.assertLess(len(queries), 20)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        frame = make_frame(4)
+        frame['age'] = frame['age'].astype(object)
+        frame.loc[3, 'age'] = 'not a number'
+        result = import_dataframe(frame, batch_size=2)
+        self.assertEqual(result.rows, 4)
+        self.assertEqual(result.rejected, 1)
+        self.assertEqual(result.errors, [{'row': 5, 'error': "Invalid value for 'age': 'not a number'"}])
+        self.assertEqual(Respondent.objects.count(), 3)
+
+    def test_chunk_transactions_keep_written_chunks(self):
+        def chunks():
+            yield make_frame(3)
+            frame = make_frame(2, offset=3)
+            frame['name'] = None
+            yield frame
+            raise ValueError('broken file')
+
+        with self.assertRaises(ValueError):
+            import_chunks(chunks(), atomic=False)
+        self.assertEqual(Respondent.objects.count(), 5)
+        self.assertTrue(Respondent.objects.filter(name='Estudiante 5').exists())
+        # ScoreAggregate se actualizó con cada bloque
+        self.assertEqual(sum(ScoreAggregate.objects.filter(column='A').values_list('count', flat=True)), 5)
+
+
+class ExcelChunkReaderTests(TestCase):
+
+    def excel_file(self, frame):
+        buffer = io.BytesIO()
+        frame.to_excel(buffer, index=False)
+        buffer.seek(0)
+        return buffer
+
+    def test_reads_fixed_size_chunks(self):
+        with ExcelChunkReader(self.excel_file(make_frame(7)), chunk_size=3) as reader:
+            sizes = [len(chunk) for chunk in reader]
+        self.assertEqual(sizes, [3, 3, 1])
+
+    def test_error_rows_count_blank_rows(self):
+        frame = make_frame(4)
+        frame['age'] = frame['age'].astype(object)
+        frame.loc[1] = None  # Fila 3 del archivo, vacía
+        frame.loc[3, 'age'] = 'not a number'  # Fila 5 del archivo
+        for file_format in (XLSX, CSV):
+            with self.subTest(file_format=file_format):
+                buffer = io.BytesIO()
+                WRITERS[file_format](frame, buffer)
+                buffer.seek(0)
+                with open_reader(buffer, f'upload.{file_format}', 2) as reader:
+                    result = import_chunks(reader)
+                self.assertEqual([error['row'] for error in result.errors], [5])
+
+    def test_header_is_validated_before_reading_rows(self):
+        frame = make_frame(2).drop(columns=['Q4', 'Ac'])
+        with self.assertRaises(MissingColumnsError) as ctx:
+            ExcelChunkReader(self.excel_file(frame), chunk_size=10)
+        self.assertEqual(ctx.exception.columns, ['Q4', 'Ac'])
+
+    def test_chunks_feed_the_bulk_importer(self):
+        frame = make_frame(5)
+        frame.loc[2, 'name'] = None
+        with ExcelChunkReader(self.excel_file(frame), chunk_size=2) as reader:
+            result = import_chunks(reader)
+        self.assertEqual(result.rows, 5)
+        self.assertEqual(Respondent.objects.count(), 5)
+        self.assertEqual(Categorization.objects.count(), 5)
+        self.assertTrue(Respondent.objects.filter(name='Estudiante 1').exists())
+
+
+class FormatReaderTests(TestCase):
+
+    def encoded(self, frame, file_format):
+        buffer = io.BytesIO()
+        WRITERS[file_format](frame, buffer)
+        buffer.seek(0)
+        return buffer
+
+    def test_detects_format_by_signature_and_extension(self):
+        frame = make_frame(2)
+        self.assertEqual(detect_format(self.encoded(frame, PARQUET), 'upload.bin'), PARQUET)
+        self.assertEqual(detect_format(self.encoded(frame, ARROW), 'upload.bin'), ARROW)
+        self.assertEqual(detect_format(self.encoded(frame, XLSX), 'upload.bin'), XLSX)
+        self.assertEqual(detect_format(self.encoded(frame, CSV), 'upload.csv'), CSV)
+
+    def test_all_formats_share_the_write_path(self):
+        for offset, file_format in enumerate([CSV, PARQUET, ARROW]):
+            with self.subTest(file_format=file_format):
+                frame = make_frame(5, offset=offset * 10)
+                with open_reader(self.encoded(frame, file_format), f'upload.{file_format}', 2) as reader:
+                    self.assertEqual([len(chunk) for chunk in reader], [2, 2, 1])
+                with open_reader(self.encoded(frame, file_format), f'upload.{file_format}', 2) as reader:
+                    result = import_chunks(reader)
+                self.assertEqual(result.created, 5)
+        self.assertEqual(PersonalityFactors.objects.count(), 15)
+
+    def test_missing_columns_in_csv(self):
+        frame = make_frame(2).drop(columns=['gender'])
+        with self.assertRaises(MissingColumnsError) as ctx:
+            open_reader(self.encoded(frame, CSV), 'upload.csv', 10)
+        self.assertEqual(ctx.exception.columns, ['gender'])
+
+
+class ValidateFrameTests(TestCase):
+
+    def test_valid_rows_are_converted(self):
+        frame = make_frame(3)
+        frame['gender'] = [' MASCULINO ', 'f', 'Female']
+        frame['age'] = ['21', 22.0, 23]
+        valid, rejected, errors = validate_frame(frame)
+        self.assertEqual(rejected, 0)
+        self.assertEqual(errors, [])
+        self.assertEqual(list(valid['gender']), ['M', 'F', 'F'])
+        self.assertEqual(list(valid['age']), [21, 22, 23])
+
+    def test_rejected_rows_are_reported(self):
+        frame = make_frame(5).astype(object)
+        frame.loc[0, 'age'] = 'abc'
+        frame.loc[1, 'gender'] = 'X'
+        frame.loc[2, 'A'] = 'high'
+        frame.loc[3, 'Ac'] = 11
+        valid, rejected, errors = validate_frame(frame, first_row=2)
+        self.assertEqual(rejected, 4)
+        self.assertEqual(list(valid['name']), ['Respondent 4'])
+        self.assertEqual(errors, [
+            {'row': 2, 'error': "Invalid value for 'age': 'abc'"},
+            {'row': 3, 'error': "Unknown gender: 'X'"},
+            {'row': 4, 'error': "Invalid value for 'A': 'high'"},
+            {'row': 5, 'error': "'Ac' out of range 1-10: 11.0"},
+        ])
+
+    def test_error_report_is_capped(self):
+        frame = make_frame(10)
+        frame['gender'] = 'X'
+        valid, rejected, errors = validate_frame(frame, max_errors=3)
+        self.assertEqual(rejected, 10)
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(valid.empty)
+
+    def test_blank_rows_are_dropped_and_missing_names_kept(self):
+        frame = make_frame(3).astype(object)
+        frame.loc[1, 'name'] = None
+        frame.loc[2] = None
+        frame.loc[0, 'B'] = float('nan')
+        valid, rejected, errors = validate_frame(frame)
+        self.assertEqual(rejected, 0)
+        self.assertEqual(len(valid), 2)
+        self.assertIsNone(valid['name'].iloc[1])
+        self.assertTrue(pd.isnull(valid['B'].iloc[0]))
+
+    def test_import_keeps_only_valid_rows(self):
+        frame = make_frame(4)
+        frame.loc[1, 'gender'] = 'unknown'
+        frame.loc[3, 'name'] = None
+        result = import_dataframe(frame)
+        self.assertEqual(result.rejected, 1)
+        self.assertEqual(result.errors[0]['row'], 3)
+        self.assertEqual(Respondent.objects.count(), 3)
+        self.assertTrue(Respondent.objects.filter(name='Estudiante 1').exists())
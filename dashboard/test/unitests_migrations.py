@@ -0,0 +1,91 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+MIGRATE_FROM = [('dashboard', '0006_query_indexes')]
+MIGRATE_TO = [('dashboard', '0007_unique_respondent_one_to_one_scores')]
+AGGREGATES_FROM = MIGRATE_TO
+AGGREGATES_TO = [('dashboard', '0008_score_aggregate')]
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    Base de las pruebas de migraciones de datos: al terminar vuelve a la última migración.
+    """
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        self.addCleanup(lambda: self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes()))
+
+
+class DedupeRespondentsMigrationTests(MigrationTestCase):
+    """
+    0007 une los respondientes con el mismo nombre en el de id más bajo (con la edad y el
+    género del más reciente) y conserva el registro de puntajes más reciente de cada uno.
+    """
+
+    def setUp(self):
+        super().setUp()
+        apps = self.migrate(MIGRATE_FROM)
+        Respondent = apps.get_model('dashboard', 'Respondent')
+        PersonalityFactors = apps.get_model('dashboard', 'PersonalityFactors')
+        Categorization = apps.get_model('dashboard', 'Categorization')
+
+        ana = Respondent.objects.create(name='Ana', age=20, gender='Femenino')
+        ana_again = Respondent.objects.create(name='Ana', age=21, gender='F')
+        luis = Respondent.objects.create(name='Luis', age=40, gender='Masculino')
+        PersonalityFactors.objects.create(respondent=ana, A=1)
+        PersonalityFactors.objects.create(respondent=ana_again, A=2)
+        # El más reciente es del respondiente que se conserva, aunque tenga el id más bajo
+        PersonalityFactors.objects.create(respondent=ana, A=3)
+        PersonalityFactors.objects.create(respondent=luis, A=5)
+        PersonalityFactors.objects.create(respondent=luis, A=6)
+        Categorization.objects.create(respondent=ana, Ex=1)
+        Categorization.objects.create(respondent=ana_again, Ex=2)
+        self.ids = {'ana': ana.pk, 'luis': luis.pk}
+
+        self.apps = self.migrate(MIGRATE_TO)
+
+    def test_keeps_lowest_id_with_latest_data(self):
+        Respondent = self.apps.get_model('dashboard', 'Respondent')
+        self.assertEqual(
+            list(Respondent.objects.order_by('id').values_list('id', 'name', 'age', 'gender')),
+            [(self.ids['ana'], 'Ana', 21, 'F'), (self.ids['luis'], 'Luis', 40, 'Masculino')],
+        )
+
+    def test_keeps_latest_scores_per_respondent(self):
+        PersonalityFactors = self.apps.get_model('dashboard', 'PersonalityFactors')
+        Categorization = self.apps.get_model('dashboard', 'Categorization')
+        self.assertEqual(
+            dict(PersonalityFactors.objects.values_list('respondent_id', 'A')),
+            {self.ids['ana']: 3, self.ids['luis']: 6},
+        )
+        self.assertEqual(PersonalityFactors.objects.count(), 2)
+        self.assertEqual(list(Categorization.objects.values_list('respondent_id', 'Ex')), [(self.ids['ana'], 2)])
+
+
+class ScoreAggregateMigrationTests(MigrationTestCase):
+    """
+    0008 calcula ScoreAggregate con su propia copia de las columnas y los rangos de edad,
+    sin depender de ``dashboard.aggregates`` ni de ``DASHBOARD_AGE_BANDS``.
+    """
+
+    def test_populates_aggregates_with_frozen_age_bands(self):
+        apps = self.migrate(AGGREGATES_FROM)
+        Respondent = apps.get_model('dashboard', 'Respondent')
+        PersonalityFactors = apps.get_model('dashboard', 'PersonalityFactors')
+        for name, age, a in [('Ana', 20, 2), ('Eva', 24, 4), ('Luis', 70, 6)]:
+            PersonalityFactors.objects.create(respondent=Respondent.objects.create(name=name, age=age, gender='F'), A=a)
+
+        with self.settings(DASHBOARD_AGE_BANDS=(30,)):
+            apps = self.migrate(AGGREGATES_TO)
+        ScoreAggregate = apps.get_model('dashboard', 'ScoreAggregate')
+        self.assertEqual(
+            sorted(ScoreAggregate.objects.values_list('gender', 'age_band', 'column', 'count', 'total', 'total_sq')),
+            [('F', '18-24', 'A', 2, 6.0, 20.0), ('F', '65+', 'A', 1, 6.0, 36.0)],
+        )
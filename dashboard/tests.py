@@ -1,3 +1,10 @@
-from django.test import TestCase
-
-# Create your tests here.
+# Las pruebas están en dashboard/test/unitests_*.py, que el patrón por defecto de
+# ``manage.py test`` (test*.py) no encuentra; se importan aquí para que las corra
+# también ``python manage.py test`` sin ``-p``.
+from .test.unitests_analytics import *  # noqa: F401,F403
+from .test.unitests_app import *  # noqa: F401,F403
+from .test.unitests_async import *  # noqa: F401,F403
+from .test.unitests_budgets import *  # noqa: F401,F403
+from .test.unitests_concurrency import *  # noqa: F401,F403
+from .test.unitests_ingest import *  # noqa: F401,F403
+from .test.unitests_migrations import *  # noqa: F401,F403
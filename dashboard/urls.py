@@ -1,15 +1,47 @@
+from django.conf import settings
 from django.urls import path
+from .async_views import ASYNC_READ_VIEWS
+from .metrics import metrics_view
 from .views import ExcelUploadView, RespondentListView, PersonalityFactorsFilterView, \
-    PersonalityFactorsByRespondentView, CategorizationFilterView, CategorizationByRespondentView, RespondentDetailView
-
-urlpatterns = [
-    path('upload-excel/', ExcelUploadView.as_view(), name='upload-excel'),
-    path('respontents/', RespondentListView.as_view(), name='respontents'),
-    path('respondents/<int:pk>/', RespondentDetailView.as_view(), name='respondent-detail'),
-    path('personality-factors-filter/', PersonalityFactorsFilterView.as_view(), name='personality-factors-filter'),
-    path('personality-factors/<int:respondent_id>/', PersonalityFactorsByRespondentView.as_view(),
-         name='personality-factors'),
-    path('categorization-filter/', CategorizationFilterView.as_view(), name='categorization'),
-    path('categorization/<int:respondent_id>/', CategorizationByRespondentView.as_view(), name='categorization'),
-
-]
+    PersonalityFactorsByRespondentView, CategorizationFilterView, CategorizationByRespondentView, RespondentDetailView, \
+    ImportJobDetailView, StatsView, GroupStatsView, CorrelationMatrixView, \
+    QueryView, CohortComparisonView, RespondentProfileView, SimilarRespondentsView, ClusteringView, \
+    ClusteringRunDetailView, ClusterAssignmentsView, ExportView, RespondentProfileListView
+
+
+def build_urlpatterns(async_views=False):
+    """
+    Rutas de la API. Con ``async_views`` (perfil ASGI, ``DASHBOARD_ASYNC_VIEWS``) las vistas
+    de lectura de ``ASYNC_READ_VIEWS`` se reemplazan por sus versiones asíncronas.
+    """
+    def read_view(view):
+        return (ASYNC_READ_VIEWS[view] if async_views else view).as_view()
+
+    return [
+        path('upload-excel/', ExcelUploadView.as_view(), name='upload-excel'),
+        path('upload/', ExcelUploadView.as_view(), name='upload'),
+        path('import-jobs/<int:pk>/', ImportJobDetailView.as_view(), name='import-job'),
+        path('respontents/', read_view(RespondentListView), name='respontents'),
+        path('respondents/<int:pk>/', read_view(RespondentDetailView), name='respondent-detail'),
+        path('respondents/<int:pk>/profile/', RespondentProfileView.as_view(), name='respondent-profile'),
+        path('respondents/<int:pk>/similar/', SimilarRespondentsView.as_view(), name='similar-respondents'),
+        path('profiles/', RespondentProfileListView.as_view(), name='respondent-profiles'),
+        path('personality-factors-filter/', read_view(PersonalityFactorsFilterView), name='personality-factors-filter'),
+        path('personality-factors/<int:respondent_id>/', read_view(PersonalityFactorsByRespondentView),
+             name='personality-factors'),
+        path('categorization-filter/', read_view(CategorizationFilterView), name='categorization'),
+        path('categorization/<int:respondent_id>/', read_view(CategorizationByRespondentView), name='categorization'),
+        path('stats/', StatsView.as_view(), name='stats'),
+        path('stats/groups/', GroupStatsView.as_view(), name='group-stats'),
+        path('correlations/', CorrelationMatrixView.as_view(), name='correlations'),
+        path('query/', QueryView.as_view(), name='query'),
+        path('cohorts/', CohortComparisonView.as_view(), name='cohorts'),
+        path('export/', ExportView.as_view(), name='export'),
+        path('clusters/', ClusteringView.as_view(), name='clusters'),
+        path('clustering-runs/<int:pk>/', ClusteringRunDetailView.as_view(), name='clustering-run'),
+        path('clustering-runs/<int:pk>/assignments/', ClusterAssignmentsView.as_view(), name='cluster-assignments'),
+        path('metrics/', metrics_view, name='metrics'),
+    ]
+
+
+urlpatterns = build_urlpatterns(getattr(settings, 'DASHBOARD_ASYNC_VIEWS', False))
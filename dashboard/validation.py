@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .models import PERSONALITY_COLUMNS, CATEGORIZATION_COLUMNS
+
+SCORE_COLUMNS = PERSONALITY_COLUMNS + CATEGORIZATION_COLUMNS
+
+# Mapeo para género
+GENDER_MAP = {
+    'masculino': 'M', 'femenino': 'F',
+    'male': 'M', 'female': 'F',
+    'm': 'M', 'f': 'F',
+}
+
+# Rangos válidos: los puntajes del 16PF son decatipos (1 a 10)
+DEFAULT_STEN_RANGE = (1, 10)
+DEFAULT_AGE_RANGE = (1, 120)
+
+
+def _display(value):
+    # Mostrar escalares de NumPy como valores de Python en los mensajes de error
+    if isinstance(value, np.generic):
+        value = value.item()
+    return repr(value)
+
+
+def validate_frame(frame, first_row=2, max_errors=None):
+    """
+    Valida y convierte un DataFrame completo con operaciones vectorizadas.
+
+    Devuelve ``(valid, rejected, errors)``: un DataFrame con las filas válidas ya
+    convertidas (``name`` es ``None`` en las filas sin nombre), el número de filas
+    rechazadas y el detalle de como máximo ``max_errors`` de ellas. ``first_row`` es el
+    número de fila en el archivo de la primera fila de ``frame``.
+
+    Las filas completamente vacías se descartan sin reportarse, para que las filas en
+    blanco al final de un archivo no generen respondientes ``Estudiante N``.
+    """
+    sten_min, sten_max = getattr(settings, 'DASHBOARD_STEN_RANGE', DEFAULT_STEN_RANGE)
+    age_min, age_max = getattr(settings, 'DASHBOARD_AGE_RANGE', DEFAULT_AGE_RANGE)
+
+    # Nombre: vacío o NaN significa nombre automático
+    names = frame['name'].astype(object)
+    stripped = names.astype(str).str.strip()
+    has_name = names.notna() & (stripped != '')
+
+    # Edad: número entero dentro del rango
+    age = pd.to_numeric(frame['age'], errors='coerce')
+    bad_age = (age.isna() | (age % 1 != 0) | (age < age_min) | (age > age_max)).to_numpy()
+
+    # Género: normalizado con GENDER_MAP
+    # (se normalizan solo los valores distintos y se expanden con los códigos de factorize)
+    gender = frame['gender'].astype(object)
+    codes, uniques = pd.factorize(gender)
+    mapped = np.array(
+        [GENDER_MAP.get(value.strip().lower()) if isinstance(value, str) else None for value in uniques] + [None],
+        dtype=object,
+    )
+    normalized_gender = pd.Series(mapped[codes], index=frame.index)  # el código -1 (NaN) toma el último None
+    bad_gender = normalized_gender.isna().to_numpy()
+
+    # Puntajes: numéricos (o vacíos) dentro del rango de decatipos
+    raw_scores = frame[SCORE_COLUMNS]
+    scores = raw_scores.apply(pd.to_numeric, errors='coerce')
+    non_numeric = (scores.isna() & raw_scores.notna()).to_numpy()
+    out_of_range = ((scores < sten_min) | (scores > sten_max)).to_numpy()
+
+    blank = (~has_name & frame['age'].isna() & gender.isna() & raw_scores.isna().all(axis=1)).to_numpy()
+    rejected = (bad_age | bad_gender | non_numeric.any(axis=1) | out_of_range.any(axis=1)) & ~blank
+
+    # Solo se arma el mensaje de las filas que se van a reportar
+    errors = []
+    positions = np.flatnonzero(rejected)
+    if max_errors is not None:
+        positions = positions[:max(max_errors, 0)]
+    for pos in positions:
+        messages = []
+        if bad_age[pos]:
+            messages.append(f"Invalid value for 'age': {_display(frame['age'].iat[pos])}")
+        if bad_gender[pos]:
+            messages.append(f"Unknown gender: {_display(gender.iat[pos])}")
+        for col_pos in np.flatnonzero(non_numeric[pos]):
+            col = SCORE_COLUMNS[col_pos]
+            messages.append(f"Invalid value for '{col}': {_display(raw_scores[col].iat[pos])}")
+        for col_pos in np.flatnonzero(out_of_range[pos]):
+            col = SCORE_COLUMNS[col_pos]
+            messages.append(f"'{col}' out of range {sten_min}-{sten_max}: {_display(scores[col].iat[pos])}")
+        errors.append({'row': first_row + int(pos), 'error': '; '.join(messages)})
+
+    keep = ~rejected & ~blank
+    valid = scores[keep].astype(float)
+    valid.insert(0, 'gender', normalized_gender[keep])
+    valid.insert(0, 'age', age[keep].astype(int))
+    valid.insert(0, 'name', stripped[keep].where(has_name[keep], None))
+    return valid, int(rejected.sum()), errors
@@ -1,12 +1,161 @@
-import pandas as pd
+import math
+import numpy as np
+from django.conf import settings
 from django.db.models import F
+from django.http import StreamingHttpResponse
 from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
-from .models import Respondent, PersonalityFactors, Categorization
-from .serializer import RespondentSerializer, PersonalityFactorsSerializer, CategorizationSerializer
+from rest_framework.reverse import reverse
+from .aggregates import group_statistics
+from .analytics import SCORE_LOOKUPS, SCORE_COLUMNS, CORRELATION_METHODS, DEFAULT_PERCENTILES, correlation_matrix, describe, score_matrix, \
+    compare_cohorts
+from .binning import hexbin, histogram2d, sample_indices
+from .caching import CachedResponseMixin
+from .clustering import MAX_CLUSTERS, MIN_CLUSTERS, request_clustering
+from .columnar import columnar_queryset, columns_from_tuples, value_names, wants_columnar
+from .exceptions import InvalidParameter
+from .exports import EXPORT_CONTENT_TYPES, EXPORT_FORMATS, accepted_export_format, export_chunks, export_rows
+from .filters import bounded_int_param, parse_cohort, respondent_filters, score_predicates
+from .jobs import submit_import
+from .models import Respondent, PersonalityFactors, Categorization, ImportJob, ClusteringRun, ClusterAssignment, \
+    PERSONALITY_COLUMNS, CATEGORIZATION_COLUMNS
+from .pagination import DEFAULT_MAX_PAGE_SIZE, KeysetPagination
+from .readers import CSV, FORMAT_LABELS, MissingColumnsError, detect_format, validate_header
+from .routers import ReplicaReadMixin
+from .serializer import RespondentSerializer, PersonalityFactorsSerializer, CategorizationSerializer, \
+    ImportJobSerializer, ClusteringRunSerializer, PROFILE_FIELDS, profile_from_row
+from .similarity import DISTANCE_METRICS, factor_index
+from .streaming import stream_json, wants_stream
+from .validation import DEFAULT_STEN_RANGE
+
+SCATTER_MODES = ['histogram', 'hexbin', 'sample']
+SAMPLE_STRATEGIES = ['random', 'stratified']
+DEFAULT_MAX_SAMPLE_SIZE = 10000
+# ``format`` es el parámetro de DRF para elegir el renderer (?format=arrow|msgpack)
+QUERY_RESERVED_PARAMS = ('gender', 'age_min', 'age_max', 'limit', 'after', 'stream', 'shape', 'format')
+MAX_COHORTS = 10
+FACTOR_PARAMS = ('factor1', 'factor2')
+CATEGORY_PARAMS = ('category1', 'category2')
+MAX_SIMILAR = 100
+
+
+def keyset_response(request, queryset, view, key_field='respondent_id', key_name='annotated_respondent_id'):
+    """
+    Respuesta de las vistas de filtro: completa, paginada por id de respondiente
+    (``?limit=&after=``) o en streaming (``?stream=true``). Con ``?shape=columnar`` las
+    filas (o las de la página) se devuelven como una lista por columna.
+    """
+    columnar = wants_columnar(request)
+    # Las páginas columnares se leen como tuplas de ``values_list``, sin un dict por fila
+    names = value_names(queryset) if columnar else None
+    paginator = KeysetPagination(key_field=key_field, key_name=key_name, names=names)
+    if wants_stream(request):
+        if columnar:
+            raise InvalidParameter("'stream' is only available as JSON rows.")
+        return stream_json(paginator.apply_after(queryset, request))
+    if not columnar:
+        page = paginator.paginate_queryset(queryset, request, view=view)
+        if page is not None:
+            return paginator.get_paginated_response(page)
+        return Response(queryset, status=status.HTTP_200_OK)
+
+    page = paginator.paginate_queryset(queryset.values_list(*names), request, view=view)
+    if page is not None:
+        return paginator.get_paginated_response(columns_from_tuples(page, names))
+    return Response(columnar_queryset(queryset), status=status.HTTP_200_OK)
+
+
+def scatter_mode_data(request, model, columns, labels):
+    """
+    Modos agregados de las vistas de filtro, calculados con NumPy sobre una sola lectura
+    columnar: ``histogram`` (``bins``), ``hexbin`` (``gridsize``) y ``sample`` (``size``,
+    ``strategy`` random/stratified y ``seed``). El tamaño de la respuesta depende de la
+    malla o de la muestra, no del número de respondientes. La muestra admite
+    ``?shape=columnar``.
+    """
+    mode = request.query_params.get('mode')
+    if mode not in SCATTER_MODES:
+        raise InvalidParameter(f"Invalid mode. Valid modes are: {', '.join(SCATTER_MODES)}.")
+
+    params = request.query_params
+    data = np.array(
+        list(model.objects.order_by('respondent_id').values_list('respondent_id', *columns)), dtype=float
+    ).reshape(-1, 3)
+    ids, x, y = data[:, 0].astype(np.int64), data[:, 1], data[:, 2]
+    value_range = getattr(settings, 'DASHBOARD_STEN_RANGE', DEFAULT_STEN_RANGE)
+    response = {'mode': mode, 'total': len(ids), 'range': list(value_range)}
+
+    if mode == 'histogram':
+        bins = bounded_int_param(params, 'bins', 10, 1, 200)
+        response.update(bins=bins, **histogram2d(x, y, bins, value_range))
+    elif mode == 'hexbin':
+        gridsize = bounded_int_param(params, 'gridsize', 10, 1, 100)
+        response.update(hexbin(x, y, gridsize, value_range))
+    else:
+        max_size = getattr(settings, 'DASHBOARD_MAX_SAMPLE_SIZE', DEFAULT_MAX_SAMPLE_SIZE)
+        size = bounded_int_param(params, 'size', 1000, 1, max_size)
+        strategy = params.get('strategy', 'random')
+        if strategy not in SAMPLE_STRATEGIES:
+            raise InvalidParameter(f"Invalid strategy. Valid strategies are: {', '.join(SAMPLE_STRATEGIES)}.")
+        seed = bounded_int_param(params, 'seed', None, 0, 2 ** 32 - 1)
+
+        columnar = wants_columnar(request)
+        chosen = sample_indices(x, y, size, strategy, np.random.default_rng(seed), 10, value_range)
+        # Solo se leen los nombres de los respondientes de la muestra
+        names = dict(Respondent.objects.filter(id__in=ids[chosen].tolist()).values_list('id', 'name'))
+        rows = [
+            (
+                int(ids[i]),
+                names.get(int(ids[i])),
+                None if np.isnan(x[i]) else float(x[i]),
+                None if np.isnan(y[i]) else float(y[i]),
+            )
+            for i in chosen
+        ]
+        keys = ('annotated_respondent_id', 'respondent_name') + tuple(labels)
+        results = columns_from_tuples(rows, keys) if columnar else [dict(zip(keys, row)) for row in rows]
+        response.update(strategy=strategy, size=len(chosen), results=results)
+    return response
+
+
+def scatter_mode_response(request, model, columns, labels):
+    return Response(scatter_mode_data(request, model, columns, labels), status=status.HTTP_200_OK)
+
+
+def selected_columns(params, names, valid, label):
+    """
+    Las dos columnas elegidas en los parámetros ``names`` (por ejemplo factor1 y factor2),
+    validadas contra ``valid``.
+    """
+    first, second = (params.get(name) for name in names)
+    if not first or not second:
+        raise InvalidParameter(f"Both '{names[0]}' and '{names[1]}' query parameters are required.")
+    if first not in valid or second not in valid:
+        raise InvalidParameter(f"Invalid {label}. Valid {label} are: {', '.join(valid)}.")
+    return first, second
+
+
+def factor_rows(factor1, factor2):
+    # Factores con IDs y nombres de los respondientes
+    return PersonalityFactors.objects.select_related('respondent').values(
+        annotated_respondent_id=F('respondent__id'),  # ID del respondiente
+        respondent_name=F('respondent__name'),  # Nombre del respondiente
+        factor1=F(factor1),
+        factor2=F(factor2)
+    )
+
+
+def category_rows(category1, category2):
+    # Cambiar el nombre de la anotación para evitar conflicto
+    return Categorization.objects.values(
+        annotated_respondent_id=F('respondent__id'),  # ID del respondiente
+        respondent_name=F('respondent__name'),  # Nombre del respondiente
+        category1=F(category1),
+        category2=F(category2)
+    )
 
 
 class ExcelUploadView(APIView):
@@ -18,162 +167,375 @@ class ExcelUploadView(APIView):
         if not file:
             return Response({'error': 'No File Provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            # Leer el archivo Excel
-            excel_data = pd.read_excel(file)
-
-            # Columnas requeridas
-            personality_columns = [
-                'A', 'B', 'C', 'E', 'F', 'G', 'H',
-                'I', 'L', 'M', 'N', 'O', 'Q1', 'Q2', 'Q3', 'Q4'
-            ]
-            categorization_columns = ['An', 'Ex', 'So', 'In', 'Ob', 'Cr', 'Ne', 'Ps', 'Li', 'Ac']
-            required_columns = ['name', 'age', 'gender'] + personality_columns + categorization_columns
-
-            # Verificar columnas faltantes
-            missing_columns = [col for col in required_columns if col not in excel_data.columns]
-            if missing_columns:
-                return Response(
-                    {"error": f"Missing columns in Excel: {', '.join(missing_columns)}"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            # Contador para nombres automáticos
-            current_count = Respondent.objects.count()
-            new_counter = current_count + 1
-
-            # Mapeo para género
-            gender_map = {'masculino': 'M', 'femenino': 'F'}
-
-            # Procesar filas del Excel
-            for _, row in excel_data.iterrows():
-                # Validar datos de la fila
-                name = row['name'] if pd.notnull(row['name']) else f"Estudiante {new_counter}"
-                if pd.isnull(row['name']):
-                    new_counter += 1
-
-                gender = gender_map.get(row['gender'].strip().lower(), row['gender'])  # Convertir género
-
-                respondent, _ = Respondent.objects.update_or_create(
-                    name=name,
-                    defaults={'age': row['age'], 'gender': gender}
-                )
-
-                # Crear o actualizar PersonalityFactors
-                PersonalityFactors.objects.update_or_create(
-                    respondent=respondent,
-                    defaults={col: row[col] for col in personality_columns if col in row}
-                )
-
-                # Crear o actualizar Categorization
-                Categorization.objects.update_or_create(
-                    respondent=respondent,
-                    defaults={col: row[col] for col in categorization_columns if col in row}
-                )
-
-            return Response({"message": "Excel data processed successfully"}, status=status.HTTP_201_CREATED)
+        # Excel, CSV, Parquet o Arrow IPC
+        file_format = detect_format(file, file.name)
+        label = FORMAT_LABELS[file_format]
 
-        except ValueError as e:
-            return Response({'error': f'Invalid Excel File: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            # Validar solo el encabezado; las filas se procesan en segundo plano
+            validate_header(file, file.name, file_format)
+        except MissingColumnsError as e:
+            return Response(
+                {"error": f"Missing columns in {label}: {', '.join(e.columns)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
-            return Response({'error': f'Unexpected error: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({'error': f'Invalid {label} File: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Guardar el archivo y encolar la importación
+        job = ImportJob.objects.create(file=file, original_name=file.name)
+        submit_import(job)
+        job.refresh_from_db()
+
+        return Response(
+            {
+                "message": "Import job accepted",
+                "job_id": job.pk,
+                "format": file_format,
+                "status": job.status,
+                "status_url": reverse('import-job', args=[job.pk], request=request),
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
 
-class RespondentListView(ListAPIView):
+class ImportJobDetailView(RetrieveAPIView):
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+
+
+class RespondentListView(ReplicaReadMixin, CachedResponseMixin, ListAPIView):
+    """
+    Lista de respondientes. Con ``?limit=`` se pagina por ``id`` (cursor ``after``), con
+    ``?stream=true`` se envía completa a medida que se lee de la base de datos y con
+    ``?shape=columnar`` se devuelve una lista por columna.
+    """
     queryset = Respondent.objects.all()
     serializer_class = RespondentSerializer
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        if wants_columnar(request):
+            rows = self.get_queryset().values(*RespondentSerializer.Meta.fields)
+            return keyset_response(request, rows, self, key_field='id', key_name='id')
+        if wants_stream(request):
+            queryset = self.paginator.apply_after(self.get_queryset(), request)
+            return stream_json(queryset.values(*RespondentSerializer.Meta.fields))
+        return super().list(request, *args, **kwargs)
 
 
-class RespondentDetailView(RetrieveAPIView):
+class RespondentDetailView(ReplicaReadMixin, CachedResponseMixin, RetrieveAPIView):
     queryset = Respondent.objects.all()
     serializer_class = RespondentSerializer
 
-class PersonalityFactorsByRespondentView(ListAPIView):
+class PersonalityFactorsByRespondentView(ReplicaReadMixin, CachedResponseMixin, ListAPIView):
     serializer_class = PersonalityFactorsSerializer
 
     def get_queryset(self):
         respondent_id = self.kwargs['respondent_id']
-        queryset = PersonalityFactors.objects.filter(respondent_id=respondent_id)
-        print(f"Queryset for respondent_id {respondent_id}: {queryset}")
-        return queryset
+        return PersonalityFactors.objects.filter(respondent_id=respondent_id).select_related('respondent')
 
 
-class PersonalityFactorsFilterView(APIView):
+class PersonalityFactorsFilterView(ReplicaReadMixin, CachedResponseMixin, APIView):
     """
     Vista para recuperar valores de dos factores de personalidad específicos elegidos por el usuario.
+    Admite ``?limit=&after=``, ``?stream=true`` y ``?shape=columnar`` (ver ``keyset_response``) y los modos agregados
+    ``?mode=histogram|hexbin|sample`` (ver ``scatter_mode_response``).
+    """
+    def get(self, request, *args, **kwargs):
+        # Validar que se eligieron dos factores existentes
+        factor1, factor2 = selected_columns(request.query_params, FACTOR_PARAMS, PERSONALITY_COLUMNS, 'factors')
+
+        if 'mode' in request.query_params:
+            return scatter_mode_response(request, PersonalityFactors, (factor1, factor2), FACTOR_PARAMS)
+
+        return keyset_response(request, factor_rows(factor1, factor2), self)
+
+
+
+
+class CategorizationByRespondentView(ReplicaReadMixin, CachedResponseMixin, ListAPIView):
+    serializer_class = CategorizationSerializer
+
+    def get_queryset(self):
+        respondent_id = self.kwargs['respondent_id']
+        return Categorization.objects.filter(respondent_id=respondent_id).select_related('respondent')
+
+
+class CategorizationFilterView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista para filtrar categorías específicas elegidas por el usuario.
+    Admite ``?limit=&after=``, ``?stream=true`` y ``?shape=columnar`` (ver ``keyset_response``) y los modos agregados
+    ``?mode=histogram|hexbin|sample`` (ver ``scatter_mode_response``).
     """
     def get(self, request, *args, **kwargs):
-        # Recuperar parámetros de consulta
-        factor1 = request.query_params.get('factor1')
-        factor2 = request.query_params.get('factor2')
+        # Validar que se eligieron dos categorías existentes
+        category1, category2 = selected_columns(
+            request.query_params, CATEGORY_PARAMS, CATEGORIZATION_COLUMNS, 'categories'
+        )
+
+        if 'mode' in request.query_params:
+            return scatter_mode_response(request, Categorization, (category1, category2), CATEGORY_PARAMS)
+
+        return keyset_response(request, category_rows(category1, category2), self)
+
 
-        # Validar que ambos factores se hayan proporcionado
-        if not factor1 or not factor2:
+
+
+class StatsView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista con estadísticas descriptivas (count, mean, std, min, max y percentiles) de los
+    16 factores y las 10 categorías, calculadas en el servidor.
+    Parámetros opcionales: ``percentiles`` (ej. ``10,50,90``), ``gender``, ``age_min`` y ``age_max``.
+    """
+    def get(self, request, *args, **kwargs):
+        # Validar los percentiles pedidos
+        try:
+            percentiles = [float(p) for p in request.query_params.get('percentiles', '').split(',') if p.strip()]
+        except ValueError:
+            percentiles = [-1]
+        if any(not math.isfinite(p) or p < 0 or p > 100 for p in percentiles):
             return Response(
-                {"error": "Both 'factor1' and 'factor2' query parameters are required."},
+                {"error": "'percentiles' must be a comma-separated list of numbers between 0 and 100."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        percentiles = percentiles or DEFAULT_PERCENTILES
+
+        # Una sola lectura columnar de todos los puntajes
+        ids, matrix = score_matrix(respondent_filters(request.query_params))
+        stats = describe(matrix, percentiles=percentiles)
+
+        return Response({
+            'count': len(ids),
+            'percentiles': percentiles,
+            'factors': {col: stats[col] for col in PERSONALITY_COLUMNS},
+            'categories': {col: stats[col] for col in CATEGORIZATION_COLUMNS},
+        }, status=status.HTTP_200_OK)
+
+
+class GroupStatsView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista con el conteo, la media y la desviación estándar de los 16 factores y las 10
+    categorías por género y rango de edad, leídos de los agregados que mantiene la
+    importación (ScoreAggregate). Parámetro opcional: ``gender``.
+    """
+    def get(self, request, *args, **kwargs):
+        groups = group_statistics(gender=respondent_filters(request.query_params).get('gender'))
+        for group in groups:
+            scores = group.pop('scores')
+            group['factors'] = {col: scores[col] for col in PERSONALITY_COLUMNS if col in scores}
+            group['categories'] = {col: scores[col] for col in CATEGORIZATION_COLUMNS if col in scores}
+        return Response({'groups': groups}, status=status.HTTP_200_OK)
+
 
-        # Validar que los factores existen en el modelo
-        valid_factors = ['A', 'B', 'C', 'E', 'F', 'G', 'H', 'I', 'L', 'M', 'N', 'O', 'Q1', 'Q2', 'Q3', 'Q4']
-        if factor1 not in valid_factors or factor2 not in valid_factors:
+class CorrelationMatrixView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista con la matriz de correlación (Pearson o Spearman) entre los 16 factores y las
+    10 categorías. El resultado queda en caché hasta que cambian los datos.
+    """
+    def get(self, request, *args, **kwargs):
+        method = request.query_params.get('method', 'pearson')
+        if method not in CORRELATION_METHODS:
             return Response(
-                {"error": f"Invalid factors. Valid factors are: {', '.join(valid_factors)}."},
+                {"error": f"Invalid method. Valid methods are: {', '.join(CORRELATION_METHODS)}."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        return Response(correlation_matrix(method), status=status.HTTP_200_OK)
 
-        # Recuperar factores con IDs y nombres de los respondientes
-        factors = PersonalityFactors.objects.select_related('respondent').values(
-            annotated_respondent_id=F('respondent__id'),  # ID del respondiente
-            respondent_name=F('respondent__name'),  # Nombre del respondiente
-            factor1=F(factor1),
-            factor2=F(factor2)
-        )
 
-        return Response(factors, status=status.HTTP_200_OK)
+class CohortComparisonView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista para comparar dos o más cohortes, por ejemplo
+    ``?cohort=gender:M,label:Hombres&cohort=gender:F,label:Mujeres`` (claves: label, gender,
+    age_min, age_max, import_job). Devuelve por columna el conteo, la media y la
+    desviación estándar de cada cohorte y, para cada par de cohortes, la diferencia de
+    medias, la d de Cohen y la prueba t de Welch. ``columns`` elige los factores o
+    categorías (por defecto los 16 factores).
+    """
+    def get(self, request, *args, **kwargs):
+        specs = request.query_params.getlist('cohort')
+        if not 2 <= len(specs) <= MAX_COHORTS:
+            return Response(
+                {"error": f"Between 2 and {MAX_COHORTS} 'cohort' parameters are required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        labels, cohorts = zip(*(parse_cohort(spec) for spec in specs))
 
+        columns = [col.strip() for col in request.query_params.get('columns', '').split(',') if col.strip()]
+        columns = columns or PERSONALITY_COLUMNS
+        invalid = [col for col in columns if col not in SCORE_COLUMNS]
+        if invalid:
+            return Response(
+                {"error": f"Invalid columns: {', '.join(invalid)}. Valid values are: {', '.join(SCORE_COLUMNS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
+        return Response(compare_cohorts(labels, cohorts, columns), status=status.HTTP_200_OK)
 
 
-class CategorizationByRespondentView(ListAPIView):
-    serializer_class = CategorizationSerializer
+class QueryView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista para seleccionar respondientes con predicados sobre cualquier número de
+    factores y categorías, por ejemplo ``?A__gte=7&Q4__lte=3&Ex__gte=6``
+    (operadores: gt, gte, lt, lte, eq), más ``gender``, ``age_min`` y ``age_max``.
+    Admite ``?limit=&after=``, ``?stream=true`` y ``?shape=columnar``.
+    """
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        predicates, columns = score_predicates(params, reserved=QUERY_RESERVED_PARAMS)
 
-    def get_queryset(self):
-        respondent_id = self.kwargs['respondent_id']
-        return Categorization.objects.filter(respondent_id=respondent_id)
+        # Devolver los datos del respondiente y los valores usados en los predicados
+        query = Respondent.objects.filter(**respondent_filters(params), **predicates).values(
+            'id', 'name', 'age', 'gender',
+            **{col: F(SCORE_LOOKUPS[SCORE_COLUMNS.index(col)]) for col in columns}
+        )
+        return keyset_response(request, query, self, key_field='id', key_name='id')
 
 
-class CategorizationFilterView(APIView):
+class RespondentProfileView(ReplicaReadMixin, CachedResponseMixin, APIView):
     """
-    Vista para filtrar categorías específicas elegidas por el usuario.
+    Vista con el perfil completo de un respondiente (datos, factores y categorización)
+    leído en una sola consulta.
     """
-    def get(self, request, *args, **kwargs):
-        # Recuperar parámetros de consulta
-        category1 = request.query_params.get('category1')
-        category2 = request.query_params.get('category2')
+    def get(self, request, pk, *args, **kwargs):
+        row = Respondent.objects.filter(pk=pk).values(*PROFILE_FIELDS).first()
+        if row is None:
+            return Response({"error": "Respondent not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(profile_from_row(row), status=status.HTTP_200_OK)
 
-        # Validar que ambas categorías se hayan proporcionado
-        if not category1 or not category2:
+
+class RespondentProfileListView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista con los perfiles de varios respondientes (``?ids=1,2,3``) en una sola consulta.
+    """
+    def get(self, request, *args, **kwargs):
+        try:
+            ids = [int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()]
+        except ValueError:
+            ids = None
+        if not ids:
             return Response(
-                {"error": "Both 'category1' and 'category2' query parameters are required."},
+                {"error": "'ids' must be a comma-separated list of respondent ids."},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        max_ids = getattr(settings, 'DASHBOARD_MAX_PAGE_SIZE', DEFAULT_MAX_PAGE_SIZE)
+        if len(ids) > max_ids:
+            return Response(
+                {"error": f"At most {max_ids} ids can be requested at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = Respondent.objects.filter(pk__in=ids).order_by('id').values(*PROFILE_FIELDS)
+        return Response([profile_from_row(row) for row in rows], status=status.HTTP_200_OK)
 
-        # Validar que las categorías existen en el modelo
-        valid_categories = ['An', 'Ex', 'So', 'In', 'Ob', 'Cr', 'Ne', 'Ps', 'Li', 'Ac']  # Agregar las categorías válidas
-        if category1 not in valid_categories or category2 not in valid_categories:
+
+class SimilarRespondentsView(ReplicaReadMixin, CachedResponseMixin, APIView):
+    """
+    Vista con los ``k`` respondientes con el perfil de 16 factores más parecido al de un
+    respondiente, según la distancia ``metric`` (euclidean o cosine). La búsqueda usa el
+    índice en memoria (ver ``dashboard.similarity``); la base de datos solo se consulta
+    para los datos de los ``k`` resultados.
+    """
+    def get(self, request, pk, *args, **kwargs):
+        k = bounded_int_param(request.query_params, 'k', 10, 1, MAX_SIMILAR)
+        metric = request.query_params.get('metric', 'euclidean')
+        if metric not in DISTANCE_METRICS:
             return Response(
-                {"error": f"Invalid categories. Valid categories are: {', '.join(valid_categories)}."},
+                {"error": f"Invalid metric. Valid metrics are: {', '.join(DISTANCE_METRICS)}."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Cambiar el nombre de la anotación para evitar conflicto
-        query = Categorization.objects.values(
-            annotated_respondent_id=F('respondent__id'),  # ID del respondiente
-            respondent_name=F('respondent__name'),  # Nombre del respondiente
-            category1=F(category1),
-            category2=F(category2)
+        index = factor_index()
+        position = index.position(pk)
+        if position is None:
+            return Response(
+                {"error": "Respondent not found or without a complete personality factor profile."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        positions, distances = index.neighbors(position, k, metric)
+        ids = index.ids[positions].tolist()
+        respondents = Respondent.objects.in_bulk(ids)
+        results = [
+            {**RespondentSerializer(respondents[respondent_id]).data, 'distance': float(distance)}
+            for respondent_id, distance in zip(ids, distances)
+            if respondent_id in respondents
+        ]
+        return Response({'respondent': pk, 'metric': metric, 'results': results}, status=status.HTTP_200_OK)
+
+
+class ClusteringView(APIView):
+    """
+    Vista con el agrupamiento k-means de los perfiles de 16 factores (``?k=``, por defecto
+    5). Si la versión actual de los datos ya tiene un agrupamiento terminado (o fallido)
+    se devuelve con 200; si no, o si el último quedó pendiente más de
+    ``DASHBOARD_CLUSTERING_STALE_AFTER`` segundos, se encola el cálculo y se responde 202
+    con la URL para consultarlo.
+    """
+    def get(self, request, *args, **kwargs):
+        k = bounded_int_param(request.query_params, 'k', 5, MIN_CLUSTERS, MAX_CLUSTERS)
+        run = request_clustering(k)
+        data = ClusteringRunSerializer(run).data
+        data['status_url'] = reverse('clustering-run', args=[run.pk], request=request)
+        finished = run.status in (ClusteringRun.SUCCEEDED, ClusteringRun.FAILED)
+        return Response(data, status=status.HTTP_200_OK if finished else status.HTTP_202_ACCEPTED)
+
+
+class ClusteringRunDetailView(RetrieveAPIView):
+    queryset = ClusteringRun.objects.all()
+    serializer_class = ClusteringRunSerializer
+
+
+class ClusterAssignmentsView(ReplicaReadMixin, APIView):
+    """
+    Vista con el grupo de cada respondiente en un agrupamiento (opcionalmente solo los del
+    grupo ``?cluster=``), con la distancia a su centroide. Admite ``?limit=&after=``,
+    ``?stream=true`` y ``?shape=columnar``.
+    """
+    def get(self, request, pk, *args, **kwargs):
+        run = ClusteringRun.objects.filter(pk=pk).first()
+        if run is None:
+            return Response({"error": "Clustering run not found."}, status=status.HTTP_404_NOT_FOUND)
+        assignments = ClusterAssignment.objects.filter(run=run)
+        cluster = bounded_int_param(request.query_params, 'cluster', None, 0, run.k - 1)
+        if cluster is not None:
+            assignments = assignments.filter(cluster=cluster)
+
+        query = assignments.values(
+            'cluster', 'distance',
+            annotated_respondent_id=F('respondent_id'),
+            respondent_name=F('respondent__name'),
         )
+        return keyset_response(request, query, self)
+
 
-        return Response(query, status=status.HTTP_200_OK)
+class ExportView(ReplicaReadMixin, APIView):
+    """
+    Vista para exportar la tabla completa de respondientes, factores y categorías como
+    ``?file_format=csv|xlsx|parquet|arrow|msgpack`` o según el encabezado ``Accept`` (por
+    defecto CSV), con los filtros opcionales ``gender``, ``age_min`` y ``age_max``. La
+    respuesta se envía en streaming a medida que se leen las filas, así que la memoria
+    usada no depende del número de filas.
+    """
+    def perform_content_negotiation(self, request, force=False):
+        # El formato del archivo se elige en ``get``: un Accept como text/csv no debe
+        # responderse con 406
+        return super().perform_content_negotiation(request, force=True)
 
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get('file_format') or accepted_export_format(
+            request.META.get('HTTP_ACCEPT', '')
+        ) or CSV
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Invalid file_format. Valid formats are: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            chunks = export_chunks(file_format, export_rows(respondent_filters(request.query_params)))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="respondents.{file_format}"'
+        return response